@@ -0,0 +1,92 @@
+"""Benchmark color backends on a synthetic wallpaper corpus
+
+Usage: python benchmarks/bench_colors.py [--images N] [--size WxH]
+
+Generates N random gradient wallpapers in a temporary directory and
+times palette generation for the native backend and, if the ``dms``
+command is installed, the DMS/matugen backend. Thumbnails are built
+before timing, as they would be in the selector.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from gi.repository import GdkPixbuf, GLib
+
+
+def make_corpus(directory: Path, count: int, width: int, height: int) -> list[Path]:
+    """Write count gradient PNGs with random colors and noise"""
+    rng = np.random.default_rng(0)
+    y = np.linspace(0.0, 1.0, height)[:, None, None]
+    x = np.linspace(0.0, 1.0, width)[None, :, None]
+    paths = []
+    for i in range(count):
+        a, b, c = rng.random((3, 3))
+        image = a * (1 - x) * (1 - y) + b * x + c * y * (1 - x)
+        image += rng.normal(0, 0.03, (height, width, 3))
+        pixels = (np.clip(image, 0, 1) * 255).astype(np.uint8)
+        pixbuf = GdkPixbuf.Pixbuf.new_from_bytes(
+            GLib.Bytes.new(pixels.tobytes()), GdkPixbuf.Colorspace.RGB,
+            False, 8, width, height, width * 3)
+        path = directory / f"synthetic-{i:03d}.png"
+        pixbuf.savev(str(path), "png", [], [])
+        paths.append(path)
+    return paths
+
+
+def bench(name: str, generator, paths: list[Path]) -> None:
+    timings = []
+    failed = 0
+    for path in paths:
+        start = time.perf_counter()
+        if generator.generate_outputs(path) is None:
+            failed += 1
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{name:>8}: median {statistics.median(timings):8.1f} ms, "
+          f"max {max(timings):8.1f} ms, total {sum(timings) / 1000:6.2f} s, "
+          f"{failed} failed")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--size", default="3840x2160")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    with tempfile.TemporaryDirectory(prefix="bench-colors-") as tmp:
+        tmp = Path(tmp)
+        # Keep thumbnails and state out of the real cache
+        os.environ["HOME"] = str(tmp)
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+        from wallpaper_selector.plugins.colors.dms import DmsColorGenerator
+        from wallpaper_selector.plugins.colors.native import NativeColorGenerator
+        from wallpaper_selector.thumbnail_cache import ensure_thumbnails
+
+        corpus = tmp / "corpus"
+        corpus.mkdir()
+        print(f"Generating {args.images} images at {width}x{height}...")
+        paths = make_corpus(corpus, args.images, width, height)
+        ensure_thumbnails(paths)
+
+        backend_args = dict(
+            state_dir=tmp / "state", config_dir=tmp / "config",
+            shell_dir=tmp / "shell", session_file=tmp / "session.json",
+        )
+        bench("native", NativeColorGenerator(**backend_args), paths)
+        if shutil.which("dms"):
+            bench("dms", DmsColorGenerator(**backend_args), paths)
+        else:
+            print("     dms: skipped (dms command not found)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Benchmark color similarity queries on a synthetic library
+
+Usage: python benchmarks/bench_similar.py [--images N] [--queries Q]
+
+Fills a color index with N synthetic feature vectors (random colors
+with noise, no thumbnails needed) and times nearest-neighbour queries,
+plus an incremental update where a few files changed.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from wallpaper_selector.colorindex import ColorIndex, color_features  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    colors = rng.random((args.images, 3))
+
+    def extract(path: Path) -> np.ndarray:
+        pixels = colors[int(path.stem)] + rng.normal(0, 0.05, (1024, 3))
+        return color_features(np.clip(pixels, 0, 1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ColorIndex(Path(tmp) / "color-index.npz")
+        signatures = {Path(f"/wallpapers/{i}.png"): (i, i) for i in range(args.images)}
+
+        start = time.perf_counter()
+        index.update(signatures, extract)
+        print(f"  build: {args.images} vectors in {time.perf_counter() - start:6.2f} s")
+
+        # Ten files changed: only those are extracted again
+        for i in range(10):
+            signatures[Path(f"/wallpapers/{i}.png")] = (i, i + 1)
+        start = time.perf_counter()
+        extracted = index.update(signatures, extract)
+        print(f" update: {extracted} changed in {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        paths = list(signatures)
+        timings = []
+        for i in rng.integers(0, len(paths), args.queries):
+            start = time.perf_counter()
+            index.nearest(paths[i])
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  query: median {statistics.median(timings):6.2f} ms, max {max(timings):6.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
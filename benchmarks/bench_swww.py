@@ -0,0 +1,100 @@
+"""Benchmark swww daemon checks: socket probe vs subprocess
+
+Usage: python benchmarks/bench_swww.py [--iterations N]
+
+Runs a stand-in swww-daemon socket in a temporary XDG_RUNTIME_DIR and
+times the daemon check of the IPC backend against the ``pgrep`` path of
+the subprocess backend, plus how quickly the IPC backend notices a
+daemon that comes up late (the subprocess backend always sleeps 0.5 s).
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from wallpaper_selector.plugins.wallpaper.swww import SwwwBackend  # noqa: E402
+from wallpaper_selector.plugins.wallpaper.swww_ipc import (  # noqa: E402
+    SwwwIpcBackend, parse_query, socket_paths,
+)
+
+SAMPLE_QUERY = (
+    "eDP-1: 2560x1600, scale: 1.5, currently displaying: image: /home/u/Pictures/Wallpapers/a.png\n"
+    "HDMI-A-1: 3840x2160, scale: 1, currently displaying: color: 000000\n"
+)
+
+
+class StandInDaemon:
+    """Accepts and immediately closes connections, like an idle daemon"""
+
+    def __init__(self, path: Path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(str(path))
+        self.sock.listen(64)
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            conn.close()
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def timed(func, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    print(f"{name:>24}: median {statistics.median(timings):7.3f} ms, max {max(timings):7.3f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-swww-") as tmp:
+        os.environ["XDG_RUNTIME_DIR"] = tmp
+        os.environ["WAYLAND_DISPLAY"] = "wayland-bench"
+        path = socket_paths()[0]
+
+        ipc = SwwwIpcBackend()
+        daemon = StandInDaemon(path)
+        assert ipc.is_daemon_running()
+        report("socket probe", timed(ipc.is_daemon_running, args.iterations))
+        report("pgrep", timed(SwwwBackend().is_daemon_running, args.iterations))
+        report("parse query", timed(lambda: parse_query(SAMPLE_QUERY), args.iterations))
+        daemon.close()
+        path.unlink()
+        assert not ipc.is_daemon_running()
+
+        # Daemon that needs 50 ms to come up
+        timer = threading.Timer(0.05, lambda: StandInDaemon(path))
+        start = time.perf_counter()
+        timer.start()
+        ready = ipc.wait_until_ready()
+        print(f"{'readiness (50 ms start)':>24}: {(time.perf_counter() - start) * 1000:7.1f} ms "
+              f"({'ready' if ready else 'timed out'}; fixed sleep is 500 ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,111 +1,96 @@
-"""Entry point for wallpaper-selector command"""
+"""Entry point for wallpaper-selector command
 
-import os
-import subprocess
+Only argument parsing happens at import time. Each command imports
+what it needs when it runs, so the boot-time ``sync`` command never
+loads ``gi`` (GObject introspection, GTK) and starts in milliseconds.
+"""
+
+import argparse
 import sys
-from pathlib import Path
-
-from .app import WallpaperSelector
-from .config import load_config
-from .plugins.wallpaper import get_backend as get_wallpaper_backend
-from .plugins.colors import get_backend as get_color_backend
-from .sync import main as sync_main
-
-PID_FILE = Path("/tmp/wallpaper-selector.pid")
-
-
-def is_running() -> bool:
-    """Check if wallpaper selector is already running via PID file"""
-    if PID_FILE.exists():
-        try:
-            pid = int(PID_FILE.read_text().strip())
-            # Check if process is still running
-            os.kill(pid, 0)  # Raises OSError if process doesn't exist
-            return True
-        except (ValueError, OSError):
-            PID_FILE.unlink(missing_ok=True)
-    return False
-
-
-def kill_existing():
-    """Kill any existing wallpaper selector instances"""
-    if PID_FILE.exists():
-        try:
-            pid = int(PID_FILE.read_text().strip())
-            os.kill(pid, 15)  # SIGTERM
-        except (ValueError, OSError):
-            pass
-        PID_FILE.unlink(missing_ok=True)
-
-
-def check_wallpaper_dir(config) -> bool:
-    """Check if wallpaper directory has images"""
-    wallpaper_dir = config.wallpaper.directory
-    wallpaper_dir.mkdir(parents=True, exist_ok=True)
-
-    extensions = {f".{ext.lower()}" if not ext.startswith(".") else ext.lower()
-                  for ext in config.wallpaper.extensions}
-    for f in wallpaper_dir.iterdir():
-        if f.suffix.lower() in extensions:
-            return True
-    return False
+
+from .filters import FILTERS
+from .sorting import DEFAULT_SORT, SORT_ORDERS
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(
+        prog="wallpaper-selector",
+        description="Modern GTK4 wallpaper selector for Wayland/Niri",
+    )
+    parser.add_argument("--daemon", action="store_true",
+                        help="start resident with the window hidden")
+    parser.add_argument("--quit", action="store_true",
+                        help="stop the resident instance")
+    parser.add_argument("--filter", choices=list(FILTERS),
+                        help="open with only matching wallpapers shown")
+
+    commands = parser.add_subparsers(dest="command")
+
+    sync_parser = commands.add_parser("sync", help="sync cached wallpaper to the color generator")
+    sync_parser.add_argument("-v", "--verbose", action="store_true")
+
+    commands.add_parser("stats", help="show cache statistics from the last session")
+
+    precompute_parser = commands.add_parser(
+        "precompute-colors", help="generate color schemes for every wallpaper ahead of time")
+    precompute_parser.add_argument("-j", "--jobs", type=int,
+                                   help="concurrent generations (default: colors.precompute_jobs)")
+    precompute_parser.add_argument("--indexed", action="store_true",
+                                   help="use the library index as is, without rescanning")
+    precompute_parser.add_argument("-v", "--verbose", action="store_true")
+
+    list_parser = commands.add_parser("list", help="list wallpapers, newest first by default")
+    list_parser.add_argument("--filter", choices=list(FILTERS),
+                             help="only wallpapers matching the monitor aspect, 4K and up, or portrait")
+    list_parser.add_argument("--aspect", metavar="W:H",
+                             help="monitor aspect for --filter aspect (default: ask swww)")
+    list_parser.add_argument("--sort", choices=list(SORT_ORDERS), default=DEFAULT_SORT,
+                             help="list order (default: newest)")
+    list_parser.add_argument("-v", "--verbose", action="store_true",
+                             help="show dimensions and format")
+
+    dedupe_parser = commands.add_parser(
+        "dedupe", help="report groups of near-duplicate wallpapers")
+    dedupe_parser.add_argument("-d", "--distance", type=int,
+                               help="largest number of differing hash bits (default: 4)")
+    dedupe_parser.add_argument("-v", "--verbose", action="store_true",
+                               help="show hashing progress")
+    return parser
 
 
 def main():
     """Main entry point with CLI support"""
-    # Check for sync mode
-    if len(sys.argv) > 1 and sys.argv[1] == 'sync':
-        verbose = '--verbose' in sys.argv or '-v' in sys.argv
-        sys.exit(sync_main(verbose=verbose))
-
-    # Load config
-    config = load_config()
-
-    # Get wallpaper backend
-    backend_class = get_wallpaper_backend(config.wallpaper.backend.name)
-    if not backend_class:
-        print(f"Unknown wallpaper backend: {config.wallpaper.backend.name}")
-        sys.exit(1)
-    wallpaper_backend = backend_class()
-
-    # GUI mode: toggle behavior
-    # 1. If already running, kill and exit (toggle off)
-    if is_running():
-        kill_existing()
-        sys.exit(0)
-
-    # 2. Setup environment - ensure daemon is running
-    if not wallpaper_backend.is_daemon_running():
-        wallpaper_backend.start_daemon()
-
-    # 3. Check for wallpapers
-    if not check_wallpaper_dir(config):
-        subprocess.run([
-            'notify-send', 'Wallpaper Selector',
-            f'No wallpapers found in {config.wallpaper.directory}. Please add some images.'
-        ])
-        sys.exit(1)
-
-    # 4. Write PID file
-    PID_FILE.write_text(str(os.getpid()))
-
-    # 5. Get color generator if enabled
-    color_generator = None
-    if config.colors.enabled:
-        color_generator = get_color_backend(
-            config.colors.backend.name,
-            state_dir=config.colors.backend.state_dir,
-            config_dir=config.colors.backend.config_dir,
-            shell_dir=config.colors.backend.shell_dir,
-            session_file=config.colors.backend.session_file,
-        )
-
-    # 6. Launch the GTK application
-    app = WallpaperSelector(config, wallpaper_backend, color_generator)
-    try:
-        app.run(None)
-    finally:
-        PID_FILE.unlink(missing_ok=True)
+    args = build_parser().parse_args()
+
+    if args.command == "sync":
+        from .sync import main as sync_main
+        sys.exit(sync_main(verbose=args.verbose))
+
+    if args.command == "stats":
+        from .stats import main as stats_main
+        sys.exit(stats_main())
+
+    if args.command == "precompute-colors":
+        from .precompute import main as precompute_main
+        sys.exit(precompute_main(jobs=args.jobs, verbose=args.verbose, indexed=args.indexed))
+
+    if args.command == "list":
+        from .listing import main as list_main
+        sys.exit(list_main(filter_name=args.filter, aspect=args.aspect,
+                                 order=args.sort, verbose=args.verbose))
+
+    if args.command == "dedupe":
+        from .duplicates import DISTANCE, main as dedupe_main
+        distance = DISTANCE if args.distance is None else args.distance
+        sys.exit(dedupe_main(distance=distance, verbose=args.verbose))
+
+    if args.quit:
+        from .resident import quit_remote
+        sys.exit(0 if quit_remote() else 1)
+
+    from .gui import main as gui_main
+    sys.exit(gui_main(daemon=args.daemon, filter_name=args.filter))
 
 
 if __name__ == "__main__":
@@ -3,18 +3,40 @@
 import gi
 gi.require_version('Gtk', '4.0')
 
+import threading
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
-from gi.repository import Gtk, Gdk, Gio
+from typing import Callable, List, Optional, TYPE_CHECKING
+from gi.repository import Gtk, Gdk, Gio, GLib
 
-from .models.wallpaper_manager import WallpaperManager
+from .colorindex import ColorIndex, available as color_index_available
+from .duplicates import ensure_hashes, find_groups, redundant
+from .filters import FILTERS, make_filter
+from .library import ImageRecord, LibraryIndex, LibraryScan
+from .models.pipeline import SetWallpaperPipeline
+from .models.wallpaper_manager import WallpaperManager, wallpaper_extensions
 from .views.carousel_view import CarouselView
 from .views.grid_view import GridView
 from .styles import CSS
-from .cache import ensure_thumbnails_async
+from .thumbnail_cache import ThumbnailPool, ensure_thumbnails_async, evict_thumbnails
+from .plugins.colors import CachedColorGenerator
+from .precompute import has_completed as palette_precompute_done, spawn_background as spawn_palette_precompute
+from .prewarm import IDLE_DELAY_MS, Prewarmer
+from .resident import APPLICATION_ID
+from .sorting import DEFAULT_SORT, SORT_ORDERS
+from .stats import save_stats
+from .texture_cache import TextureCache
+from .watcher import WallpaperWatcher
+
+# Library scan batches merged per main loop iteration
+SCAN_BATCHES_PER_TICK = 1
+# Quiet time after the library changed before colors and duplicates are
+# resampled, so a scan or a batch copy is handled once
+RESAMPLE_DELAY_MS = 2000
 
 if TYPE_CHECKING:
     from .config import Config
+    from .views.base_view import BaseView
     from .plugins.wallpaper import WallpaperBackend
     from .plugins.colors import ColorGenerator
 
@@ -25,26 +47,94 @@ class WallpaperSelector(Gtk.Application):
         config: "Config",
         wallpaper_backend: "WallpaperBackend",
         color_generator: Optional["ColorGenerator"] = None,
+        resident: bool = False,
+        start_hidden: bool = False,
+        library: Optional[LibraryIndex] = None,
+        records: Optional[List[ImageRecord]] = None,
+        current_wallpaper: Optional["Future[Optional[str]]"] = None,
+        filter_name: Optional[str] = None,
+        scan: Optional[LibraryScan] = None,
     ):
         super().__init__(
-            application_id='com.github.wallpaper-selector',
+            application_id=APPLICATION_ID,
             flags=Gio.ApplicationFlags.FLAGS_NONE
         )
 
         self.config = config
+        # Resident mode: stay alive with the window hidden, toggled by
+        # activation from a second invocation
+        self.resident = resident
+        self.start_hidden = start_hidden
+        self.window: Optional[Gtk.ApplicationWindow] = None
+        self.library = library
+        # Walk of the collection roots; gui.main starts it early when the
+        # index is empty so the first batch can fill the window
+        self.scan = scan
+        # Idle source merging queued scan batches, while there is a backlog
+        self._scan_idle: Optional[int] = None
+        # Set when the scan added, changed or removed a wallpaper
+        self._scan_changed = False
+        # Dimension filter applied when the window is first built
+        self.filter_name = filter_name
+        self.filter_label: Optional[Gtk.Label] = None
+        # Color feature vectors for "similar wallpapers" (needs NumPy)
+        self.color_index: Optional[ColorIndex] = None
+        self.similar_to: Optional[Path] = None
+        # Timeout resampling colors and duplicates after library changes
+        self._resample_source = 0
+        # Background jobs by name; the value is called again once the
+        # running one finishes, if it was requested meanwhile
+        self._jobs: dict[str, Optional[Callable[[], None]]] = {}
 
         # Initialize wallpaper manager with plugins
         self.wallpaper_manager = WallpaperManager(
             config=config,
             wallpaper_backend=wallpaper_backend,
             color_generator=color_generator,
+            records=records,
+            load_current=current_wallpaper is None,
+        )
+
+        # Set wallpapers off the main loop, reporting stages back onto it
+        self.wallpaper_manager.pipeline = SetWallpaperPipeline(
+            self.wallpaper_manager,
+            on_stage=self.on_set_stage,
+            dispatch=GLib.idle_add,
         )
 
+        # Decoded thumbnails shared by both views
+        self.texture_cache = TextureCache(config.thumbnails.texture_cache_mb * 1024 * 1024)
+
+        # Readies the wallpapers likely to be set next while the selector is idle
+        self.prewarmer: Optional[Prewarmer] = None
+        self._prewarm_source = 0
+        if config.ui.prewarm_count > 0:
+            palettes = color_generator if isinstance(color_generator, CachedColorGenerator) else None
+            self.prewarmer = Prewarmer(
+                self.wallpaper_manager.usage,
+                generator=palettes if config.colors.enabled else None,
+                dispatch=GLib.idle_add,
+                count=config.ui.prewarm_count,
+            )
+
         # View management
         self.current_view = None  # 'carousel' or 'grid'
         self.carousel_view: Optional[CarouselView] = None
         self.grid_view: Optional[GridView] = None
         self.view_stack: Optional[Gtk.Stack] = None
+        self.thumbnail_pool: Optional[ThumbnailPool] = None
+        self.thumbnail_tiers: list[str] = []
+        self.watcher: Optional[WallpaperWatcher] = None
+        current = self.wallpaper_manager.get_current_wallpaper()
+        self._shown_current: Optional[Path] = Path(current) if current else None
+        # The current wallpaper may still be being queried at startup;
+        # the window is built without it and updated when it arrives
+        if current_wallpaper is not None:
+            if current_wallpaper.done():
+                self.on_current_wallpaper(current_wallpaper.result())
+            else:
+                current_wallpaper.add_done_callback(
+                    lambda future: GLib.idle_add(self.on_current_wallpaper, future.result()))
 
     def get_current_wallpaper(self) -> Optional[str]:
         """Get current wallpaper from backend"""
@@ -56,7 +146,60 @@ class WallpaperSelector(Gtk.Application):
 
     def set_wallpaper(self, path: Path):
         """Set wallpaper using wallpaper manager"""
-        self.wallpaper_manager.set_wallpaper(path)
+        self.wallpaper_manager.set_wallpaper_async(path)
+
+    def on_set_stage(self, path: Path, stage: str, ok: bool):
+        """Reflect set-wallpaper progress in the UI (main loop)"""
+        if not ok:
+            print(f"Setting {path.name} failed at stage: {stage}")
+            return
+        if stage == "backend":
+            # The previous wallpaper loses its marker, the new one gains it
+            for view in (self.carousel_view, self.grid_view):
+                if view:
+                    if self._shown_current and self._shown_current != path:
+                        view.set_current_wallpaper_indicator(self._shown_current, False)
+                    view.set_current_wallpaper_indicator(path, True)
+            self._shown_current = path
+            if self.prewarmer:
+                self.prewarmer.on_set(path)
+                self._schedule_prewarm()
+
+    def _schedule_prewarm(self, *_):
+        """Pre-warm once navigation has been quiet for IDLE_DELAY_MS"""
+        if self._prewarm_source:
+            GLib.source_remove(self._prewarm_source)
+        self._prewarm_source = GLib.timeout_add(IDLE_DELAY_MS, self._prewarm)
+
+    def _prewarm(self) -> bool:
+        """Warm the likely next wallpapers: those set after the current one
+        before, and the one shown in the carousel with its neighbours"""
+        self._prewarm_source = 0
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        if wallpapers and self.carousel_view:
+            index = self.carousel_view.carousel_index
+            nearby = [wallpapers[index]]
+            for offset in range(1, self.prewarmer.count):
+                nearby += [wallpapers[(index + offset) % len(wallpapers)],
+                           wallpapers[(index - offset) % len(wallpapers)]]
+            current = self.wallpaper_manager.get_current_wallpaper()
+            self.prewarmer.schedule(Path(current) if current else None, list(dict.fromkeys(nearby)))
+        return GLib.SOURCE_REMOVE
+
+    def on_current_wallpaper(self, current: Optional[str]):
+        """Apply the current wallpaper once the startup query returns (main loop)"""
+        if self.wallpaper_manager.pipeline.submitted:
+            # The user already picked a wallpaper; the query result is stale
+            return
+        self.wallpaper_manager.set_current_wallpaper(current)
+        if not current:
+            return
+        path = Path(current)
+        if self.carousel_view:
+            self.carousel_view.on_current_wallpaper_known(path)
+        if self.grid_view:
+            self.grid_view.set_current_wallpaper_indicator(path, True)
+        self._shown_current = path
 
     def toggle_view(self):
         """Toggle between grid and carousel view"""
@@ -76,11 +219,34 @@ class WallpaperSelector(Gtk.Application):
     def on_window_key_pressed(self, controller, keyval, keycode, state, window):
         """Handle window-level key presses"""
         if keyval == Gdk.KEY_Escape:
-            window.close()
+            view = self._visible_view()
+            if view.is_searching():
+                # Leave the search field, keeping the results
+                view.focus_results()
+                return True
+            if self.similar_to:
+                self.leave_similar()
+                return True
+            if self.resident:
+                window.set_visible(False)
+            else:
+                window.close()
             return True
         elif keyval == Gdk.KEY_Tab:
             self.toggle_view()
             return True
+        elif self._visible_view().is_searching():
+            # Typing in the search field
+            return False
+        elif keyval == Gdk.KEY_slash:
+            self._visible_view().focus_search()
+            return True
+        elif keyval in (Gdk.KEY_f, Gdk.KEY_F):
+            self.cycle_filter()
+            return True
+        elif keyval in (Gdk.KEY_o, Gdk.KEY_O):
+            self.cycle_sort_order()
+            return True
 
         # Delegate to current view for view-specific keys
         if self.current_view == 'carousel' and self.carousel_view:
@@ -92,8 +258,331 @@ class WallpaperSelector(Gtk.Application):
 
         return False
 
+    def _visible_view(self) -> "BaseView":
+        """The view on screen"""
+        return self.grid_view if self.current_view == 'grid' else self.carousel_view
+
+    def set_search(self, query: str):
+        """Show only wallpapers whose path contains every word of query"""
+        if query.split() == self.wallpaper_manager.search_query.split():
+            return
+        previous = self._shown_wallpaper()
+        self.similar_to = None
+        self.wallpaper_manager.set_search(query)
+
+        # Both views have a search field; keep them showing the same query
+        for view in (self.carousel_view, self.grid_view):
+            view.set_search_text(query)
+        self._show_list_change(previous)
+
+    def _shown_wallpaper(self) -> Optional[Path]:
+        """Wallpaper in the middle of the carousel"""
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        return wallpapers[self.carousel_view.carousel_index] if wallpapers else None
+
+    def _update_filter_label(self):
+        """Name the active filter and sort order or the similarity list,
+        hidden when showing everything newest first"""
+        parts = []
+        if self.similar_to:
+            parts.append(f"Similar to {self.similar_to.name}")
+        else:
+            if self.filter_name:
+                parts.append(f"Filter: {FILTERS[self.filter_name]}")
+            order = self.wallpaper_manager.sort_order
+            if order != DEFAULT_SORT:
+                parts.append(f"Sort: {SORT_ORDERS[order]}")
+        if parts:
+            count = len(self.wallpaper_manager.get_wallpapers())
+            self.filter_label.set_text(f"{' · '.join(parts)} ({count})")
+        self.filter_label.set_visible(bool(parts))
+
+    def _show_list_change(self, previous: Optional[Path]):
+        """Refresh the views after the wallpaper list was replaced"""
+        self._update_filter_label()
+        self.carousel_view.on_filter_changed(previous)
+        # A hidden grid is resynced when toggled to
+        if self.current_view == 'grid':
+            self.grid_view.update()
+
+    def show_similar(self, path: Path):
+        """Show the wallpapers closest in color to path, or leave that list"""
+        if self.similar_to:
+            self.leave_similar()
+            return
+        if not self.color_index:
+            print("Similar wallpapers need NumPy (pip install wallpaper-selector[native])")
+            return
+        ranked = self.color_index.nearest(path)
+        if not ranked:
+            print(f"Colors of {path.name} are not indexed yet")
+            return
+        self.similar_to = path
+        self.wallpaper_manager.set_ranked(ranked)
+        self._show_list_change(path)
+
+    def leave_similar(self):
+        """Return from the similar wallpapers to the full list"""
+        previous = self._shown_wallpaper()
+        self.similar_to = None
+        self.wallpaper_manager.set_ranked(None)
+        self._show_list_change(previous)
+
+    def _on_thumbnails_ready(self):
+        """Start the work that samples the thumbnails of the library"""
+        self._update_color_index()
+        if self.config.wallpaper.collapse_duplicates:
+            self._collapse_duplicates()
+
+    def _schedule_resample(self):
+        """Resample colors and duplicates once the library has been quiet
+        for RESAMPLE_DELAY_MS"""
+        if self._resample_source:
+            GLib.source_remove(self._resample_source)
+        self._resample_source = GLib.timeout_add(RESAMPLE_DELAY_MS, self._resample)
+
+    def _resample(self) -> bool:
+        """Sample the changed wallpapers once their thumbnails exist (main loop timeout)"""
+        if self.thumbnail_pool and self.thumbnail_pool.busy():
+            return GLib.SOURCE_CONTINUE
+        self._resample_source = 0
+        self._on_thumbnails_ready()
+        return GLib.SOURCE_REMOVE
+
+    def _start_job(self, name: str, work: Callable[[], None], again: Callable[[], None]):
+        """Run work on a background thread unless a job of that name is
+        running; then again() is called once it finishes instead, so the
+        newest state of the library is used"""
+        if name in self._jobs:
+            self._jobs[name] = again
+            return
+        self._jobs[name] = None
+
+        def run():
+            try:
+                work()
+            finally:
+                GLib.idle_add(self._finish_job, name)
+
+        threading.Thread(target=run, name=name, daemon=True).start()
+
+    def _finish_job(self, name: str) -> bool:
+        again = self._jobs.pop(name)
+        if again:
+            again()
+        return GLib.SOURCE_REMOVE
+
+    def _collapse_duplicates(self):
+        """Hide all but the best copy of near-duplicates, hashing on a
+        background thread"""
+        if not self.library:
+            return
+        records = list(self.wallpaper_manager.records.values())
+
+        def work():
+            hashes = ensure_hashes(self.library, records, self.config.thumbnails.workers)
+            by_path = {record.path: record for record in records}
+            hidden = redundant(find_groups(hashes), by_path)
+            GLib.idle_add(self._apply_duplicates, hidden)
+
+        self._start_job("duplicates", work, self._collapse_duplicates)
+
+    def _apply_duplicates(self, hidden: set):
+        """Show the list without the redundant copies (main loop)"""
+        previous = self._shown_wallpaper()
+        self.wallpaper_manager.set_duplicates(hidden)
+        self._show_list_change(previous)
+        return GLib.SOURCE_REMOVE
+
+    def _update_color_index(self):
+        """Index colors of new or changed wallpapers on a background thread"""
+        if not self.color_index:
+            return
+        signatures = self.wallpaper_manager.signatures()
+
+        def work():
+            if not len(self.color_index):
+                self.color_index.load()
+            self.color_index.update(signatures)
+
+        self._start_job("color-index", work, self._update_color_index)
+
+    def _get_monitor_size(self) -> Optional[tuple[int, int]]:
+        """Pixel size of the largest connected monitor"""
+        monitors = Gdk.Display.get_default().get_monitors()
+        sizes = []
+        for i in range(monitors.get_n_items()):
+            monitor = monitors.get_item(i)
+            geometry = monitor.get_geometry()
+            scale = monitor.get_scale_factor()
+            sizes.append((geometry.width * scale, geometry.height * scale))
+        return max(sizes, key=lambda size: size[0] * size[1], default=None)
+
+    def set_filter(self, name: Optional[str]):
+        """Show only wallpapers matching the named dimension filter (None = all)"""
+        wallpaper_filter = None
+        if name:
+            try:
+                wallpaper_filter = make_filter(name, self._get_monitor_size())
+            except ValueError as e:
+                print(f"Cannot apply filter {name}: {e}")
+                name = None
+        self.filter_name = name
+
+        previous = self._shown_wallpaper()
+        self.similar_to = None
+        self.wallpaper_manager.set_filter(wallpaper_filter)
+        self._show_list_change(previous)
+
+    def cycle_filter(self):
+        """Advance to the next dimension filter, wrapping around to none"""
+        names = [None, *FILTERS]
+        self.set_filter(names[(names.index(self.filter_name) + 1) % len(names)])
+
+    def cycle_sort_order(self):
+        """Advance to the next sort order, wrapping around"""
+        names = list(SORT_ORDERS)
+        order = names[(names.index(self.wallpaper_manager.sort_order) + 1) % len(names)]
+
+        previous = self._shown_wallpaper()
+        self.similar_to = None
+        self.wallpaper_manager.set_sort_order(order)
+        self._show_list_change(previous)
+
+    def _get_scale_factor(self) -> int:
+        """Largest scale factor among connected monitors"""
+        monitors = Gdk.Display.get_default().get_monitors()
+        scales = [monitors.get_item(i).get_scale_factor() for i in range(monitors.get_n_items())]
+        return max(scales, default=1)
+
+    def on_thumbnail_ready(self, path: Path, done: int, total: int):
+        """Refresh views that may be showing a freshly generated thumbnail"""
+        if self.carousel_view:
+            self.carousel_view.on_thumbnail_ready(path)
+
+    def _ensure_thumbnails(self, paths: List[Path]):
+        """Queue thumbnails for wallpapers that arrived after startup"""
+        if not self.thumbnail_pool:
+            self.thumbnail_pool = ThumbnailPool(self.config.thumbnails.workers)
+        self.thumbnail_pool.ensure(paths, self.thumbnail_tiers, progress_callback=self.on_thumbnail_ready)
+
+    def on_wallpapers_changed(self, kind: str, index: Optional[int], path: Optional[Path]):
+        """Keep thumbnails, views, colors and duplicates in step with the
+        wallpaper directory"""
+        if kind == "merged":
+            # Thumbnails are queued by _drain_library_scan
+            pass
+        elif kind == "removed":
+            self.texture_cache.invalidate(path)
+            evict_thumbnails(path)
+            if self.library:
+                self.library.forget(path)
+        else:
+            # Stale for a modified file
+            self.texture_cache.invalidate(path)
+            if self.library and not self.wallpaper_manager.get_record(path):
+                # Reported by the watcher rather than the index
+                record = self.library.refresh(path)
+                if record:
+                    self.wallpaper_manager.records[path] = record
+            self._ensure_thumbnails([path])
+
+        for view in (self.carousel_view, self.grid_view):
+            if view:
+                view.on_wallpapers_changed(kind, index, path)
+        # New wallpapers are sampled once their thumbnails exist; removing
+        # the best copy of near-duplicates uncovers the next one
+        self._schedule_resample()
+
+    def _start_library_scan(self):
+        """Walk the collection roots in the background, streaming what
+        changed since the index was written into the list"""
+        if self.scan is None:
+            wallpaper = self.config.wallpaper
+            self.scan = LibraryScan(self.library, wallpaper.roots,
+                                    wallpaper_extensions(self.config), wallpaper.recursive)
+        if not self.scan.started:
+            self.scan.start()
+        GLib.timeout_add(100, self._drain_library_scan)
+
+    def _merge_scan_batches(self) -> None:
+        """Merge up to SCAN_BATCHES_PER_TICK queued scan batches"""
+        for changes in self.scan.drain(SCAN_BATCHES_PER_TICK):
+            if changes.removed or changes.upserted:
+                self._scan_changed = True
+            for path in changes.removed:
+                self.wallpaper_manager.remove_wallpaper(path)
+            if changes.upserted:
+                self.wallpaper_manager.merge_wallpapers(changes.upserted)
+                self._ensure_thumbnails([record.path for record in changes.upserted])
+
+    def _drain_library_scan(self) -> bool:
+        """Poll the scan for new batches (main loop timeout).
+
+        Batches are merged SCAN_BATCHES_PER_TICK at a time, so drawing
+        and input run in between however many a large library queues up;
+        a backlog is worked off from an idle callback rather than one
+        batch per poll.
+        """
+        if self._scan_idle is None:
+            self._merge_scan_batches()
+            if self.scan.pending():
+                self._scan_idle = GLib.idle_add(self._drain_scan_backlog)
+        if self.scan.finished() and self._scan_idle is None:
+            self._start_palette_precompute()
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def _start_palette_precompute(self):
+        """Fill the palette store for the library at idle priority, once the
+        scan is over, if it found changes or no run has completed yet"""
+        colors = self.config.colors
+        generator = self.wallpaper_manager.color_generator
+        if not (colors.enabled and colors.precompute
+                and isinstance(generator, CachedColorGenerator) and generator.renders_aside):
+            return
+        if self._scan_changed or not palette_precompute_done():
+            spawn_palette_precompute()
+
+    def _drain_scan_backlog(self) -> bool:
+        """Merge queued scan batches while any are left (main loop idle)"""
+        self._merge_scan_batches()
+        if self.scan.pending():
+            return GLib.SOURCE_CONTINUE
+        self._scan_idle = None
+        return GLib.SOURCE_REMOVE
+
+    def toggle_window(self):
+        """Hide the window if shown, otherwise refresh and show it"""
+        if self.window.get_visible():
+            self.window.set_visible(False)
+            return
+
+        # State is warm; only the visible view needs a refresh
+        if self.current_view == 'carousel' and self.carousel_view:
+            self.carousel_view.update()
+        elif self.current_view == 'grid' and self.grid_view:
+            self.grid_view.update()
+        self.window.present()
+
+    def _on_close_request(self, window) -> bool:
+        """Hide instead of destroying the window in resident mode"""
+        window.set_visible(False)
+        return True
+
+    def do_startup(self):
+        """Register application actions"""
+        Gtk.Application.do_startup(self)
+        quit_action = Gio.SimpleAction.new("quit", None)
+        quit_action.connect("activate", lambda action, param: self.quit())
+        self.add_action(quit_action)
+
     def do_activate(self):
-        """Build and show the UI"""
+        """Build and show the UI, or toggle it if already built"""
+        if self.window:
+            self.toggle_window()
+            return
+
         wallpapers = self.wallpaper_manager.get_wallpapers()
 
         if not wallpapers:
@@ -111,9 +600,6 @@ class WallpaperSelector(Gtk.Application):
             dialog.destroy()
             return
 
-        # Pre-generate thumbnails in background for fast navigation
-        ensure_thumbnails_async(wallpapers)
-
         # Create main window
         win = Gtk.ApplicationWindow(application=self)
         win.set_title("Wallpaper Selector")
@@ -138,8 +624,40 @@ class WallpaperSelector(Gtk.Application):
         self.view_stack.set_vexpand(True)
 
         # Create views
-        self.carousel_view = CarouselView(self.wallpaper_manager)
-        self.grid_view = GridView(self.wallpaper_manager)
+        self.carousel_view = CarouselView(self.wallpaper_manager, self.texture_cache)
+        self.grid_view = GridView(self.wallpaper_manager, self.texture_cache)
+        self.carousel_view.on_search = self.set_search
+        self.carousel_view.on_show_similar = self.show_similar
+        if self.prewarmer:
+            self.carousel_view.on_settled = self._schedule_prewarm
+            self.prewarmer.warm_texture = self.carousel_view.prefetch
+        self.grid_view.on_search = self.set_search
+
+        # Pre-generate every tier the views display at this scale, on
+        # worker threads, for fast navigation
+        scale_factor = self._get_scale_factor()
+        tiers = self.carousel_view.thumbnail_tiers(scale_factor) | self.grid_view.thumbnail_tiers(scale_factor)
+        self.thumbnail_tiers = sorted(tiers)
+        # Color features and duplicate hashes are sampled from thumbnails,
+        # so they are computed once the thumbnails are in place
+        if color_index_available():
+            self.color_index = ColorIndex()
+        self.thumbnail_pool = ensure_thumbnails_async(
+            wallpapers,
+            callback=self._on_thumbnails_ready,
+            progress_callback=self.on_thumbnail_ready,
+            workers=self.config.thumbnails.workers,
+            tiers=self.thumbnail_tiers,
+        )
+
+        # Pick up images added to or removed from the directory while running
+        self.wallpaper_manager.add_change_listener(self.on_wallpapers_changed)
+        self.watcher = WallpaperWatcher(self.wallpaper_manager)
+        self.watcher.start()
+        # The list came from the index (or the scan's first batch); stream
+        # in the rest and changes made while the selector was not running
+        if self.library:
+            self._start_library_scan()
 
         # Add views to stack
         self.view_stack.add_named(self.grid_view.build(), "grid")
@@ -150,7 +668,18 @@ class WallpaperSelector(Gtk.Application):
         self.view_stack.set_visible_child_name("carousel")
         self.carousel_view.update()
 
+        # Active filter and sort order, hidden when showing everything newest first
+        self.filter_label = Gtk.Label()
+        self.filter_label.add_css_class("filter-label")
+        self.filter_label.set_margin_top(8)
+        self.filter_label.set_visible(False)
+        main_box.append(self.filter_label)
+
         main_box.append(self.view_stack)
+        if self.filter_name:
+            self.set_filter(self.filter_name)
+        else:
+            self._update_filter_label()
 
         # Add key handler to window (capture phase to intercept Tab before GTK)
         key_ctrl = Gtk.EventControllerKey()
@@ -158,5 +687,34 @@ class WallpaperSelector(Gtk.Application):
         key_ctrl.connect("key-pressed", self.on_window_key_pressed, win)
         win.add_controller(key_ctrl)
 
+        self.window = win
+        if self.resident:
+            # Keep running while the window is hidden
+            self.hold()
+            win.connect("close-request", self._on_close_request)
+
         # Present window
-        win.present()
+        if not self.start_hidden:
+            win.present()
+
+    def do_shutdown(self):
+        """Stop background work before the application exits"""
+        if self.watcher:
+            self.watcher.stop()
+        if self.thumbnail_pool:
+            self.thumbnail_pool.shutdown()
+        self.texture_cache.shutdown()
+        if self.prewarmer:
+            self.prewarmer.shutdown()
+        # Let a wallpaper change the user already confirmed run to completion
+        self.wallpaper_manager.pipeline.wait()
+        sections = {
+            "texture_cache": self.texture_cache.stats(),
+            "set_pipeline": self.wallpaper_manager.pipeline.stats(),
+        }
+        if self.carousel_view:
+            sections["navigation"] = self.carousel_view.navigation.stats()
+        if self.prewarmer:
+            sections["prewarm"] = self.prewarmer.stats()
+        save_stats(sections)
+        Gtk.Application.do_shutdown(self)
@@ -0,0 +1,214 @@
+"""Color index - find wallpapers that look alike
+
+Every wallpaper is reduced to a color feature vector: a coarse CIELAB
+histogram of its small cached thumbnail, square-rooted so that the
+Euclidean distance between two vectors approximates the Hellinger
+distance of their color distributions. The vectors of the whole library
+live in one NumPy array saved as ``COLOR_INDEX``, next to the
+(size, mtime_ns) signature each row was computed from, so an update only
+processes new or changed files. A nearest-neighbour query is a single
+matrix-vector product over that array, with the squared norms of the
+rows computed in advance.
+
+Requires the optional ``numpy`` dependency (``pip install
+wallpaper-selector[native]``).
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+from .cache import CACHE_DIR
+
+COLOR_INDEX = CACHE_DIR / "color-index.npz"
+
+# Histogram bins over L* [0, 100] and a*, b* [-64, 64) (clipped)
+L_BINS = 4
+AB_BINS = 6
+AB_RANGE = 64.0
+FEATURES = L_BINS * AB_BINS * AB_BINS
+# Wallpapers shown by a similarity query, including the query image
+SIMILAR_COUNT = 24
+# Save progress after this many new vectors
+SAVE_EVERY = 1000
+
+# Linear sRGB to CIE XYZ (D65), rows pre-divided by the white point
+_RGB_TO_XYZ = (
+    (0.4124 / 0.95047, 0.3576 / 0.95047, 0.1805 / 0.95047),
+    (0.2126, 0.7152, 0.0722),
+    (0.0193 / 1.08883, 0.1192 / 1.08883, 0.9505 / 1.08883),
+)
+
+
+def available() -> bool:
+    """Check if NumPy is installed"""
+    return np is not None
+
+
+def srgb_to_lab(rgb: "np.ndarray") -> "np.ndarray":
+    """(N, 3) sRGB in [0, 1] to CIELAB"""
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.asarray(_RGB_TO_XYZ).T
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([
+        116 * f[:, 1] - 16,
+        500 * (f[:, 0] - f[:, 1]),
+        200 * (f[:, 1] - f[:, 2]),
+    ], axis=1)
+
+
+def color_features(pixels: "np.ndarray") -> "np.ndarray":
+    """Feature vector of (N, 3) float sRGB pixels"""
+    lab = srgb_to_lab(pixels)
+    l_bin = np.clip((lab[:, 0] * (L_BINS / 100)).astype(np.intp), 0, L_BINS - 1)
+    ab = np.clip(((lab[:, 1:] + AB_RANGE) * (AB_BINS / (2 * AB_RANGE))).astype(np.intp), 0, AB_BINS - 1)
+    bins = (l_bin * AB_BINS + ab[:, 0]) * AB_BINS + ab[:, 1]
+    histogram = np.bincount(bins, minlength=FEATURES).astype(np.float32)
+    return np.sqrt(histogram / max(1, len(pixels)))
+
+
+def wallpaper_features(path: Path) -> "np.ndarray":
+    """Feature vector of a wallpaper, sampled from its small thumbnail"""
+    from .plugins.colors.native import load_pixels
+
+    return color_features(load_pixels(path))
+
+
+class ColorIndex:
+    """Color feature vectors of the library with nearest-neighbour search.
+
+    update() may run on a background thread while nearest() is called
+    from the main loop; the arrays are swapped in whole under a lock.
+    """
+
+    def __init__(self, path: Path = COLOR_INDEX):
+        self.path = path
+        self._lock = threading.Lock()
+        self.paths: list[Path] = []
+        self._rows: dict[Path, int] = {}
+        self.signatures = np.zeros((0, 2), dtype=np.int64)
+        self.features = np.zeros((0, FEATURES), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _swap(self, paths: list[Path], signatures: "np.ndarray", features: "np.ndarray") -> None:
+        with self._lock:
+            self.paths = paths
+            self._rows = {path: row for row, path in enumerate(paths)}
+            self.signatures = signatures
+            self.features = features
+            self._norms = np.einsum("ij,ij->i", features, features)
+
+    def load(self) -> None:
+        """Read the saved index, if any"""
+        try:
+            with np.load(self.path) as data:
+                features = data["features"]
+                if features.shape[1] != FEATURES:
+                    # Saved with other histogram settings
+                    return
+                self._swap([Path(p) for p in data["paths"]], data["signatures"], features)
+        except (OSError, ValueError, KeyError):
+            return
+
+    def save(self) -> None:
+        """Write the index, replacing the old file atomically"""
+        with self._lock:
+            paths, signatures, features = self.paths, self.signatures, self.features
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, paths=np.array([str(p) for p in paths], dtype=str),
+                     signatures=signatures, features=features)
+        os.replace(tmp_path, self.path)
+
+    def update(
+        self,
+        signatures: dict[Path, tuple[int, int]],
+        extract: Callable[[Path], "np.ndarray"] = wallpaper_features,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> int:
+        """Index exactly the wallpapers in signatures (path -> (size, mtime_ns)).
+
+        Rows of vanished wallpapers are dropped, and features are only
+        extracted for new or changed ones. Returns how many were extracted.
+        """
+        with self._lock:
+            rows, old_signatures, old_features = self._rows, self.signatures, self.features
+        keep = [(path, rows[path]) for path, signature in signatures.items()
+                if path in rows and tuple(old_signatures[rows[path]]) == signature]
+        kept = {path for path, _ in keep}
+        stale = [path for path in signatures if path not in kept]
+
+        keep_rows = np.array([row for _, row in keep], dtype=np.intp)
+        paths = [path for path, _ in keep]
+        sig_blocks = [old_signatures[keep_rows]]
+        feature_blocks = [old_features[keep_rows]]
+        changed = len(keep) != len(rows)
+        if changed:
+            self._swap(paths, sig_blocks[0], feature_blocks[0])
+
+        new_paths: list[Path] = []
+        new_signatures: list[tuple[int, int]] = []
+        new_features: list["np.ndarray"] = []
+
+        def commit() -> None:
+            nonlocal paths
+            paths = paths + new_paths
+            sig_blocks.append(np.array(new_signatures, dtype=np.int64).reshape(-1, 2))
+            feature_blocks.append(np.stack(new_features))
+            new_paths.clear()
+            new_signatures.clear()
+            new_features.clear()
+            self._swap(paths, np.concatenate(sig_blocks), np.concatenate(feature_blocks))
+
+        extracted = 0
+        for done, path in enumerate(stale, 1):
+            try:
+                features = extract(path)
+            except Exception as e:
+                print(f"Error indexing colors of {path}: {e}")
+                continue
+            new_paths.append(path)
+            new_signatures.append(signatures[path])
+            new_features.append(features)
+            extracted += 1
+            if len(new_paths) >= SAVE_EVERY:
+                # Queries see (and a restart keeps) what is done so far
+                commit()
+                self.save()
+            if progress_callback:
+                progress_callback(done, len(stale))
+        if new_paths:
+            commit()
+        if changed or extracted:
+            self.save()
+        return extracted
+
+    def nearest(self, path: Path, count: int = SIMILAR_COUNT) -> list[Path]:
+        """Indexed wallpapers closest in color to path, nearest (path itself) first.
+
+        Empty if path is not indexed yet.
+        """
+        with self._lock:
+            row = self._rows.get(path)
+            paths, features, norms = self.paths, self.features, self._norms
+        if row is None:
+            return []
+        # |a - q|^2 = |a|^2 - 2 a.q + |q|^2, the last term being the same for all
+        distances = norms - 2 * (features @ features[row])
+        count = min(count, len(paths))
+        # Partial selection of the closest, then sort just those
+        closest = np.argpartition(distances, count - 1)[:count]
+        closest = closest[np.argsort(distances[closest], kind="stable")]
+        # Ties (e.g. duplicates) may put another row ahead of the query
+        ranked = [paths[i] for i in closest if i != row]
+        return [path, *ranked][:count]
@@ -33,9 +33,18 @@ class WallpaperBackendConfig:
 class WallpaperConfig:
     """Wallpaper settings"""
     directory: Path = field(default_factory=lambda: Path.home() / "Pictures" / "Wallpapers")
+    extra_directories: List[Path] = field(default_factory=list)  # Further collection roots
+    recursive: bool = False  # Include images in subdirectories
+    collapse_duplicates: bool = False  # Show only the best copy of near-duplicates
+    sort: str = "newest"  # List order, one of sorting.SORT_ORDERS
     extensions: List[str] = field(default_factory=lambda: ["png", "jpg", "jpeg", "webp", "gif", "bmp"])
     backend: WallpaperBackendConfig = field(default_factory=WallpaperBackendConfig)
 
+    @property
+    def roots(self) -> List[Path]:
+        """Every collection root, main directory first"""
+        return [self.directory, *self.extra_directories]
+
 
 @dataclass
 class ColorsBackendConfig:
@@ -45,20 +54,36 @@ class ColorsBackendConfig:
     config_dir: Path = field(default_factory=lambda: Path.home() / ".config" / "DankMaterialShell")
     shell_dir: Path = field(default_factory=lambda: Path("/usr/share/quickshell/dms"))
     session_file: Path = field(default_factory=lambda: Path.home() / ".local" / "state" / "DankMaterialShell" / "session.json")
+    # DMS: run matugen against scratch directories so palettes can be
+    # cached; off by default, misses then generate in place, uncached
+    render_aside: bool = False
 
 
 @dataclass
 class ColorsConfig:
     """Color generation settings"""
     enabled: bool = True
+    palette_cache_mb: int = 32  # Palettes generated on demand kept per wallpaper (0 = off)
+    precompute: bool = False  # Generate palettes for the library in the background
+    precompute_jobs: int = 2  # Concurrent palette generations
     backend: ColorsBackendConfig = field(default_factory=ColorsBackendConfig)
 
 
+@dataclass
+class ThumbnailConfig:
+    """Thumbnail cache settings"""
+    workers: int = 0  # 0 = one worker per CPU core
+    texture_cache_mb: int = 256  # Decoded textures kept in memory
+
+
 @dataclass
 class UIConfig:
     """UI settings"""
     window_width: int = 1100
     window_height: int = 550
+    prefetch_radius: int = 2  # Carousel neighbours loaded ahead on each side
+    prewarm_count: int = 3  # Likely next wallpapers readied while idle (0 = off)
+    resident: bool = False  # Keep running hidden between opens
 
 
 @dataclass
@@ -66,6 +91,7 @@ class Config:
     """Main configuration"""
     wallpaper: WallpaperConfig = field(default_factory=WallpaperConfig)
     colors: ColorsConfig = field(default_factory=ColorsConfig)
+    thumbnails: ThumbnailConfig = field(default_factory=ThumbnailConfig)
     ui: UIConfig = field(default_factory=UIConfig)
 
 
@@ -84,6 +110,10 @@ def _parse_wallpaper(data: dict) -> WallpaperConfig:
     backend_data = data.get("backend", {})
     return WallpaperConfig(
         directory=expand_path(data.get("directory", "~/Pictures/Wallpapers")),
+        extra_directories=[expand_path(d) for d in data.get("extra_directories", [])],
+        recursive=data.get("recursive", False),
+        collapse_duplicates=data.get("collapse_duplicates", False),
+        sort=data.get("sort", "newest"),
         extensions=data.get("extensions", ["png", "jpg", "jpeg", "webp", "gif", "bmp"]),
         backend=_parse_wallpaper_backend(backend_data),
     )
@@ -97,6 +127,7 @@ def _parse_colors_backend(data: dict) -> ColorsBackendConfig:
         config_dir=expand_path(data.get("config_dir", "~/.config/DankMaterialShell")),
         shell_dir=Path(data.get("shell_dir", "/usr/share/quickshell/dms")),
         session_file=expand_path(data.get("session_file", "~/.local/state/DankMaterialShell/session.json")),
+        render_aside=data.get("render_aside", False),
     )
 
 
@@ -105,15 +136,29 @@ def _parse_colors(data: dict) -> ColorsConfig:
     backend_data = data.get("backend", {})
     return ColorsConfig(
         enabled=data.get("enabled", True),
+        palette_cache_mb=data.get("palette_cache_mb", 32),
+        precompute=data.get("precompute", False),
+        precompute_jobs=data.get("precompute_jobs", 2),
         backend=_parse_colors_backend(backend_data),
     )
 
 
+def _parse_thumbnails(data: dict) -> ThumbnailConfig:
+    """Parse thumbnail config from TOML dict"""
+    return ThumbnailConfig(
+        workers=data.get("workers", 0),
+        texture_cache_mb=data.get("texture_cache_mb", 256),
+    )
+
+
 def _parse_ui(data: dict) -> UIConfig:
     """Parse UI config from TOML dict"""
     return UIConfig(
         window_width=data.get("window_width", 1100),
         window_height=data.get("window_height", 550),
+        prefetch_radius=data.get("prefetch_radius", 2),
+        prewarm_count=data.get("prewarm_count", 3),
+        resident=data.get("resident", False),
     )
 
 
@@ -131,6 +176,7 @@ def load_config() -> Config:
         return Config(
             wallpaper=_parse_wallpaper(data.get("wallpaper", {})),
             colors=_parse_colors(data.get("colors", {})),
+            thumbnails=_parse_thumbnails(data.get("thumbnails", {})),
             ui=_parse_ui(data.get("ui", {})),
         )
     except Exception as e:
@@ -146,9 +192,18 @@ def save_config(config: Config) -> None:
 
 [wallpaper]
 directory = "{config.wallpaper.directory}"
+# More directories to collect wallpapers from, e.g. ["~/Pictures/Art"]
+extra_directories = {[str(d) for d in config.wallpaper.extra_directories]}
+# Also collect images from subdirectories
+recursive = {str(config.wallpaper.recursive).lower()}
+# Show only the highest resolution copy of near-duplicate images
+collapse_duplicates = {str(config.wallpaper.collapse_duplicates).lower()}
+# List order: "newest", "name", "size", "resolution", "most-used" or "recent"
+sort = "{config.wallpaper.sort}"
 extensions = {config.wallpaper.extensions}
 
 [wallpaper.backend]
+# "swww", or "swww-ipc" to probe the daemon socket instead of forking
 name = "{config.wallpaper.backend.name}"
 transition_type = "{config.wallpaper.backend.transition_type}"
 transition_duration = {config.wallpaper.backend.transition_duration}
@@ -156,17 +211,41 @@ transition_fps = {config.wallpaper.backend.transition_fps}
 
 [colors]
 enabled = {str(config.colors.enabled).lower()}
+# Keep generated palettes per wallpaper so switching back is instant (0 = off).
+# Palettes precomputed for the library are kept on top of this budget.
+palette_cache_mb = {config.colors.palette_cache_mb}
+# Generate palettes for the whole library in the background at idle priority,
+# after the selector's library scan; needs a backend that renders aside
+precompute = {str(config.colors.precompute).lower()}
+precompute_jobs = {config.colors.precompute_jobs}
 
 [colors.backend]
+# "dms" (matugen) or "native" (in-process, needs numpy)
 name = "{config.colors.backend.name}"
 state_dir = "{config.colors.backend.state_dir}"
 config_dir = "{config.colors.backend.config_dir}"
 shell_dir = "{config.colors.backend.shell_dir}"
 session_file = "{config.colors.backend.session_file}"
+# Experimental, DMS only: render palettes in scratch directories so they
+# can be cached and precomputed. Relies on matugen rendering templates in
+# the environment of the `dms` command that queued it.
+render_aside = {str(config.colors.backend.render_aside).lower()}
+
+[thumbnails]
+# Number of thumbnail worker threads (0 = one per CPU core)
+workers = {config.thumbnails.workers}
+# Memory budget for decoded thumbnails shared by all views
+texture_cache_mb = {config.thumbnails.texture_cache_mb}
 
 [ui]
 window_width = {config.ui.window_width}
 window_height = {config.ui.window_height}
+# Carousel neighbours loaded ahead on each side of the current image
+prefetch_radius = {config.ui.prefetch_radius}
+# Wallpapers likely to be set next, readied while the selector is idle (0 = off)
+prewarm_count = {config.ui.prewarm_count}
+# Keep the selector running hidden so opening it is instant
+resident = {str(config.ui.resident).lower()}
 '''
 
     with open(CONFIG_FILE, "w") as f:
@@ -0,0 +1,216 @@
+"""Duplicate detection - perceptual hashes of the cached thumbnails
+
+Each wallpaper gets a 64-bit difference hash (dHash): its small thumbnail
+is shrunk to 9x8 gray pixels and every bit records whether a pixel is
+brighter than its right neighbour. Re-encodes and resized copies of an
+image differ in at most a few bits. Hashes are stored in the library
+index, so each file is only hashed once.
+
+Near-duplicates are found with a multi-index hash instead of comparing
+all pairs: the hash is cut into DISTANCE + 1 chunks, and by the pigeonhole
+principle two hashes at most DISTANCE bits apart agree exactly on at
+least one chunk. Only wallpapers sharing a chunk value are compared.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .library import ImageRecord, LibraryIndex
+
+# Thumbnail tier the hash is computed from
+HASH_TIER = "small"
+# Largest number of differing bits between near-duplicates
+DISTANCE = 4
+HASH_BITS = 64
+
+
+def dhash_pixels(gray: list[int]) -> int:
+    """dHash of 9x8 row-major gray values"""
+    value = 0
+    for y in range(8):
+        row = gray[y * 9:(y + 1) * 9]
+        for x in range(8):
+            value = (value << 1) | (row[x] > row[x + 1])
+    return value
+
+
+def dhash(path: Path) -> Optional[int]:
+    """dHash of a wallpaper from its cached thumbnail; None on failure"""
+    from gi.repository import GdkPixbuf
+    from .thumbnail_cache import get_thumbnail
+
+    thumbnail = get_thumbnail(path, HASH_TIER)
+    if thumbnail is None:
+        return None
+    try:
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file(str(thumbnail))
+    except Exception as e:
+        print(f"Error hashing {path}: {e}")
+        return None
+    # Box filter, so every source pixel contributes
+    small = pixbuf.scale_simple(9, 8, GdkPixbuf.InterpType.TILES)
+    data = small.get_pixels()
+    channels, rowstride = small.get_n_channels(), small.get_rowstride()
+    gray = []
+    for y in range(8):
+        for x in range(9):
+            i = y * rowstride + x * channels
+            gray.append(299 * data[i] + 587 * data[i + 1] + 114 * data[i + 2])
+    return dhash_pixels(gray)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits"""
+    return (a ^ b).bit_count()
+
+
+class HashIndex:
+    """Multi-index hash table answering "which hashes are within distance"
+    without scanning all of them"""
+
+    def __init__(self, distance: int = DISTANCE):
+        self.distance = distance
+        chunks = distance + 1
+        bounds = [HASH_BITS * i // chunks for i in range(chunks + 1)]
+        # (shift, mask) of each chunk
+        self._chunks = [(low, (1 << (high - low)) - 1) for low, high in zip(bounds, bounds[1:])]
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._chunks]
+        self.hashes: list[int] = []
+
+    def add(self, value: int) -> int:
+        """Insert a hash, returning its id"""
+        item = len(self.hashes)
+        self.hashes.append(value)
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            table.setdefault((value >> shift) & mask, []).append(item)
+        return item
+
+    def near(self, value: int) -> set[int]:
+        """Ids of the hashes at most distance bits from value"""
+        found = set()
+        for table, (shift, mask) in zip(self._tables, self._chunks):
+            for item in table.get((value >> shift) & mask, ()):
+                if item not in found and hamming(value, self.hashes[item]) <= self.distance:
+                    found.add(item)
+        return found
+
+
+def find_groups(hashes: dict[Path, int], distance: int = DISTANCE) -> list[list[Path]]:
+    """Groups of two or more near-duplicate wallpapers.
+
+    Near-duplicates are joined transitively: a chain of small differences
+    forms one group.
+    """
+    paths = list(hashes)
+    index = HashIndex(distance)
+    parent = list(range(len(paths)))
+
+    def root(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    # Each pair is seen once: a wallpaper is matched against those before it
+    for item, path in enumerate(paths):
+        for other in index.near(hashes[path]):
+            a, b = root(item), root(other)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+        index.add(hashes[path])
+
+    groups: dict[int, list[Path]] = {}
+    for item, path in enumerate(paths):
+        groups.setdefault(root(item), []).append(path)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def best(group: Iterable[Path], records: dict[Path, ImageRecord]) -> Path:
+    """Member to keep: most pixels, then largest file, then newest"""
+    def rank(path: Path) -> tuple[int, int, int]:
+        record = records[path]
+        return ((record.width or 0) * (record.height or 0), record.size, record.mtime_ns)
+    return max(group, key=rank)
+
+
+def redundant(groups: list[list[Path]], records: dict[Path, ImageRecord]) -> set[Path]:
+    """Every member but the best of each group"""
+    hidden = set()
+    for group in groups:
+        keep = best(group, records)
+        hidden.update(path for path in group if path != keep)
+    return hidden
+
+
+def ensure_hashes(
+    library: LibraryIndex,
+    records: Iterable[ImageRecord],
+    workers: int = 0,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> dict[Path, int]:
+    """Perceptual hash of every record, computing and storing missing ones"""
+    hashes = {}
+    missing = []
+    for record in records:
+        if record.dhash is not None:
+            hashes[record.path] = record.dhash
+        else:
+            missing.append(record)
+
+    computed = {}
+    if not missing:
+        return hashes
+    from .thumbnail_cache import resolve_workers
+
+    with ThreadPoolExecutor(max_workers=resolve_workers(workers), thread_name_prefix="dhash") as executor:
+        for done, (record, value) in enumerate(
+                zip(missing, executor.map(lambda r: dhash(r.path), missing)), 1):
+            if value is not None:
+                record.dhash = value
+                computed[record.path] = value
+            if progress_callback:
+                progress_callback(done, len(missing))
+    if computed:
+        library.set_dhashes(computed)
+    hashes.update(computed)
+    return hashes
+
+
+def _format_size(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def main(distance: int = DISTANCE, verbose: bool = False) -> int:
+    """Report near-duplicate groups - returns 0 on success"""
+    from .config import load_config
+    from .models.wallpaper_manager import wallpaper_extensions
+
+    config = load_config()
+    wallpaper = config.wallpaper
+    library = LibraryIndex()
+    library.reconcile(wallpaper.roots, wallpaper_extensions(config), wallpaper.recursive)
+    records = {record.path: record for record in library.load(wallpaper.roots)}
+
+    def report(done: int, total: int) -> None:
+        if verbose and (done == total or done % 100 == 0):
+            print(f"dedupe: hashed {done}/{total}")
+
+    hashes = ensure_hashes(library, records.values(), config.thumbnails.workers, report)
+    groups = find_groups(hashes, distance)
+
+    wasted = 0
+    for group in sorted(groups, key=lambda g: str(best(g, records))):
+        keep = best(group, records)
+        for path in [keep, *sorted(p for p in group if p != keep)]:
+            record = records[path]
+            size = f"{record.width}x{record.height}" if record.width else "?"
+            print(f"{'*' if path == keep else ' '} {size:>11} {record.format or '?':<5} {path}")
+            if path != keep:
+                wasted += record.size
+        print()
+
+    duplicates = sum(len(group) - 1 for group in groups)
+    print(f"dedupe: {len(groups)} groups, {duplicates} duplicates ({_format_size(wasted)}); "
+          f"* marks the copy kept by collapse_duplicates")
+    return 0
@@ -0,0 +1,49 @@
+"""Wallpaper filters on pixel dimensions"""
+
+from typing import Callable, Optional
+
+# Called as filter(width, height)
+DimensionFilter = Callable[[int, int], bool]
+
+# Relative difference in aspect ratio still counted as a match
+ASPECT_TOLERANCE = 0.03
+UHD_SIZE = (3840, 2160)
+
+# Filter names in the order the GUI cycles through them, with labels
+FILTERS = {
+    "aspect": "Monitor aspect",
+    "4k": "4K and up",
+    "portrait": "Portrait",
+}
+
+
+def parse_aspect(text: str) -> tuple[int, int]:
+    """Parse "16:9", "21x9" or "2560x1080" into a (width, height) pair"""
+    for separator in (":", "x"):
+        if separator in text:
+            width, height = text.split(separator, 1)
+            try:
+                size = int(width), int(height)
+            except ValueError:
+                break
+            if min(size) <= 0:
+                break
+            return size
+    raise ValueError(f"Invalid aspect ratio: {text}")
+
+
+def make_filter(name: str, monitor_size: Optional[tuple[int, int]] = None) -> DimensionFilter:
+    """Build the named filter; "aspect" needs the monitor's (width, height)"""
+    if name == "aspect":
+        if not monitor_size or min(monitor_size) <= 0:
+            raise ValueError("The aspect filter needs the monitor size")
+        target = monitor_size[0] / monitor_size[1]
+        return lambda width, height: (height > 0
+                                      and abs(width / height - target) <= target * ASPECT_TOLERANCE)
+    if name == "4k":
+        # Either orientation
+        return lambda width, height: (max(width, height) >= UHD_SIZE[0]
+                                      and min(width, height) >= UHD_SIZE[1])
+    if name == "portrait":
+        return lambda width, height: height > width
+    raise ValueError(f"Unknown filter: {name}")
@@ -0,0 +1,141 @@
+"""GUI launcher - environment checks and GTK application startup"""
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .config import load_config
+from .library import LibraryIndex, LibraryScan
+from .models.wallpaper_manager import wallpaper_extensions
+from .plugins.wallpaper import get_backend as get_wallpaper_backend
+from .palettes import get_palette_store
+from .plugins.colors import get_backend as get_color_backend
+from .resident import activate_remote
+
+PID_FILE = Path("/tmp/wallpaper-selector.pid")
+
+
+def is_running() -> bool:
+    """Check if wallpaper selector is already running via PID file"""
+    if PID_FILE.exists():
+        try:
+            pid = int(PID_FILE.read_text().strip())
+            # Check if process is still running
+            os.kill(pid, 0)  # Raises OSError if process doesn't exist
+            return True
+        except (ValueError, OSError):
+            PID_FILE.unlink(missing_ok=True)
+    return False
+
+
+def kill_existing():
+    """Kill any existing wallpaper selector instances"""
+    if PID_FILE.exists():
+        try:
+            pid = int(PID_FILE.read_text().strip())
+            os.kill(pid, 15)  # SIGTERM
+        except (ValueError, OSError):
+            pass
+        PID_FILE.unlink(missing_ok=True)
+
+
+def query_current_wallpaper(wallpaper_backend) -> str | None:
+    """Make sure the wallpaper daemon runs, then ask it for the current wallpaper"""
+    if not wallpaper_backend.is_daemon_running():
+        wallpaper_backend.start_daemon()
+    return wallpaper_backend.get_current_wallpaper()
+
+
+def main(daemon: bool = False, filter_name: str | None = None) -> int:
+    """Launch the selector GUI (or toggle a running one)"""
+    # Load config
+    config = load_config()
+
+    # A resident instance is toggled over D-Bus before any startup work,
+    # whatever this invocation's settings: it may have been started with
+    # --daemon while the config leaves resident off. The call does not
+    # auto-start anything and fails fast when no instance is registered.
+    # A non-resident instance (PID file) is toggled off below instead.
+    resident = daemon or config.ui.resident
+    if not is_running() and activate_remote():
+        return 0
+
+    # Get wallpaper backend
+    backend_class = get_wallpaper_backend(config.wallpaper.backend.name)
+    if not backend_class:
+        print(f"Unknown wallpaper backend: {config.wallpaper.backend.name}")
+        return 1
+    wallpaper_backend = backend_class()
+
+    # GUI mode: toggle behavior
+    # 1. If already running, kill and exit (toggle off)
+    if not resident and is_running():
+        kill_existing()
+        return 0
+
+    # 2. Independent startup work runs concurrently: the daemon check and
+    # current-wallpaper query, and the library index read that the empty
+    # check and the wallpaper list share. Meanwhile the main thread sets
+    # up the color backend and imports GTK.
+    library = LibraryIndex()
+    roots = config.wallpaper.roots
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+    current_future = executor.submit(query_current_wallpaper, wallpaper_backend)
+    records_future = executor.submit(library.load, roots)
+    executor.shutdown(wait=False)
+
+    # 3. Get color generator if enabled
+    color_generator = None
+    if config.colors.enabled:
+        color_generator = get_color_backend(
+            config.colors.backend.name,
+            state_dir=config.colors.backend.state_dir,
+            config_dir=config.colors.backend.config_dir,
+            shell_dir=config.colors.backend.shell_dir,
+            session_file=config.colors.backend.session_file,
+            render_aside=config.colors.backend.render_aside,
+            palette_store=get_palette_store(config),
+        )
+
+    # Imported late: a resident toggle above must not pay for loading GTK
+    from .app import WallpaperSelector
+
+    # 4. Check for wallpapers - the window only needs the list; the
+    # current wallpaper is filled in when the query returns. With nothing
+    # indexed yet, walk the roots and open on the first batch found; the
+    # rest streams in while the window is up.
+    records = records_future.result()
+    scan = LibraryScan(library, roots, wallpaper_extensions(config), config.wallpaper.recursive)
+    if not records:
+        config.wallpaper.directory.mkdir(parents=True, exist_ok=True)
+        scan.start()
+        first = scan.first_batch()
+        records = first.upserted if first else []
+    if not records:
+        subprocess.run([
+            'notify-send', 'Wallpaper Selector',
+            f'No wallpapers found in {config.wallpaper.directory}. Please add some images.'
+        ])
+        return 1
+
+    # 5. Write PID file (resident instances are found over D-Bus instead)
+    if not resident:
+        PID_FILE.write_text(str(os.getpid()))
+
+    # 6. Launch the GTK application
+    app = WallpaperSelector(
+        config, wallpaper_backend, color_generator,
+        resident=resident,
+        start_hidden=daemon,
+        filter_name=filter_name,
+        library=library,
+        records=records,
+        current_wallpaper=current_future,
+        scan=scan,
+    )
+    try:
+        return app.run(None)
+    finally:
+        if not resident:
+            PID_FILE.unlink(missing_ok=True)
@@ -0,0 +1,177 @@
+"""Image header probing - dimensions and format without decoding pixels
+
+Supports PNG, JPEG, WebP, GIF and BMP. Most formats are answered from
+the first few hundred bytes; JPEG and PNG skip from segment to segment
+with seeks, so large embedded metadata is never read. JPEG dimensions
+are as displayed: an EXIF orientation that rotates by 90 degrees swaps
+them (only the start of the EXIF segment is read for it).
+"""
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+# Enough for every fixed-offset header, plus GIF's animation extension
+# after a full global color table
+HEAD_SIZE = 1024
+# Give up on JPEG/PNG files whose size is not found within this many segments
+MAX_SEGMENTS = 256
+
+# Bytes of a JPEG EXIF segment searched for the orientation tag; it sits
+# in the first IFD, right after the TIFF header
+EXIF_HEAD_SIZE = 4096
+
+# JPEG start-of-frame markers (excluding DHT, JPG and DAC)
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_APP1 = 0xE1
+_ORIENTATION_TAG = 0x0112
+# EXIF orientations that rotate the stored image by 90 or 270 degrees
+_TRANSPOSED = frozenset({5, 6, 7, 8})
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """Header facts about an image file"""
+    width: int
+    height: int
+    format: str  # "png", "jpeg", "webp", "gif" or "bmp"
+    animated: bool = False
+
+
+def _png(f: BinaryIO, head: bytes) -> Optional[ImageInfo]:
+    if head[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", head[16:24])
+    # APNG announces itself with an acTL chunk before the first IDAT
+    offset = 8
+    for _ in range(MAX_SEGMENTS):
+        f.seek(offset)
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            break
+        length, kind = struct.unpack(">I4s", chunk)
+        if kind == b"acTL":
+            return ImageInfo(width, height, "png", True)
+        if kind in (b"IDAT", b"IEND"):
+            break
+        offset += 12 + length
+    return ImageInfo(width, height, "png")
+
+
+def _exif_orientation(exif: bytes) -> int:
+    """Orientation tag of an EXIF segment's first IFD (1 = as stored)"""
+    if not exif.startswith(b"Exif\0\0"):
+        return 1
+    tiff = exif[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return 1
+    try:
+        ifd = struct.unpack(order + "I", tiff[4:8])[0]
+        count = struct.unpack(order + "H", tiff[ifd:ifd + 2])[0]
+    except struct.error:
+        # Cut off by EXIF_HEAD_SIZE or malformed; the size is still good
+        return 1
+    for i in range(count):
+        entry = tiff[ifd + 2 + 12 * i:ifd + 14 + 12 * i]
+        if len(entry) < 12:
+            break
+        tag, kind = struct.unpack(order + "HH", entry[:4])
+        if tag == _ORIENTATION_TAG and kind == 3:
+            return struct.unpack(order + "H", entry[8:10])[0]
+    return 1
+
+
+def _jpeg(f: BinaryIO, head: bytes) -> Optional[ImageInfo]:
+    offset = 2
+    orientation = 1
+    for _ in range(MAX_SEGMENTS):
+        f.seek(offset)
+        marker = f.read(4)
+        if len(marker) < 4 or marker[0] != 0xFF:
+            return None
+        if marker[1] == 0xFF:
+            # Fill byte
+            offset += 1
+            continue
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            # Markers without a length
+            offset += 2
+            continue
+        length = struct.unpack(">H", marker[2:4])[0]
+        if code in _SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            if orientation in _TRANSPOSED:
+                width, height = height, width
+            return ImageInfo(width, height, "jpeg")
+        if code == 0xDA:
+            # Start of scan without a frame header
+            return None
+        if code == _APP1 and orientation == 1:
+            orientation = _exif_orientation(f.read(min(length - 2, EXIF_HEAD_SIZE)))
+        offset += 2 + length
+    return None
+
+
+def _webp(f: BinaryIO, head: bytes) -> Optional[ImageInfo]:
+    kind = head[12:16]
+    if kind == b"VP8X":
+        flags = head[20]
+        width = 1 + int.from_bytes(head[24:27], "little")
+        height = 1 + int.from_bytes(head[27:30], "little")
+        return ImageInfo(width, height, "webp", bool(flags & 0x02))
+    if kind == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return ImageInfo(width & 0x3FFF, height & 0x3FFF, "webp")
+    if kind == b"VP8L" and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], "little")
+        return ImageInfo((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1, "webp")
+    return None
+
+
+def _gif(f: BinaryIO, head: bytes) -> Optional[ImageInfo]:
+    width, height = struct.unpack("<HH", head[6:10])
+    # Looping animations carry the NETSCAPE2.0 extension right after the
+    # global color table
+    return ImageInfo(width, height, "gif", b"NETSCAPE2.0" in head)
+
+
+def _bmp(f: BinaryIO, head: bytes) -> Optional[ImageInfo]:
+    header_size = struct.unpack("<I", head[14:18])[0]
+    if header_size == 12:
+        width, height = struct.unpack("<HH", head[18:22])
+    else:
+        # Negative height means top-down row order
+        width, height = struct.unpack("<ii", head[18:26])
+    return ImageInfo(abs(width), abs(height), "bmp")
+
+
+def probe(path: Path) -> Optional[ImageInfo]:
+    """Read an image's dimensions and format from its header.
+
+    Returns None for unsupported or truncated files.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+            try:
+                if head.startswith(b"\x89PNG\r\n\x1a\n"):
+                    return _png(f, head)
+                if head.startswith(b"\xff\xd8"):
+                    return _jpeg(f, head)
+                if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                    return _webp(f, head)
+                if head[:6] in (b"GIF87a", b"GIF89a"):
+                    return _gif(f, head)
+                if head[:2] == b"BM":
+                    return _bmp(f, head)
+            except (struct.error, IndexError):
+                return None
+    except OSError:
+        return None
+    return None
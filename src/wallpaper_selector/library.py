@@ -0,0 +1,336 @@
+"""Library index - persistent metadata for every wallpaper
+
+Startup reads the whole library from ``LIBRARY_INDEX`` with one query
+instead of listing and stat-ing the collection. The index is then
+reconciled against a single ``os.scandir`` walk of every root in the
+background: only new or changed files are probed, and the differences
+are streamed out in batches so the caller can apply them as they come.
+"""
+
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .cache import CACHE_DIR
+from .imageinfo import probe
+from .palettes import ContentHasher
+
+LIBRARY_INDEX = CACHE_DIR / "library.db"
+# New or changed records handed out per batch while walking
+BATCH_SIZE = 512
+
+
+def thumbnail_key(path: Path) -> str:
+    """File name stem shared by every thumbnail tier of an image"""
+    return hashlib.md5(str(path.absolute()).encode()).hexdigest()
+
+
+@dataclass
+class ImageRecord:
+    """Indexed metadata of one wallpaper"""
+    path: Path
+    size: int
+    mtime_ns: int
+    width: int | None = None
+    height: int | None = None
+    format: str | None = None
+    animated: bool = False
+    content_hash: str | None = None
+    thumbnail_key: str = ""
+    dhash: int | None = None  # Perceptual hash, see duplicates.py
+
+    def matches(self, st: os.stat_result) -> bool:
+        """Check if the file is unchanged since it was indexed"""
+        return self.size == st.st_size and self.mtime_ns == st.st_mtime_ns
+
+
+@dataclass
+class LibraryChanges:
+    """Result of reconciling the index with the directory"""
+    upserted: list[ImageRecord] = field(default_factory=list)
+    removed: list[Path] = field(default_factory=list)
+
+
+def walk_images(root: Path, extensions: set[str], recursive: bool = False) -> Iterator[tuple[Path, os.stat_result]]:
+    """Yield (path, stat) for images under root, one scandir per directory.
+
+    Hidden directories are skipped and symlinked directories are not
+    followed, so link cycles cannot recurse forever.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not entry.name.startswith("."):
+                        pending.append(Path(entry.path))
+                    continue
+                if os.path.splitext(entry.name)[1].lower() not in extensions or not entry.is_file():
+                    continue
+                yield Path(entry.path), entry.stat()
+            except OSError:
+                # Vanished or unreadable while walking
+                continue
+
+
+def _signed(value: int | None) -> int | None:
+    """Unsigned 64-bit value as SQLite's signed INTEGER"""
+    if value is not None and value >= 1 << 63:
+        return value - (1 << 64)
+    return value
+
+
+def _unsigned(value: int | None) -> int | None:
+    if value is not None and value < 0:
+        return value + (1 << 64)
+    return value
+
+
+def _prefix_range(directory: Path) -> tuple[str, str]:
+    """Bounds selecting paths inside directory with an index range scan"""
+    prefix = str(directory).rstrip("/")
+    # "0" sorts right after "/"
+    return prefix + "/", prefix + "0"
+
+
+class LibraryIndex:
+    """SQLite index of wallpapers, safe to use from a background thread"""
+
+    COLUMNS = ("path", "size", "mtime_ns", "width", "height", "format",
+               "animated", "content_hash", "thumbnail_key", "dhash")
+    INSERT = f"INSERT OR REPLACE INTO images VALUES ({', '.join('?' * len(COLUMNS))})"
+
+    def __init__(self, db_path: Path = LIBRARY_INDEX, hasher: ContentHasher | None = None):
+        self.db_path = db_path
+        self.hasher = hasher or ContentHasher()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " width INTEGER,"
+                " height INTEGER,"
+                " format TEXT,"
+                " animated INTEGER NOT NULL DEFAULT 0,"
+                " content_hash TEXT,"
+                " thumbnail_key TEXT NOT NULL,"
+                " dhash INTEGER)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(images)")}
+            if "dhash" not in columns:
+                # Index written before perceptual hashes existed
+                self._conn.execute("ALTER TABLE images ADD COLUMN dhash INTEGER")
+        return self._conn
+
+    @staticmethod
+    def _record(row: tuple) -> ImageRecord:
+        path, size, mtime_ns, width, height, fmt, animated, content_hash, key, dhash = row
+        return ImageRecord(Path(path), size, mtime_ns, width, height, fmt,
+                           bool(animated), content_hash, key, _unsigned(dhash))
+
+    @staticmethod
+    def _row(record: ImageRecord) -> tuple:
+        return (str(record.path), record.size, record.mtime_ns, record.width,
+                record.height, record.format, int(record.animated),
+                record.content_hash, record.thumbnail_key, _signed(record.dhash))
+
+    def load(self, roots: list[Path]) -> list[ImageRecord]:
+        """Every indexed image inside any of roots, in one query"""
+        ranges = [_prefix_range(root) for root in roots]
+        where = " OR ".join(["(path >= ? AND path < ?)"] * len(ranges))
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM images WHERE {where}",
+                [bound for bounds in ranges for bound in bounds],
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def build_record(self, path: Path, st: os.stat_result, content_hash: str | None = None) -> ImageRecord:
+        """Probe a file's header into a new record"""
+        info = probe(path)
+        if info is None:
+            return ImageRecord(path, st.st_size, st.st_mtime_ns, content_hash=content_hash,
+                               thumbnail_key=thumbnail_key(path))
+        return ImageRecord(path, st.st_size, st.st_mtime_ns, info.width, info.height,
+                           info.format, info.animated, content_hash, thumbnail_key(path))
+
+    def reconcile(
+        self,
+        roots: list[Path],
+        extensions: set[str],
+        recursive: bool = False,
+        on_batch: Callable[[list[ImageRecord]], None] | None = None,
+    ) -> LibraryChanges:
+        """Bring the index in line with the collection.
+
+        Each root is walked on its own thread with one scandir per
+        directory. New or changed records are written and passed to
+        on_batch (from the walking threads) in batches of up to
+        BATCH_SIZE, so a caller can show them before the walk finishes.
+
+        Returns every record that was added or changed and the paths that
+        disappeared. Content hashes are only copied from the hasher's memo
+        (e.g. filled by palette precompute): hashing here would read every
+        byte of the library.
+        """
+        indexed = {record.path: record for record in self.load(roots)}
+        hashes = self.hasher.memoized()
+        changes = LibraryChanges()
+        seen: set[Path] = set()
+        seen_lock = threading.Lock()
+
+        def known_hash(path: Path, st: os.stat_result) -> str | None:
+            memo = hashes.get(str(path))
+            if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+                return memo[2]
+            return None
+
+        def flush(upserted: list[ImageRecord], hashed: list[ImageRecord]) -> None:
+            with self._lock, self._connect() as conn:
+                conn.executemany(self.INSERT, [self._row(record) for record in upserted + hashed])
+            with seen_lock:
+                changes.upserted.extend(upserted)
+            if upserted and on_batch:
+                on_batch(upserted)
+
+        def walk(root: Path) -> None:
+            upserted: list[ImageRecord] = []
+            hashed: list[ImageRecord] = []
+            for path, st in walk_images(root, extensions, recursive):
+                with seen_lock:
+                    if path in seen:
+                        # Nested roots
+                        continue
+                    seen.add(path)
+                record = indexed.get(path)
+                if record is not None and record.matches(st):
+                    if record.content_hash is None:
+                        record.content_hash = known_hash(path, st)
+                        if record.content_hash:
+                            hashed.append(record)
+                    continue
+                upserted.append(self.build_record(path, st, known_hash(path, st)))
+                if len(upserted) >= BATCH_SIZE:
+                    flush(upserted, hashed)
+                    upserted, hashed = [], []
+            flush(upserted, hashed)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(roots)), thread_name_prefix="library") as executor:
+            for future in [executor.submit(walk, root) for root in roots]:
+                future.result()
+
+        changes.removed = [path for path in indexed if path not in seen]
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM images WHERE path = ?",
+                             [(str(path),) for path in changes.removed])
+        return changes
+
+    def _store(self, record: ImageRecord) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(self.INSERT, self._row(record))
+
+    def refresh(self, path: Path) -> Optional[ImageRecord]:
+        """Re-index a single file (e.g. reported by the directory watcher)"""
+        try:
+            st = path.stat()
+        except OSError:
+            self.forget(path)
+            return None
+        record = self.build_record(path, st, self.hasher.known(path, st))
+        self._store(record)
+        return record
+
+    def set_dhashes(self, hashes: dict[Path, int]) -> None:
+        """Store perceptual hashes of indexed images"""
+        with self._lock, self._connect() as conn:
+            conn.executemany("UPDATE images SET dhash = ? WHERE path = ?",
+                             [(_signed(value), str(path)) for path, value in hashes.items()])
+
+    def forget(self, path: Path) -> None:
+        """Drop a file from the index"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM images WHERE path = ?", (str(path),))
+
+
+class LibraryScan:
+    """Runs LibraryIndex.reconcile on a background thread, queueing results.
+
+    Batches of new or changed records are queued as they are found,
+    followed by one LibraryChanges holding the removed paths. The
+    consumer drains the queue (e.g. from a GLib timeout) at its own pace.
+    """
+
+    def __init__(self, index: LibraryIndex, roots: list[Path], extensions: set[str], recursive: bool = False):
+        self.index = index
+        self.roots = roots
+        self.extensions = extensions
+        self.recursive = recursive
+        self.changes: "queue.Queue[LibraryChanges]" = queue.Queue()
+        self.done = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start walking the collection"""
+        self._thread = threading.Thread(target=self._run, name="library-scan", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            result = self.index.reconcile(
+                self.roots, self.extensions, self.recursive,
+                on_batch=lambda records: self.changes.put(LibraryChanges(upserted=records)),
+            )
+            if result.removed:
+                self.changes.put(LibraryChanges(removed=result.removed))
+        finally:
+            self.done.set()
+
+    def first_batch(self) -> Optional[LibraryChanges]:
+        """Block until the first results arrive; None if the walk found nothing"""
+        while True:
+            try:
+                return self.changes.get(timeout=0.05)
+            except queue.Empty:
+                if self.done.is_set() and self.changes.empty():
+                    return None
+
+    def drain(self, limit: int | None = None) -> list[LibraryChanges]:
+        """Everything queued so far (at most limit results), without blocking"""
+        drained = []
+        while limit is None or len(drained) < limit:
+            try:
+                drained.append(self.changes.get_nowait())
+            except queue.Empty:
+                return drained
+        return drained
+
+    def pending(self) -> bool:
+        """Check if results are queued"""
+        return not self.changes.empty()
+
+    def finished(self) -> bool:
+        """Check if the walk is over and every result has been drained"""
+        return self.done.is_set() and self.changes.empty()
@@ -0,0 +1,70 @@
+"""List command - print wallpapers, optionally filtered by dimensions"""
+
+from typing import Optional
+
+from .config import load_config
+from .filters import make_filter, parse_aspect
+from .library import LibraryIndex
+from .models.wallpaper_manager import wallpaper_extensions
+from .sorting import DEFAULT_SORT, USAGE_ORDERS, sort_key
+
+
+def monitor_size() -> Optional[tuple[int, int]]:
+    """Pixel size of the first output swww-daemon reports"""
+    from .plugins.wallpaper.swww_ipc import SwwwIpcBackend
+
+    for output in SwwwIpcBackend().query_outputs():
+        return output.width, output.height
+    return None
+
+
+def main(
+    filter_name: Optional[str] = None,
+    aspect: Optional[str] = None,
+    order: str = DEFAULT_SORT,
+    verbose: bool = False,
+) -> int:
+    """Print matching wallpaper paths in the given order - returns 0 on success"""
+    config = load_config()
+
+    wallpaper_filter = None
+    if filter_name:
+        try:
+            size = parse_aspect(aspect) if aspect else None
+        except ValueError as e:
+            print(f"list: {e}")
+            return 1
+        if filter_name == "aspect" and size is None:
+            size = monitor_size()
+            if size is None:
+                print("list: Cannot determine the monitor size; pass --aspect W:H")
+                return 1
+        wallpaper_filter = make_filter(filter_name, size)
+
+    roots = config.wallpaper.roots
+    library = LibraryIndex()
+    library.reconcile(roots, wallpaper_extensions(config), config.wallpaper.recursive)
+    usage = None
+    if order in USAGE_ORDERS:
+        from .usage import UsageLog
+        usage = UsageLog()
+
+    def key(record) -> tuple:
+        dimensions = (record.width, record.height) if record.width else None
+        if usage is None:
+            return sort_key(order, record.path, record.size, record.mtime_ns, dimensions)
+        return sort_key(order, record.path, record.size, record.mtime_ns, dimensions,
+                        usage.count(record.path), usage.last_used(record.path))
+
+    records = sorted(library.load(roots), key=key)
+
+    for record in records:
+        if wallpaper_filter and not (record.width and record.height
+                                     and wallpaper_filter(record.width, record.height)):
+            continue
+        if verbose:
+            size = f"{record.width}x{record.height}" if record.width else "?"
+            print(f"{size:>11} {record.format or '?':<5} {record.path}")
+        else:
+            print(record.path)
+    return 0
@@ -0,0 +1,142 @@
+"""Thumbnail manifest - persistent index of generated thumbnails
+
+Maps each (source image path, size tier) to the stat signature the
+source had when the thumbnail was generated (size, mtime_ns, inode) and
+the thumbnail file name. Validity checks are then a dict lookup against
+a stat result the caller already has, instead of hashing the path and
+stat-ing two files.
+"""
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """Source signature and thumbnail file for one image tier"""
+    size: int
+    mtime_ns: int
+    inode: int
+    thumbnail: str  # File name inside the thumbnail directory
+
+    def matches(self, st: os.stat_result) -> bool:
+        """Check if the source file is unchanged since the thumbnail was made"""
+        return (self.size == st.st_size
+                and self.mtime_ns == st.st_mtime_ns
+                and self.inode == st.st_ino)
+
+
+class ThumbnailManifest:
+    """SQLite-backed manifest, loaded once and kept in memory.
+
+    Safe to use from thumbnail worker threads. New records are buffered
+    and written in a single transaction by ``flush()``.
+    """
+
+    def __init__(self, db_path: Path, thumbnail_dir: Path):
+        self.db_path = db_path
+        self.thumbnail_dir = thumbnail_dir
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._entries: dict[tuple[str, str], ManifestEntry] | None = None
+        self._existing: set[str] = set()
+        self._pending: dict[tuple[str, str], ManifestEntry | None] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            # Single-size table from before thumbnail tiers existed
+            self._conn.execute("DROP TABLE IF EXISTS thumbnails")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS thumbnail_tiers ("
+                " path TEXT NOT NULL,"
+                " tier TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " inode INTEGER NOT NULL,"
+                " thumbnail TEXT NOT NULL,"
+                " PRIMARY KEY (path, tier))"
+            )
+        return self._conn
+
+    def _ensure_loaded(self) -> dict[tuple[str, str], ManifestEntry]:
+        """Load all entries with one query and one scandir of the thumbnail dir"""
+        if self._entries is not None:
+            return self._entries
+        entries = {}
+        try:
+            rows = self._connect().execute(
+                "SELECT path, tier, size, mtime_ns, inode, thumbnail FROM thumbnail_tiers"
+            )
+            for path, tier, size, mtime_ns, inode, thumbnail in rows:
+                entries[(path, tier)] = ManifestEntry(size, mtime_ns, inode, thumbnail)
+        except sqlite3.DatabaseError as e:
+            print(f"Thumbnail manifest unreadable, rebuilding: {e}")
+            self._reset()
+
+        try:
+            with os.scandir(self.thumbnail_dir) as it:
+                self._existing = {entry.name for entry in it}
+        except FileNotFoundError:
+            self._existing = set()
+
+        self._entries = entries
+        return entries
+
+    def _reset(self) -> None:
+        """Drop a corrupt database file so it is recreated on next connect"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self.db_path.unlink(missing_ok=True)
+
+    def lookup(self, path: Path, tier: str, st: os.stat_result) -> Path | None:
+        """Return the thumbnail for path at tier if still valid for stat result st"""
+        with self._lock:
+            entry = self._ensure_loaded().get((str(path), tier))
+            if entry is None or not entry.matches(st) or entry.thumbnail not in self._existing:
+                return None
+            return self.thumbnail_dir / entry.thumbnail
+
+    def record(self, path: Path, tier: str, st: os.stat_result, thumbnail_path: Path) -> None:
+        """Record a freshly generated thumbnail for path at tier"""
+        entry = ManifestEntry(st.st_size, st.st_mtime_ns, st.st_ino, thumbnail_path.name)
+        with self._lock:
+            self._ensure_loaded()[(str(path), tier)] = entry
+            self._existing.add(entry.thumbnail)
+            self._pending[(str(path), tier)] = entry
+
+    def forget(self, path: Path) -> list[Path]:
+        """Remove every tier of path from the manifest, returning their thumbnails"""
+        with self._lock:
+            entries = self._ensure_loaded()
+            keys = [key for key in entries if key[0] == str(path)]
+            removed = []
+            for key in keys:
+                removed.append(self.thumbnail_dir / entries.pop(key).thumbnail)
+                self._pending[key] = None
+            return removed
+
+    def flush(self) -> None:
+        """Write buffered changes to disk in one transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                with self._connect() as conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO thumbnail_tiers VALUES (?, ?, ?, ?, ?, ?)",
+                        [(path, tier, e.size, e.mtime_ns, e.inode, e.thumbnail)
+                         for (path, tier), e in pending.items() if e is not None],
+                    )
+                    conn.executemany(
+                        "DELETE FROM thumbnail_tiers WHERE path = ? AND tier = ?",
+                        [key for key, e in pending.items() if e is None],
+                    )
+            except sqlite3.DatabaseError as e:
+                print(f"Error writing thumbnail manifest: {e}")
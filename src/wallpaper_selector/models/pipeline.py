@@ -0,0 +1,103 @@
+"""Set-wallpaper pipeline - runs wallpaper changes off the main loop"""
+
+import threading
+from pathlib import Path
+from typing import Callable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .wallpaper_manager import WallpaperManager
+
+# Called as on_stage(path, stage_name, ok) after each stage
+StageCallback = Callable[[Path, str, bool], None]
+
+
+def _call_directly(func: Callable, *args) -> None:
+    func(*args)
+
+
+class SetWallpaperPipeline:
+    """Runs the set-wallpaper stages on a worker thread, latest selection wins.
+
+    Stages (backend set, cache, session, colors, shell reload) come from
+    ``WallpaperManager.set_stages``. If another wallpaper is submitted
+    while one is in flight, the running one stops before its next stage
+    and only the newest selection runs to completion; selections made in
+    between are skipped entirely.
+
+    Callbacks are passed through ``dispatch`` so a GUI can marshal them
+    onto its main loop (e.g. with ``GLib.idle_add``).
+    """
+
+    def __init__(
+        self,
+        manager: "WallpaperManager",
+        on_stage: Optional[StageCallback] = None,
+        dispatch: Callable = _call_directly,
+    ):
+        self.manager = manager
+        self.on_stage = on_stage
+        self.dispatch = dispatch
+        self._lock = threading.Lock()
+        self._pending: Optional[Path] = None
+        self._generation = 0
+        self._worker: Optional[threading.Thread] = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.superseded = 0
+
+    def submit(self, path: Path) -> None:
+        """Queue path to be set, superseding any selection still in flight"""
+        with self._lock:
+            if self._pending is not None:
+                # Never started: newest selection replaces it
+                self.superseded += 1
+            self._pending = path
+            self._generation += 1
+            self.submitted += 1
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="set-wallpaper", daemon=True)
+                self._worker.start()
+
+    def _is_superseded(self, generation: int) -> bool:
+        with self._lock:
+            return generation != self._generation
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._pending is None:
+                    self._worker = None
+                    return
+                path, generation = self._pending, self._generation
+                self._pending = None
+
+            for name, stage in self.manager.set_stages(path):
+                if self._is_superseded(generation):
+                    with self._lock:
+                        self.superseded += 1
+                    break
+                ok = stage()
+                if self.on_stage:
+                    self.dispatch(self.on_stage, path, name, ok)
+                if not ok:
+                    break
+            else:
+                with self._lock:
+                    self.completed += 1
+
+    def wait(self) -> None:
+        """Block until all submitted work has finished"""
+        with self._lock:
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def stats(self) -> dict:
+        """Pipeline counters"""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "superseded": self.superseded,
+            }
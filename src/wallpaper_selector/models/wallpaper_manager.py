@@ -1,17 +1,121 @@
 """Wallpaper Manager - handles wallpaper loading and state management"""
 
+import bisect
 import subprocess
 from pathlib import Path
-from typing import List, Optional, TYPE_CHECKING
+from typing import Callable, Iterable, Iterator, List, Optional, TYPE_CHECKING
 
 from ..cache import cache_wallpaper
 from ..config import Config
+from ..filters import DimensionFilter
+from ..imageinfo import ImageInfo, probe as probe_image
+from ..library import ImageRecord, walk_images
+from ..search import SearchIndex
+from ..sorting import DEFAULT_SORT, SORT_ORDERS, USAGE_ORDERS, sort_key
+from ..usage import UsageLog
+from .pipeline import SetWallpaperPipeline
 
 if TYPE_CHECKING:
     from ..plugins.wallpaper import WallpaperBackend
     from ..plugins.colors import ColorGenerator
 
 
+# Batches up to this size are merged by bisection, larger ones by sorting
+# the combined keys: inserting shifts the lists once per entry
+INSORT_MAX = 512
+
+# Called as listener(kind, index, path) with kind "added" or "removed";
+# index is the position in the wallpaper list after/before the change,
+# None for a removed wallpaper the filter or search was hiding.
+# A batch merged from a library scan is reported once as "merged", with
+# index the number of merged wallpapers and path None.
+ChangeListener = Callable[[str, Optional[int], Optional[Path]], None]
+
+
+def wallpaper_extensions(config: Config) -> set[str]:
+    """Configured image extensions, lowercase with leading dot"""
+    return {f".{ext.lower()}" if not ext.startswith(".") else ext.lower()
+            for ext in config.wallpaper.extensions}
+
+
+def _scan_stats(config: Config) -> dict[Path, tuple[int, int]]:
+    """(size, mtime_ns) of each wallpaper in the configured roots"""
+    config.wallpaper.directory.mkdir(parents=True, exist_ok=True)
+
+    extensions = wallpaper_extensions(config)
+    stats = {}
+    for root in config.wallpaper.roots:
+        for path, st in walk_images(root, extensions, config.wallpaper.recursive):
+            stats[path] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+class SortedWallpapers:
+    """Wallpaper paths in list order with parallel sort keys, so single
+    inserts and removals are positioned by bisection"""
+
+    def __init__(self, entries: Iterable[tuple[tuple, Path]] = ()):
+        # Already sorted input (e.g. filtered from another list) costs O(N)
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.paths = [path for _, path in entries]
+        self._key_of = dict(zip(self.paths, self.keys))
+
+    def __contains__(self, path: Path) -> bool:
+        return path in self._key_of
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def entries(self) -> Iterator[tuple[tuple, Path]]:
+        """(sort key, path) pairs in list order"""
+        return zip(self.keys, self.paths)
+
+    def insert(self, path: Path, key: tuple) -> int:
+        """Insert path at its sorted position and return that index"""
+        index = bisect.bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.paths.insert(index, path)
+        self._key_of[path] = key
+        return index
+
+    def key_of(self, path: Path) -> Optional[tuple]:
+        """Sort key of path (None if absent)"""
+        return self._key_of.get(path)
+
+    def remove(self, path: Path) -> Optional[int]:
+        """Remove path, returning its former index (None if absent)"""
+        key = self._key_of.pop(path, None)
+        if key is None:
+            return None
+        index = bisect.bisect_left(self.keys, key)
+        # Equal keys (same name and time in two roots) sit side by side
+        while self.paths[index] != path:
+            index += 1
+        del self.keys[index]
+        del self.paths[index]
+        return index
+
+    def merge(self, entries: List[tuple[tuple, Path]]) -> None:
+        """Merge sorted (sort key, path) entries not yet present.
+
+        A small batch is inserted entry by entry: O(log N) comparisons and
+        a memmove each. A large one is appended and the keys re-sorted;
+        the list and the batch are two runs, which Timsort merges in
+        linear time.
+        """
+        if len(entries) <= INSORT_MAX:
+            for key, path in entries:
+                self.insert(path, key)
+            return
+        keys = self.keys + [key for key, _ in entries]
+        paths = self.paths + [path for _, path in entries]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.paths = [paths[i] for i in order]
+        self._key_of.update((path, key) for key, path in entries)
+
+
 class WallpaperManager:
     """Manages wallpaper collection and current wallpaper state"""
 
@@ -20,32 +124,318 @@ class WallpaperManager:
         config: Config,
         wallpaper_backend: "WallpaperBackend",
         color_generator: Optional["ColorGenerator"] = None,
+        records: Optional[List[ImageRecord]] = None,
+        load_current: bool = True,
     ):
         self.config = config
         self.wallpaper_backend = wallpaper_backend
         self.color_generator = color_generator
-        self.wallpapers: List[Path] = []
         self.current_wallpaper: Optional[str] = None
-        self._load_wallpapers()
-        self._get_current_wallpaper()
+        # Runs set_wallpaper_async requests; a GUI may replace it with one
+        # that dispatches callbacks onto its main loop
+        self.pipeline = SetWallpaperPipeline(self)
+        # Every wallpaper, and the ones passing the active filter (what
+        # views show); both kept sorted for O(log N) incremental changes
+        self._library = SortedWallpapers()
+        self._visible = SortedWallpapers()
+        # Every wallpaper in each sort order used so far, kept up to date
+        # like _library (which is the one of the active order)
+        self._sort = config.wallpaper.sort if config.wallpaper.sort in SORT_ORDERS else DEFAULT_SORT
+        self._orders: dict[str, SortedWallpapers] = {}
+        # (size, mtime_ns) of every wallpaper, so orders are built without a stat
+        self._stats: dict[Path, tuple[int, int]] = {}
+        self.usage = UsageLog()
+        # Set when a wallpaper is set; usage orders are rebuilt on the next switch
+        self._usage_changed = False
+        self._filter: Optional[DimensionFilter] = None
+        # Built on the first search, then kept in step with the library
+        self._search: Optional[SearchIndex] = None
+        # Wallpapers shown in a given order instead of sorted (e.g. by color similarity)
+        self._ranked: Optional[List[Path]] = None
+        # Lesser copies of near-duplicate images, never shown
+        self._duplicates: set[Path] = set()
+        self._probed: dict[Path, Optional[ImageInfo]] = {}
+        self._change_listeners: List[ChangeListener] = []
+        self._extensions = wallpaper_extensions(config)
+        # Library index metadata, when the list came from the index
+        self.records: dict[Path, ImageRecord] = {}
+        # A startup that already read the library index (or is querying the
+        # backend concurrently) passes its results in instead of redoing the work
+        if records is None:
+            self._load_wallpapers()
+        else:
+            self._load_records(records)
+        if load_current:
+            self._get_current_wallpaper()
 
     def _load_wallpapers(self):
-        """Load all wallpapers from directory"""
-        wallpaper_dir = self.config.wallpaper.directory
-        if not wallpaper_dir.exists():
-            wallpaper_dir.mkdir(parents=True, exist_ok=True)
+        """Load all wallpapers from the collection roots"""
+        self._stats = _scan_stats(self.config)
+        self._build_order()
+
+    def _load_records(self, records: List[ImageRecord]):
+        """Load the wallpaper list from library index records"""
+        self.records = {r.path: r for r in records}
+        self._stats = {r.path: (r.size, r.mtime_ns) for r in records}
+        self._build_order()
+
+    def _sort_key(self, order: str, path: Path) -> tuple:
+        size, mtime_ns = self._stats[path]
+        if order == "resolution":
+            return sort_key(order, path, size, mtime_ns, dimensions=self.dimensions(path))
+        if order in USAGE_ORDERS:
+            return sort_key(order, path, size, mtime_ns,
+                            count=self.usage.count(path), last_used=self.usage.last_used(path))
+        return sort_key(order, path, size, mtime_ns)
+
+    def _build_order(self) -> None:
+        """Sort every wallpaper in the active order from the stored stats"""
+        self._library = SortedWallpapers(
+            (self._sort_key(self._sort, path), path) for path in self._stats)
+        self._orders = {self._sort: self._library}
+        self._apply_filter()
+
+    @property
+    def sort_order(self) -> str:
+        """Name of the active sort order (see sorting.SORT_ORDERS)"""
+        return self._sort
+
+    def set_sort_order(self, order: str) -> None:
+        """List wallpapers in the given order.
+
+        Each order is sorted once from the stored stats, without touching
+        the files; switching back to it later only re-filters. Views
+        should refresh fully afterwards; no change events are sent.
+        Leaves a ranked list set with set_ranked.
+        """
+        if order not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order: {order}")
+        if self._usage_changed and order != self._sort:
+            self._usage_changed = False
+            for name in USAGE_ORDERS:
+                self._orders.pop(name, None)
+        self._sort = order
+        self._library = self._orders.get(order)
+        if self._library is None:
+            self._library = SortedWallpapers(
+                (self._sort_key(order, path), path) for path in self._stats)
+            self._orders[order] = self._library
+        self._ranked = None
+        self.set_search(self.search_query)
+
+    @property
+    def wallpapers(self) -> List[Path]:
+        """Wallpapers passing the active filter, in the active sort order"""
+        return self._visible.paths
+
+    def dimensions(self, path: Path) -> Optional[tuple[int, int]]:
+        """Pixel size of a wallpaper from the index, or its header"""
+        record = self.records.get(path)
+        if record is not None and record.width and record.height:
+            return record.width, record.height
+        if path not in self._probed:
+            self._probed[path] = probe_image(path)
+        info = self._probed[path]
+        return (info.width, info.height) if info else None
+
+    def _passes_filter(self, path: Path) -> bool:
+        if self._filter is None:
+            return True
+        size = self.dimensions(path)
+        return size is not None and self._filter(*size)
+
+    def _passes(self, path: Path) -> bool:
+        if path in self._duplicates:
+            return False
+        if self._search is not None and self._search.terms and not self._search.matches(path):
+            return False
+        return self._passes_filter(path)
+
+    def _shows_new(self, path: Path) -> bool:
+        """Check if a wallpaper added to the library joins the visible list"""
+        return self._ranked is None and self._passes(path)
+
+    def _apply_filter(self):
+        self._visible = SortedWallpapers(
+            (key, path) for key, path in self._library.entries() if self._passes(path))
+
+    def set_filter(self, wallpaper_filter: Optional[DimensionFilter]) -> None:
+        """Show only wallpapers whose (width, height) pass wallpaper_filter.
+
+        Views should refresh fully afterwards; no change events are sent.
+        Leaves a ranked list set with set_ranked.
+        """
+        self._filter = wallpaper_filter
+        self._ranked = None
+        self._apply_filter()
+
+    def set_search(self, query: str) -> None:
+        """Show only wallpapers whose path relative to its root contains
+        every word of query (case-insensitive; empty = all).
+
+        Views should refresh fully afterwards; no change events are sent.
+        Leaves a ranked list set with set_ranked.
+        """
+        self._ranked = None
+        if self._search is None:
+            if not query.strip():
+                self._apply_filter()
+                return
+            self._search = SearchIndex(self.config.wallpaper.roots)
+            for path in self._library.paths:
+                self._search.add(path)
+
+        matches = self._search.search(query)
+        if matches is None:
+            self._apply_filter()
             return
+        # Library order is kept, so the visible list is built presorted
+        self._visible = SortedWallpapers(
+            (key, path) for key, path in self._library.entries()
+            if path in matches and self._passes_filter(path))
+
+    def set_ranked(self, ranked: Optional[List[Path]]) -> None:
+        """Show the given wallpapers in the given order (None = back to the
+        sorted list), skipping those hidden by the filter or search.
 
-        # Get extensions with leading dot
-        extensions = {f".{ext.lower()}" if not ext.startswith(".") else ext.lower()
-                      for ext in self.config.wallpaper.extensions}
+        Wallpapers added meanwhile are listed once the ranking is left.
+        Views should refresh fully afterwards; no change events are sent.
+        """
+        self._ranked = ranked
+        if ranked is None:
+            self._apply_filter()
+            return
+        self._visible = SortedWallpapers(
+            ((rank, path.name), path) for rank, path in enumerate(ranked)
+            if path in self._library and self._passes(path))
 
-        self.wallpapers = sorted(
-            [f for f in wallpaper_dir.iterdir()
-             if f.suffix.lower() in extensions],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True  # newest first
-        )
+    def set_duplicates(self, hidden: set[Path]) -> None:
+        """Hide the given wallpapers, e.g. all but the best copy of each
+        group of near-duplicates.
+
+        Views should refresh fully afterwards; no change events are sent.
+        """
+        self._duplicates = hidden
+        self.set_ranked(self._ranked)
+
+    @property
+    def ranked(self) -> bool:
+        """Check if a ranked list is shown"""
+        return self._ranked is not None
+
+    @property
+    def search_query(self) -> str:
+        """Words of the active search"""
+        return " ".join(self._search.terms) if self._search else ""
+
+    def is_wallpaper(self, path: Path) -> bool:
+        """Check if path has one of the configured image extensions"""
+        return path.suffix.lower() in self._extensions
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        """Call listener(kind, index, path) after each incremental change.
+
+        A "removed" event is sent for every wallpaper leaving the library,
+        with index None if the filter or search was hiding it.
+        """
+        self._change_listeners.append(listener)
+
+    def _notify(self, kind: str, index: Optional[int], path: Optional[Path]) -> None:
+        for listener in self._change_listeners:
+            listener(kind, index, path)
+
+    def signatures(self) -> dict[Path, tuple[int, int]]:
+        """(size, mtime_ns) of every wallpaper, as last indexed or scanned"""
+        return dict(self._stats)
+
+    def get_record(self, path: Path) -> Optional[ImageRecord]:
+        """Library index metadata for a wallpaper, if known"""
+        return self.records.get(path)
+
+    def add_wallpaper(self, path: Path, record: Optional[ImageRecord] = None) -> Optional[int]:
+        """Insert a new or modified wallpaper at its sorted position.
+
+        A wallpaper already in the list is removed first, so a modified
+        file moves to its new position. Returns the new index in the
+        visible list, or None if path is not an existing image or is
+        hidden by the filter.
+        """
+        if not self.is_wallpaper(path):
+            return None
+        if record is not None:
+            stat = (record.size, record.mtime_ns)
+        else:
+            try:
+                st = path.stat()
+            except OSError:
+                return None
+            stat = (st.st_size, st.st_mtime_ns)
+
+        if path in self._library:
+            self.remove_wallpaper(path)
+        if record is not None:
+            self.records[path] = record
+        self._stats[path] = stat
+        for order, wallpapers in self._orders.items():
+            wallpapers.insert(path, self._sort_key(order, path))
+        if self._search is not None:
+            self._search.add(path)
+        if not self._shows_new(path):
+            return None
+        index = self._visible.insert(path, self._library.key_of(path))
+        self._notify("added", index, path)
+        return index
+
+    def merge_wallpapers(self, records: List[ImageRecord]) -> int:
+        """Merge a batch of new or modified wallpapers into the list.
+
+        Unlike add_wallpaper, the batch is sorted once and merged into
+        each list (see SortedWallpapers.merge), and listeners get one
+        "merged" event. Returns how many wallpapers became visible.
+        """
+        paths = []
+        for record in records:
+            path = record.path
+            if not self.is_wallpaper(path):
+                continue
+            if path in self._library:
+                # Modified since indexed: moves to its new position
+                for wallpapers in self._orders.values():
+                    wallpapers.remove(path)
+                self._visible.remove(path)
+            self.records[path] = record
+            self._stats[path] = (record.size, record.mtime_ns)
+            self._probed.pop(path, None)
+            if self._search is not None:
+                self._search.add(path)
+            paths.append(path)
+        if not paths:
+            return 0
+
+        for order, wallpapers in self._orders.items():
+            order_entries = sorted((self._sort_key(order, path), path) for path in paths)
+            wallpapers.merge(order_entries)
+            if wallpapers is self._library:
+                entries = order_entries
+        visible = [entry for entry in entries if self._shows_new(entry[1])]
+        self._visible.merge(visible)
+        self._notify("merged", len(visible), None)
+        return len(visible)
+
+    def remove_wallpaper(self, path: Path) -> Optional[int]:
+        """Remove a wallpaper, returning its former index in the visible list"""
+        if path not in self._library:
+            return None
+        for wallpapers in self._orders.values():
+            wallpapers.remove(path)
+        self._stats.pop(path, None)
+        if self._search is not None:
+            self._search.remove(path)
+        self.records.pop(path, None)
+        self._probed.pop(path, None)
+        index = self._visible.remove(path)
+        self._notify("removed", index, path)
+        return index
 
     def _get_current_wallpaper(self) -> Optional[str]:
         """Get current wallpaper from backend"""
@@ -57,6 +447,11 @@ class WallpaperManager:
         """Get wallpaper directory"""
         return self.config.wallpaper.directory
 
+    @property
+    def wallpaper_roots(self) -> List[Path]:
+        """Every directory wallpapers are collected from"""
+        return self.config.wallpaper.roots
+
     def get_wallpapers(self) -> List[Path]:
         """Get list of wallpapers"""
         return self.wallpapers
@@ -65,11 +460,32 @@ class WallpaperManager:
         """Get current wallpaper path"""
         return self.current_wallpaper
 
-    def set_wallpaper(self, path: Path) -> bool:
-        """Set wallpaper using backend and optionally regenerate colors"""
-        backend_config = self.config.wallpaper.backend
+    def set_current_wallpaper(self, current: Optional[str]) -> None:
+        """Record the current wallpaper as queried from the backend"""
+        self.current_wallpaper = current
+
+    def set_stages(self, path: Path) -> list[tuple[str, Callable[[], bool]]]:
+        """Ordered (name, stage) steps that set path as the wallpaper.
 
-        # Set wallpaper with backend
+        Each stage is blocking and returns False to abort the rest.
+        """
+        stages = [
+            ("backend", lambda: self._set_backend(path)),
+            ("cache", lambda: self._cache(path)),
+            ("usage", lambda: self._record_usage(path)),
+        ]
+        # Generate colors if enabled and generator available
+        if self.config.colors.enabled and self.color_generator:
+            stages += [
+                ("session", lambda: self._update_session(path)),
+                ("colors", lambda: self._generate_colors(path)),
+                ("reload", self._reload_shell),
+            ]
+        return stages
+
+    def _set_backend(self, path: Path) -> bool:
+        """Set wallpaper with backend"""
+        backend_config = self.config.wallpaper.backend
         if not self.wallpaper_backend.set_wallpaper(
             path,
             backend_config.transition_type,
@@ -78,20 +494,55 @@ class WallpaperManager:
         ):
             return False
 
-        # Cache wallpaper for fast boot sync
+        # Update current wallpaper tracking
+        self.current_wallpaper = str(path)
+        return True
+
+    def _cache(self, path: Path) -> bool:
+        """Cache wallpaper for fast boot sync"""
         cache_wallpaper(path)
+        return True
 
-        # Generate colors if enabled and generator available
-        if self.config.colors.enabled and self.color_generator:
-            self.color_generator.update_session(path)
-            self.color_generator.generate(path)
-            # Restart DMS to clear QML image cache and reload wallpaper
-            subprocess.run(['dms', 'restart'], capture_output=True, timeout=5)
+    def _record_usage(self, path: Path) -> bool:
+        """Log the selection for the most-used and recently-used orders.
 
-        # Update current wallpaper tracking
-        self.current_wallpaper = str(path)
+        Runs on the pipeline worker, so the lists are not reordered here;
+        a usage order shown right now keeps its positions until switched to
+        again.
+        """
+        try:
+            self.usage.record(path)
+        except OSError as e:
+            print(f"Error recording usage: {e}")
+        self._usage_changed = True
+        return True
+
+    def _update_session(self, path: Path) -> bool:
+        """Point the color generator's session at the new wallpaper"""
+        self.color_generator.update_session(path)
         return True
 
+    def _generate_colors(self, path: Path) -> bool:
+        """Regenerate the color scheme"""
+        self.color_generator.generate(path)
+        return True
+
+    def _reload_shell(self) -> bool:
+        """Restart DMS to clear QML image cache and reload wallpaper"""
+        try:
+            subprocess.run(['dms', 'restart'], capture_output=True, timeout=5)
+        except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+            print(f"Error restarting DMS: {e}")
+        return True
+
+    def set_wallpaper(self, path: Path) -> bool:
+        """Set wallpaper using backend and optionally regenerate colors (blocking)"""
+        return all(stage() for _, stage in self.set_stages(path))
+
+    def set_wallpaper_async(self, path: Path) -> None:
+        """Set wallpaper in the background; a newer request supersedes this one"""
+        self.pipeline.submit(path)
+
     def refresh_current_wallpaper(self):
         """Refresh current wallpaper from system"""
         self._get_current_wallpaper()
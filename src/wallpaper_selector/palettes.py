@@ -0,0 +1,227 @@
+"""Palette store - generated color schemes cached per wallpaper content
+
+A palette entry holds every file a color generation writes (the colors
+file and rendered templates, see plugins/colors/cached.py). Entries are
+stored as ``PALETTE_DIR/<key>.json`` where the key hashes
+the wallpaper's content together with the generator's settings, so a
+renamed or re-downloaded file still hits, and changing the generator's
+settings misses. Content hashes are memoized by (path, size, mtime_ns)
+so each file is only read once.
+
+Entries stored on demand are bounded in size and the least recently used
+are evicted first. Entries pinned by library precomputation live in
+``PALETTE_DIR/pinned`` outside that budget: their number follows the
+library, and a precompute run drops those of wallpapers that are gone.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .cache import CACHE_DIR
+
+if TYPE_CHECKING:
+    from .config import Config
+
+PALETTE_DIR = CACHE_DIR / "palettes"
+CONTENT_HASHES = CACHE_DIR / "content-hashes.db"
+
+
+class ContentHasher:
+    """Content hashes of image files, memoized on disk by stat signature"""
+
+    def __init__(self, db_path: Path = CONTENT_HASHES):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS content_hashes ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " hash TEXT NOT NULL)"
+            )
+        return self._conn
+
+    def known(self, path: Path, st: os.stat_result) -> str | None:
+        """Memoized content hash of path if it is still valid, without reading the file"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT size, mtime_ns, hash FROM content_hashes WHERE path = ?",
+                (str(path),),
+            ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        return None
+
+    def memoized(self) -> dict[str, tuple[int, int, str]]:
+        """All memoized hashes as path -> (size, mtime_ns, hash)"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT path, size, mtime_ns, hash FROM content_hashes"
+            ).fetchall()
+        return {path: (size, mtime_ns, content_hash) for path, size, mtime_ns, content_hash in rows}
+
+    def hash(self, path: Path, st: os.stat_result | None = None) -> str:
+        """Content hash of path, reading the file only if it changed"""
+        st = st or path.stat()
+        known = self.known(path, st)
+        if known:
+            return known
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?)",
+                (str(path), st.st_size, st.st_mtime_ns, content_hash),
+            )
+        return content_hash
+
+
+class PaletteStore:
+    """Size-bounded, content-addressed store of generated color files.
+
+    Usage of the evictable entries is read with one scandir on the first
+    put and tracked from then on. Entries another process stores at the
+    same time are only counted by the next process that starts.
+    """
+
+    def __init__(self, max_bytes: int, directory: Path = PALETTE_DIR, hasher: ContentHasher | None = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.pinned_directory = directory / "pinned"
+        self.hasher = hasher or ContentHasher()
+        self._lock = threading.Lock()
+        # Evictable entries, least recently used first: key -> size
+        self._usage: OrderedDict[str, int] | None = None
+        self._total = 0
+
+    def key(self, wallpaper_path: Path, settings: str) -> str:
+        """Store key for a wallpaper under the given generator settings"""
+        content_hash = self.hasher.hash(wallpaper_path)
+        return hashlib.blake2b(f"{content_hash}:{settings}".encode(), digest_size=16).hexdigest()
+
+    def known_key(self, wallpaper_path: Path, settings: str) -> str | None:
+        """Store key if the wallpaper's content hash is memoized, without reading it"""
+        content_hash = self.hasher.known(wallpaper_path, wallpaper_path.stat())
+        if content_hash is None:
+            return None
+        return hashlib.blake2b(f"{content_hash}:{settings}".encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _pinned_path(self, key: str) -> Path:
+        return self.pinned_directory / f"{key}.json"
+
+    def contains(self, key: str) -> bool:
+        """Check if a palette is stored under key"""
+        return self._pinned_path(key).exists() or self._path(key).exists()
+
+    def is_pinned(self, key: str) -> bool:
+        """Check if the palette under key is pinned"""
+        return self._pinned_path(key).exists()
+
+    def get(self, key: str) -> bytes | None:
+        """Read the palette stored under key, marking it recently used"""
+        try:
+            return self._pinned_path(key).read_bytes()
+        except FileNotFoundError:
+            pass
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        with self._lock:
+            if self._usage is not None and key in self._usage:
+                self._usage.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes, pinned: bool = False) -> None:
+        """Store a palette. Unpinned, least recently used ones over budget
+        are evicted; a pinned one replaces an unpinned copy."""
+        path = self._pinned_path(key) if pinned else self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._load_usage()
+            self._forget(key)
+            if pinned:
+                self._path(key).unlink(missing_ok=True)
+            else:
+                self._usage[key] = len(data)
+                self._total += len(data)
+                self._evict()
+
+    def pin(self, key: str) -> bool:
+        """Move an unpinned palette out of the LRU budget; False if none is stored"""
+        self.pinned_directory.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(self._path(key), self._pinned_path(key))
+        except FileNotFoundError:
+            return self.is_pinned(key)
+        with self._lock:
+            self._forget(key)
+        return True
+
+    def prune_pinned(self, keep: set[str]) -> int:
+        """Delete pinned palettes whose key is not in keep, returning how many"""
+        removed = 0
+        try:
+            with os.scandir(self.pinned_directory) as it:
+                entries = [entry.path for entry in it
+                           if entry.name.endswith(".json") and entry.name[:-5] not in keep]
+        except FileNotFoundError:
+            return 0
+        for path in entries:
+            Path(path).unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def _load_usage(self) -> None:
+        if self._usage is not None:
+            return
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, entry.name[:-5], st.st_size))
+        self._usage = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._total = sum(self._usage.values())
+
+    def _forget(self, key: str) -> None:
+        size = self._usage.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and len(self._usage) > 1:
+            key, size = self._usage.popitem(last=False)
+            self._total -= size
+            self._path(key).unlink(missing_ok=True)
+
+
+def get_palette_store(config: "Config") -> PaletteStore | None:
+    """Palette store sized from config, or None if palette caching is off"""
+    if config.colors.palette_cache_mb <= 0:
+        return None
+    return PaletteStore(config.colors.palette_cache_mb * 1024 * 1024)
@@ -1,21 +1,36 @@
 """Color generator plugins"""
 
 from pathlib import Path
+from typing import TYPE_CHECKING
+
 from .base import ColorGenerator
+from .cached import CachedColorGenerator
 from .dms import DmsColorGenerator
+from .native import NativeColorGenerator
+
+if TYPE_CHECKING:
+    from ...palettes import PaletteStore
 
 # Registry of available backends
 BACKENDS = {
     "dms": DmsColorGenerator,
+    "native": NativeColorGenerator,
 }
 
 
-def get_backend(name: str, **kwargs) -> ColorGenerator | None:
-    """Get a backend instance by name with given config"""
+def get_backend(name: str, palette_store: "PaletteStore | None" = None, **kwargs) -> ColorGenerator | None:
+    """Get a backend instance by name with given config.
+
+    With a palette_store, the backend is wrapped so palettes for
+    previously seen wallpapers are installed from the store.
+    """
     backend_class = BACKENDS.get(name)
     if backend_class:
-        return backend_class(**kwargs)
+        backend = backend_class(**kwargs)
+        if palette_store is not None:
+            return CachedColorGenerator(backend, palette_store)
+        return backend
     return None
 
 
-__all__ = ["ColorGenerator", "DmsColorGenerator", "get_backend"]
+__all__ = ["ColorGenerator", "CachedColorGenerator", "DmsColorGenerator", "NativeColorGenerator", "get_backend"]
@@ -1,5 +1,6 @@
 """Color generator protocol"""
 
+import os
 from typing import Protocol, runtime_checkable
 from pathlib import Path
 
@@ -23,3 +24,28 @@ class ColorGenerator(Protocol):
     def is_cached(self, wallpaper_path: Path) -> bool:
         """Check if colors are already cached for this wallpaper"""
         ...
+
+    def generate_outputs(self, wallpaper_path: Path) -> dict[Path, bytes] | None:
+        """Every file generate() would write for the wallpaper (the colors
+        file and any rendered templates), keyed by destination, without
+        writing any of them"""
+        ...
+
+    @property
+    def renders_aside(self) -> bool:
+        """Check if generate_outputs() renders without touching live files,
+        so generated outputs may be cached"""
+        ...
+
+    def settings_fingerprint(self) -> str:
+        """Identify the settings that affect generated colors (for palette caching)"""
+        ...
+
+
+def install_outputs(outputs: dict[Path, bytes]) -> None:
+    """Write generated files to their destinations, each replaced atomically"""
+    for path, data in outputs.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
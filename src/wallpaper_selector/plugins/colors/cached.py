@@ -0,0 +1,137 @@
+"""Output-caching wrapper around any color generator backend"""
+
+import binascii
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .base import install_outputs
+
+if TYPE_CHECKING:
+    from ...palettes import PaletteStore
+    from .base import ColorGenerator
+
+# Stored entry layout; part of the store key, so entries of an older
+# layout are never read back
+ENTRY_FORMAT = "outputs-v1"
+
+
+def encode_outputs(outputs: dict[Path, bytes]) -> bytes:
+    """Serialize generated files for the palette store"""
+    files = {str(path): binascii.b2a_base64(data, newline=False).decode() for path, data in outputs.items()}
+    return json.dumps({"files": files}).encode()
+
+
+def decode_outputs(data: bytes) -> dict[Path, bytes] | None:
+    """Generated files from a stored entry; None if it is unreadable"""
+    try:
+        files = json.loads(data)["files"]
+        return {Path(path): binascii.a2b_base64(content) for path, content in files.items()}
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class CachedColorGenerator:
+    """Serves previously generated color outputs from a PaletteStore.
+
+    A stored entry holds every file a generation writes: the colors file
+    and the templates matugen renders for other applications (GTK,
+    terminals, ...). On a hit they are all installed in milliseconds,
+    without running the backend. On a miss a backend that renders aside
+    (see renders_aside) renders them without touching the live files,
+    they are stored, and then installed the same way, so a hit writes
+    exactly what a miss writes. Other backends generate in place on a
+    miss, and nothing is stored.
+    """
+
+    def __init__(self, inner: "ColorGenerator", store: "PaletteStore"):
+        self.inner = inner
+        self.store = store
+
+    def key(self, wallpaper_path: Path) -> str:
+        """Store key of the wallpaper's outputs under the backend's settings"""
+        return self.store.key(Path(wallpaper_path), self._settings())
+
+    def _settings(self) -> str:
+        return f"{self.inner.settings_fingerprint()}:{ENTRY_FORMAT}"
+
+    def _stored(self, key: str) -> dict[Path, bytes] | None:
+        data = self.store.get(key)
+        return decode_outputs(data) if data is not None else None
+
+    def generate(self, wallpaper_path: Path) -> bool:
+        """Install cached outputs, or generate, cache and install new ones"""
+        try:
+            key = self.key(wallpaper_path)
+        except OSError as e:
+            print(f"Error hashing {wallpaper_path}: {e}")
+            return self.inner.generate(wallpaper_path)
+
+        outputs = self._stored(key)
+        if outputs is None:
+            if not self.inner.renders_aside:
+                return self.inner.generate(wallpaper_path)
+            outputs = self.inner.generate_outputs(wallpaper_path)
+            if outputs is None:
+                # Could not render aside; generate in place, uncached
+                return self.inner.generate(wallpaper_path)
+            self.store.put(key, encode_outputs(outputs))
+        install_outputs(outputs)
+        return True
+
+    def install_stored(self, wallpaper_path: Path) -> bool:
+        """Install stored outputs without reading the wallpaper or running
+        the backend. False unless its content hash is memoized and outputs
+        are stored for it."""
+        try:
+            key = self.store.known_key(Path(wallpaper_path), self._settings())
+        except OSError:
+            return False
+        outputs = self._stored(key) if key is not None else None
+        if outputs is None:
+            return False
+        install_outputs(outputs)
+        return True
+
+    def precompute(self, wallpaper_path: Path, pin: bool = False, key: str | None = None) -> str:
+        """Store outputs for the wallpaper ahead of time, without installing them.
+
+        Pinned outputs are kept out of the store's LRU eviction (see
+        PaletteStore). key, if given, is the wallpaper's store key. Returns
+        "cached" if they were already stored, "generated" or "failed".
+        """
+        key = key or self.key(wallpaper_path)
+        if self.store.contains(key):
+            if pin:
+                self.store.pin(key)
+            return "cached"
+        outputs = self.inner.generate_outputs(wallpaper_path)
+        if outputs is None:
+            return "failed"
+        self.store.put(key, encode_outputs(outputs), pinned=pin)
+        return "generated"
+
+    def generate_outputs(self, wallpaper_path: Path) -> dict[Path, bytes] | None:
+        """Generate the wallpaper's files without installing them"""
+        return self.inner.generate_outputs(wallpaper_path)
+
+    @property
+    def renders_aside(self) -> bool:
+        """Whether the wrapped backend renders aside"""
+        return self.inner.renders_aside
+
+    def update_session(self, wallpaper_path: Path) -> bool:
+        """Update session file with current wallpaper path"""
+        return self.inner.update_session(wallpaper_path)
+
+    def get_colors_path(self) -> Path:
+        """Get the path where generated colors are stored"""
+        return self.inner.get_colors_path()
+
+    def is_cached(self, wallpaper_path: Path) -> bool:
+        """Check if the installed colors already belong to this wallpaper"""
+        return self.inner.is_cached(wallpaper_path)
+
+    def settings_fingerprint(self) -> str:
+        """Settings of the wrapped backend"""
+        return self.inner.settings_fingerprint()
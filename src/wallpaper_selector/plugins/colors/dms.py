@@ -1,9 +1,69 @@
 """DMS (DankMaterialShell) color generator implementation"""
 
 import json
+import os
 import subprocess
+import time
 from pathlib import Path
 
+# How long to wait for matugen to write a scratch palette (seconds)
+PALETTE_TIMEOUT = 30.0
+# Scratch output counts as complete once no file changed for this long (seconds)
+QUIET_TIME = 0.2
+# XDG base directories matugen templates may write to, with their defaults
+# relative to the home directory
+XDG_DIRS = {
+    "XDG_CONFIG_HOME": ".config",
+    "XDG_DATA_HOME": ".local/share",
+    "XDG_STATE_HOME": ".local/state",
+}
+
+
+def _snapshot_entry(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _snapshot(root: Path) -> dict[Path, tuple[int, int]]:
+    """(size, mtime_ns) of every file under root"""
+    snapshot = {}
+    for path in root.rglob("*"):
+        if path.is_file() and (entry := _snapshot_entry(path)) is not None:
+            snapshot[path] = entry
+    return snapshot
+
+
+def _wait_quiet(root: Path, deadline: float) -> None:
+    """Wait until no file under root changed for QUIET_TIME"""
+    previous = _snapshot(root)
+    while time.monotonic() < deadline:
+        time.sleep(QUIET_TIME)
+        current = _snapshot(root)
+        if current == previous:
+            return
+        previous = current
+
+
+def _collect(targets: dict[Path, Path], seeded: dict[Path, tuple[int, int]]) -> dict[Path, bytes]:
+    """Files written under each scratch directory, keyed by the matching
+    path under the directory it stands in for. Files copied in beforehand
+    (seeded) and left as they were are skipped. Nested scratch directories
+    (e.g. ~/.config inside the scratch home) take precedence."""
+    outputs = {}
+    claimed: set[Path] = set()
+    for scratch in sorted(targets, key=lambda p: len(p.parts), reverse=True):
+        for path in scratch.rglob("*"):
+            if path in claimed or not path.is_file():
+                continue
+            claimed.add(path)
+            if path in seeded and _snapshot_entry(path) == seeded[path]:
+                continue
+            outputs[targets[scratch] / path.relative_to(scratch)] = path.read_bytes()
+    return outputs
+
 
 class DmsColorGenerator:
     """DMS/matugen color generator backend"""
@@ -14,11 +74,20 @@ class DmsColorGenerator:
         config_dir: Path,
         shell_dir: Path,
         session_file: Path,
+        render_aside: bool = False,
     ):
         self.state_dir = state_dir
         self.config_dir = config_dir
         self.shell_dir = shell_dir
         self.session_file = session_file
+        self.render_aside = render_aside
+
+    @property
+    def renders_aside(self) -> bool:
+        """Opt-in (render_aside): generate_outputs() keeps matugen off the
+        live files only if it renders templates in the environment of the
+        queueing `dms` command"""
+        return self.render_aside
 
     def generate(self, wallpaper_path: Path) -> bool:
         """Generate colors via DMS matugen integration"""
@@ -39,6 +108,80 @@ class DmsColorGenerator:
             print(f"Error generating colors with DMS: {e}")
             return False
 
+    def generate_outputs(self, wallpaper_path: Path) -> dict[Path, bytes] | None:
+        """Run matugen against scratch directories and collect what it wrote.
+
+        Every directory matugen writes to is scratch: the state dir, a
+        copy of the config dir (its settings.json is read, theme files
+        are written next to it) and the home and XDG directories, below
+        which it renders templates for other applications (GTK,
+        terminals, ...). The user's matugen config and templates are
+        copied into the scratch XDG config dir. Nothing live changes; each
+        file written is keyed by where a live run would have written it,
+        copies left as they were are not kept. The XDG cache dir is
+        scratch but not kept either. The shell dir only holds DMS's own
+        templates, which are read, so it is passed as is.
+        """
+        # Imported here: the boot sync loads this module but never renders aside
+        import shutil
+        import tempfile
+
+        home = Path.home()
+        with tempfile.TemporaryDirectory(prefix="wallpaper-selector-") as scratch:
+            scratch = Path(scratch)
+            state_dir = scratch / "state"
+            config_dir = scratch / "config"
+            scratch_home = scratch / "home"
+            state_dir.mkdir()
+            scratch_home.mkdir()
+            if self.config_dir.is_dir():
+                shutil.copytree(self.config_dir, config_dir, ignore_dangling_symlinks=True)
+            else:
+                config_dir.mkdir()
+            # Scratch directory -> the live directory it stands in for
+            targets = {state_dir: self.state_dir, config_dir: self.config_dir, scratch_home: home}
+            env = dict(os.environ, HOME=str(scratch_home), XDG_CACHE_HOME=str(scratch / "cache"))
+            for variable, default in XDG_DIRS.items():
+                live = Path(os.environ.get(variable) or home / default)
+                env[variable] = str(scratch_home / default)
+                targets[scratch_home / default] = live
+                if variable == "XDG_CONFIG_HOME" and (live / "matugen").is_dir():
+                    shutil.copytree(live / "matugen", scratch_home / default / "matugen",
+                                    ignore_dangling_symlinks=True)
+            seeded = _snapshot(scratch)
+
+            # One budget for the queue command and the wait for its output
+            deadline = time.monotonic() + PALETTE_TIMEOUT
+            try:
+                result = subprocess.run(
+                    ['dms', 'matugen', 'queue',
+                     '--state-dir', str(state_dir),
+                     '--config-dir', str(config_dir),
+                     '--shell-dir', str(self.shell_dir),
+                     '--value', str(wallpaper_path)],
+                    capture_output=True,
+                    text=True,
+                    timeout=PALETTE_TIMEOUT,
+                    env=env,
+                )
+            except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+                print(f"Error generating colors with DMS: {e}")
+                return None
+            if result.returncode != 0:
+                print(f"Error generating colors with DMS (exit {result.returncode}): "
+                      f"{result.stderr.strip()}")
+                return None
+
+            # The queue may finish asynchronously
+            colors_file = state_dir / "dms-colors.json"
+            while not colors_file.exists():
+                if time.monotonic() > deadline:
+                    return None
+                time.sleep(0.1)
+            # Templates may still be rendering after the colors file appeared
+            _wait_quiet(scratch, deadline)
+            return _collect(targets, seeded)
+
     def update_session(self, wallpaper_path: Path) -> bool:
         """Update DMS session.json with current wallpaper path"""
         try:
@@ -65,6 +208,17 @@ class DmsColorGenerator:
         """Get the path where generated colors are stored"""
         return self.state_dir / "dms-colors.json"
 
+    def settings_fingerprint(self) -> str:
+        """DMS settings (scheme type, contrast, ...) that shape matugen output"""
+        import hashlib
+
+        digest = hashlib.blake2b(b"dms", digest_size=16)
+        try:
+            digest.update((self.config_dir / "settings.json").read_bytes())
+        except OSError:
+            pass
+        return digest.hexdigest()
+
     def is_cached(self, wallpaper_path: Path) -> bool:
         """Check if colors are already cached for this wallpaper"""
         # Check if colors file exists
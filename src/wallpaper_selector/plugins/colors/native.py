@@ -0,0 +1,223 @@
+"""Native in-process palette extractor (NumPy k-means on cached thumbnails)
+
+Produces a Material-style ``dms-colors.json`` (``colors.dark`` and
+``colors.light`` role maps) without spawning matugen or decoding the
+full-size wallpaper: pixels come from the small cached thumbnail.
+Requires the optional ``numpy`` dependency (``pip install
+wallpaper-selector[native]``). It is imported on first use: this module
+is loaded with the color plugins by every command, including the
+boot-time sync, which never extracts a palette.
+"""
+
+import colorsys
+import importlib.util
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .base import install_outputs
+from .dms import DmsColorGenerator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Thumbnail tier the pixels are sampled from
+SAMPLE_TIER = "small"
+# Pixels fed to k-means (subsampled from the thumbnail)
+SAMPLE_PIXELS = 4096
+CLUSTERS = 8
+ITERATIONS = 12
+SEED = 0x5EED
+
+# Material-style roles as (hue source, saturation scale, lightness) per theme.
+# Hue sources: "primary" is the seed hue, "tertiary" is rotated by 60 degrees,
+# "neutral" keeps the seed hue with very low saturation.
+ROLES = {
+    "dark": {
+        "primary": ("primary", 1.0, 0.80),
+        "on_primary": ("primary", 1.0, 0.20),
+        "primary_container": ("primary", 1.0, 0.30),
+        "on_primary_container": ("primary", 1.0, 0.90),
+        "secondary": ("primary", 0.35, 0.78),
+        "on_secondary": ("primary", 0.35, 0.20),
+        "secondary_container": ("primary", 0.35, 0.30),
+        "on_secondary_container": ("primary", 0.35, 0.90),
+        "tertiary": ("tertiary", 0.6, 0.78),
+        "on_tertiary": ("tertiary", 0.6, 0.20),
+        "tertiary_container": ("tertiary", 0.6, 0.30),
+        "on_tertiary_container": ("tertiary", 0.6, 0.90),
+        "background": ("neutral", 0.12, 0.07),
+        "on_background": ("neutral", 0.12, 0.90),
+        "surface": ("neutral", 0.12, 0.07),
+        "on_surface": ("neutral", 0.12, 0.90),
+        "surface_variant": ("neutral", 0.2, 0.18),
+        "on_surface_variant": ("neutral", 0.2, 0.80),
+        "surface_container": ("neutral", 0.12, 0.12),
+        "surface_container_high": ("neutral", 0.12, 0.17),
+        "outline": ("neutral", 0.15, 0.56),
+        "outline_variant": ("neutral", 0.15, 0.30),
+    },
+    "light": {
+        "primary": ("primary", 1.0, 0.40),
+        "on_primary": ("primary", 1.0, 0.99),
+        "primary_container": ("primary", 1.0, 0.90),
+        "on_primary_container": ("primary", 1.0, 0.10),
+        "secondary": ("primary", 0.35, 0.40),
+        "on_secondary": ("primary", 0.35, 0.99),
+        "secondary_container": ("primary", 0.35, 0.90),
+        "on_secondary_container": ("primary", 0.35, 0.10),
+        "tertiary": ("tertiary", 0.6, 0.40),
+        "on_tertiary": ("tertiary", 0.6, 0.99),
+        "tertiary_container": ("tertiary", 0.6, 0.90),
+        "on_tertiary_container": ("tertiary", 0.6, 0.10),
+        "background": ("neutral", 0.12, 0.98),
+        "on_background": ("neutral", 0.12, 0.10),
+        "surface": ("neutral", 0.12, 0.98),
+        "on_surface": ("neutral", 0.12, 0.10),
+        "surface_variant": ("neutral", 0.2, 0.90),
+        "on_surface_variant": ("neutral", 0.2, 0.30),
+        "surface_container": ("neutral", 0.12, 0.94),
+        "surface_container_high": ("neutral", 0.12, 0.92),
+        "outline": ("neutral", 0.15, 0.50),
+        "outline_variant": ("neutral", 0.15, 0.80),
+    },
+}
+FIXED_ROLES = {
+    "dark": {"error": "#ffb4ab", "on_error": "#690005"},
+    "light": {"error": "#ba1a1a", "on_error": "#ffffff"},
+}
+
+
+def available() -> bool:
+    """Check if NumPy is installed, without importing it"""
+    return importlib.util.find_spec("numpy") is not None
+
+
+def kmeans(pixels: "np.ndarray", k: int = CLUSTERS, iterations: int = ITERATIONS,
+           seed: int = SEED) -> tuple["np.ndarray", "np.ndarray"]:
+    """Cluster (N, 3) float pixels; returns (centers, population per center)"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    k = min(k, len(pixels))
+    centers = pixels[rng.choice(len(pixels), k, replace=False)]
+    squared = (pixels ** 2).sum(1)[:, None]
+
+    def assign(centers: "np.ndarray") -> "np.ndarray":
+        # (N, k) squared distances via |p|^2 - 2 p.c + |c|^2
+        distances = squared - 2 * pixels @ centers.T + (centers ** 2).sum(1)[None, :]
+        return distances.argmin(1)
+
+    for _ in range(iterations):
+        labels = assign(centers)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=pixels[:, c], minlength=k)
+                         for c in range(3)], axis=1)
+        occupied = counts > 0
+        new_centers = centers.copy()
+        new_centers[occupied] = sums[occupied] / counts[occupied, None]
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+    # Populations of the returned centers: without convergence the counts
+    # above belong to the previous ones
+    return centers, np.bincount(assign(centers), minlength=k)
+
+
+def seed_color(pixels: "np.ndarray") -> tuple[float, float, float]:
+    """Pick the palette seed: the populous cluster with the most chroma, as HLS"""
+    centers, counts = kmeans(pixels)
+    maxc = centers.max(1)
+    minc = centers.min(1)
+    chroma = maxc - minc
+    # Favour colourful clusters, but not tiny specks of colour
+    score = counts / counts.sum() * (0.1 + chroma)
+    r, g, b = centers[score.argmax()]
+    return colorsys.rgb_to_hls(r, g, b)
+
+
+def build_palette(hue: float, saturation: float) -> dict:
+    """Material-style role colors for both themes from a seed hue/saturation"""
+    # Keep accents vivid even for muted wallpapers
+    saturation = min(max(saturation, 0.35), 0.85)
+    hues = {
+        "primary": hue,
+        "tertiary": (hue + 1 / 6) % 1.0,
+        "neutral": hue,
+    }
+    colors = {}
+    for theme, roles in ROLES.items():
+        colors[theme] = {}
+        for role, (source, sat_scale, lightness) in roles.items():
+            r, g, b = colorsys.hls_to_rgb(hues[source], lightness, saturation * sat_scale)
+            colors[theme][role] = "#{:02x}{:02x}{:02x}".format(
+                round(r * 255), round(g * 255), round(b * 255))
+        colors[theme].update(FIXED_ROLES[theme])
+    return {"colors": colors}
+
+
+def load_pixels(wallpaper_path: Path) -> "np.ndarray":
+    """Subsampled (N, 3) float pixels in [0, 1] from the cached thumbnail"""
+    import numpy as np
+    from gi.repository import GdkPixbuf
+    from ...thumbnail_cache import get_thumbnail
+
+    thumbnail = get_thumbnail(Path(wallpaper_path), SAMPLE_TIER)
+    if thumbnail is None:
+        raise ValueError(f"no thumbnail for {wallpaper_path}")
+
+    pixbuf = GdkPixbuf.Pixbuf.new_from_file(str(thumbnail))
+    width, height = pixbuf.get_width(), pixbuf.get_height()
+    channels, rowstride = pixbuf.get_n_channels(), pixbuf.get_rowstride()
+    data = np.frombuffer(pixbuf.get_pixels(), dtype=np.uint8)
+    # Rows are padded to rowstride; the last row may not be
+    rows = np.lib.stride_tricks.as_strided(
+        data, shape=(height, width, channels), strides=(rowstride, channels, 1))
+    pixels = rows[..., :3].reshape(-1, 3)
+
+    step = max(1, len(pixels) // SAMPLE_PIXELS)
+    return pixels[::step].astype(np.float64) / 255.0
+
+
+def extract_palette(pixels: "np.ndarray") -> dict:
+    """Colors JSON structure for (N, 3) float pixels"""
+    hue, _, saturation = seed_color(pixels)
+    return build_palette(hue, saturation)
+
+
+class NativeColorGenerator(DmsColorGenerator):
+    """In-process palette backend writing a DMS-compatible colors file.
+
+    Shares session handling and the colors file location with the DMS
+    backend; only generation differs.
+    """
+
+    def generate_outputs(self, wallpaper_path: Path) -> dict[Path, bytes] | None:
+        """Extract a palette from the cached thumbnail; the colors file is
+        the only output (no templates are rendered)"""
+        if not available():
+            print("The native color backend requires numpy")
+            return None
+        try:
+            palette = extract_palette(load_pixels(wallpaper_path))
+        except Exception as e:
+            print(f"Error extracting colors from {wallpaper_path}: {e}")
+            return None
+        return {self.get_colors_path(): json.dumps(palette, indent=2).encode()}
+
+    @property
+    def renders_aside(self) -> bool:
+        """Always: extraction happens in memory"""
+        return True
+
+    def generate(self, wallpaper_path: Path) -> bool:
+        """Extract a palette and install it as the current colors file"""
+        outputs = self.generate_outputs(wallpaper_path)
+        if outputs is None:
+            return False
+        install_outputs(outputs)
+        return True
+
+    def settings_fingerprint(self) -> str:
+        """Extractor parameters that shape the output"""
+        return f"native:v1:{SAMPLE_TIER}:{SAMPLE_PIXELS}:{CLUSTERS}:{ITERATIONS}:{SEED}"
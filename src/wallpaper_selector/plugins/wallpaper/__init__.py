@@ -2,10 +2,12 @@
 
 from .base import WallpaperBackend
 from .swww import SwwwBackend
+from .swww_ipc import SwwwIpcBackend
 
 # Registry of available backends
 BACKENDS = {
     "swww": SwwwBackend,
+    "swww-ipc": SwwwIpcBackend,
 }
 
 
@@ -14,4 +16,4 @@ def get_backend(name: str) -> type[WallpaperBackend] | None:
     return BACKENDS.get(name)
 
 
-__all__ = ["WallpaperBackend", "SwwwBackend", "get_backend"]
+__all__ = ["WallpaperBackend", "SwwwBackend", "SwwwIpcBackend", "get_backend"]
@@ -0,0 +1,133 @@
+"""swww backend using the daemon's Unix socket for liveness and readiness
+
+Only those two use the socket: checking whether swww-daemon is up is a
+socket connect instead of a ``pgrep`` fork, and starting the daemon
+waits until its socket accepts connections instead of sleeping for a
+fixed time.
+
+Querying and setting an image still run the ``swww`` client (``swww
+query``, parsed into one ``OutputInfo`` per output, and ``swww img``).
+The client speaks a version-specific binary protocol with the daemon,
+and for images also decodes and resizes them and hands them over in
+shared memory, which is not worth reimplementing here.
+"""
+
+import os
+import re
+import socket
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .swww import CMD_TIMEOUT, SwwwBackend
+
+# How long to wait for a freshly started daemon to accept connections (seconds)
+READY_TIMEOUT = 5.0
+READY_INTERVAL = 0.01
+CONNECT_TIMEOUT = 0.5
+
+# "eDP-1: 1920x1080, scale: 1, currently displaying: image: /path/to/img.png"
+QUERY_LINE = re.compile(
+    r"^:?\s*(?P<name>[^:]+):\s*(?P<width>\d+)x(?P<height>\d+),\s*"
+    r"scale:\s*(?P<scale>[\d.]+),\s*currently displaying:\s*"
+    r"(?P<kind>image|color):\s*(?P<value>.*)$"
+)
+
+
+@dataclass(frozen=True)
+class OutputInfo:
+    """What swww-daemon is displaying on one output"""
+
+    name: str
+    width: int
+    height: int
+    scale: float
+    image: str | None = None
+    color: str | None = None
+
+
+def parse_query(text: str) -> list[OutputInfo]:
+    """Parse ``swww query`` output, skipping lines it does not recognise"""
+    outputs = []
+    for line in text.splitlines():
+        match = QUERY_LINE.match(line.strip())
+        if not match:
+            continue
+        value = match["value"].strip()
+        outputs.append(OutputInfo(
+            name=match["name"].strip(),
+            width=int(match["width"]),
+            height=int(match["height"]),
+            scale=float(match["scale"]),
+            image=value if match["kind"] == "image" else None,
+            color=value if match["kind"] == "color" else None,
+        ))
+    return outputs
+
+
+def socket_paths() -> list[Path]:
+    """Candidate daemon socket paths, newest swww naming first"""
+    runtime_dir = Path(os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}"))
+    wayland_display = os.environ.get("WAYLAND_DISPLAY", "wayland-0")
+    return [
+        runtime_dir / f"swww-{wayland_display}.socket",
+        runtime_dir / "swww.socket",
+    ]
+
+
+def probe_socket(path: Path, timeout: float = CONNECT_TIMEOUT) -> bool:
+    """Check if something is accepting connections on a Unix socket"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class SwwwIpcBackend(SwwwBackend):
+    """swww backend that probes the daemon socket instead of forking"""
+
+    def is_daemon_running(self) -> bool:
+        """Check if swww-daemon accepts connections on its socket"""
+        return any(probe_socket(path) for path in socket_paths())
+
+    def start_daemon(self) -> None:
+        """Start swww-daemon and wait until its socket is ready"""
+        subprocess.Popen(['swww-daemon'], start_new_session=True)
+        if not self.wait_until_ready():
+            print("Timeout waiting for swww-daemon to start")
+
+    def wait_until_ready(self, timeout: float = READY_TIMEOUT) -> bool:
+        """Poll the daemon socket until it accepts connections"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_daemon_running():
+                return True
+            time.sleep(READY_INTERVAL)
+        return False
+
+    def query_outputs(self) -> list[OutputInfo]:
+        """What the daemon is displaying on each output, via ``swww query``"""
+        try:
+            result = subprocess.run(
+                ['swww', 'query'],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=CMD_TIMEOUT
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            return []
+        return parse_query(result.stdout)
+
+    def get_current_wallpaper(self) -> str | None:
+        """Image shown on the first output that displays one"""
+        for output in self.query_outputs():
+            if output.image:
+                return output.image
+        return None
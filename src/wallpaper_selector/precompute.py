@@ -0,0 +1,179 @@
+"""Palette precomputation - generate color schemes for the whole library
+
+Runs the color backend for every wallpaper that has no stored palette
+yet, so interactive wallpaper changes install a cached palette instead
+of waiting for generation. Progress lives in the palette store itself,
+which makes runs resumable and incremental: a rerun only processes new
+or changed images. Precomputed palettes are pinned, so the store's size
+budget for palettes generated on demand never evicts them.
+
+Only backends that render aside (see ColorGenerator.renders_aside) are
+precomputed. The GUI starts a run once its library scan is over, if the
+scan found changes or no run has completed yet.
+"""
+
+import fcntl
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+from .cache import CACHE_DIR
+from .config import load_config
+from .library import LibraryIndex
+from .models.wallpaper_manager import wallpaper_extensions
+from .palettes import get_palette_store
+from .plugins.colors import CachedColorGenerator, get_backend as get_color_backend
+
+LOCK_FILE = CACHE_DIR / "precompute.lock"
+# Touched when a run completes
+DONE_FILE = CACHE_DIR / "precompute.done"
+
+
+def lower_priority() -> None:
+    """Drop this process (and its children) to idle CPU and I/O priority"""
+    try:
+        os.nice(19)
+    except OSError:
+        pass
+    try:
+        # Idle I/O scheduling class; inherited by backend subprocesses
+        subprocess.run(['ionice', '-c', '3', '-p', str(os.getpid())],
+                       capture_output=True, timeout=5)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        pass
+
+
+def precompute_palettes(
+    wallpapers: list[Path],
+    generator: CachedColorGenerator,
+    jobs: int = 2,
+    progress_callback: Callable[[Path, str], None] | None = None,
+    keys: set[str] | None = None,
+) -> dict[str, int]:
+    """Store a pinned palette for each wallpaper that lacks one.
+
+    Args:
+        wallpapers: Wallpapers to process
+        generator: Palette-caching color generator
+        jobs: Maximum number of concurrent backend runs
+        progress_callback: Optional callback(path, result) per wallpaper
+        keys: Optional set receiving the store key of every wallpaper processed
+
+    Returns:
+        Counts of "cached", "generated" and "failed" wallpapers
+    """
+    counts = {"cached": 0, "generated": 0, "failed": 0}
+
+    def work(path: Path) -> str:
+        try:
+            key = generator.key(path)
+            if keys is not None:
+                keys.add(key)
+            return generator.precompute(path, pin=True, key=key)
+        except OSError as e:
+            print(f"Error precomputing colors for {path}: {e}")
+            return "failed"
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="palette") as executor:
+        futures = {executor.submit(work, path): path for path in wallpapers}
+        for future in as_completed(futures):
+            result = future.result()
+            counts[result] += 1
+            if progress_callback:
+                progress_callback(futures[future], result)
+    return counts
+
+
+def has_completed() -> bool:
+    """Check if a precomputation run has completed before"""
+    return DONE_FILE.exists()
+
+
+def spawn_background() -> None:
+    """Start precomputation of the indexed library in a detached
+    low-priority process (the caller has just reconciled the index)"""
+    subprocess.Popen(
+        [sys.executable, '-m', 'wallpaper_selector', 'precompute-colors', '--indexed'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main(jobs: int | None = None, verbose: bool = False, indexed: bool = False) -> int:
+    """Precompute palettes for the library - returns 0 on success, 1 on failure.
+
+    With indexed, the library index is used as is instead of reconciled first.
+    """
+    config = load_config()
+    if not config.colors.enabled:
+        if verbose:
+            print("precompute: Color generation disabled, skipping")
+        return 0
+
+    store = get_palette_store(config)
+    if store is None:
+        print("precompute: Palette cache disabled (colors.palette_cache_mb = 0)")
+        return 1
+
+    generator = get_color_backend(
+        config.colors.backend.name,
+        state_dir=config.colors.backend.state_dir,
+        config_dir=config.colors.backend.config_dir,
+        shell_dir=config.colors.backend.shell_dir,
+        session_file=config.colors.backend.session_file,
+        render_aside=config.colors.backend.render_aside,
+        palette_store=store,
+    )
+    if not generator:
+        print(f"precompute: Unknown color backend: {config.colors.backend.name}")
+        return 1
+    if not generator.renders_aside:
+        print(f"precompute: The {config.colors.backend.name} backend only generates in place "
+              "(see colors.backend.render_aside), skipping")
+        return 0
+
+    # Only one run at a time; a second one has nothing to add
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if verbose:
+                print("precompute: Already running")
+            return 0
+
+        lower_priority()
+
+        roots = config.wallpaper.roots
+        library = LibraryIndex()
+        if not indexed:
+            library.reconcile(roots, wallpaper_extensions(config), config.wallpaper.recursive)
+        wallpapers = [record.path for record in library.load(roots)]
+
+        def report(path: Path, result: str) -> None:
+            if verbose and result != "cached":
+                print(f"precompute: {result} {path.name}")
+
+        keys: set[str] = set()
+        counts = precompute_palettes(
+            wallpapers, generator,
+            jobs=jobs or config.colors.precompute_jobs,
+            progress_callback=report,
+            keys=keys,
+        )
+        # Palettes of wallpapers no longer in the library (or made under
+        # other settings); one that vanished mid-run has no key and goes too
+        pruned = generator.store.prune_pinned(keys)
+        if verbose and pruned:
+            print(f"precompute: Dropped {pruned} palettes of removed wallpapers")
+        DONE_FILE.touch()
+
+    if verbose:
+        print(f"precompute: {counts['generated']} generated, "
+              f"{counts['cached']} already cached, {counts['failed']} failed")
+    return 1 if counts["failed"] else 0
@@ -0,0 +1,200 @@
+"""Predictive pre-warming - ready the likely next wallpaper while idle
+
+Setting a wallpaper nobody has set before pays for reading the original
+(swww decodes it in full) and for its color scheme. While the selector
+sits idle, the few wallpapers most likely to be set next are warmed:
+
+- the original is read ahead into the page cache (posix_fadvise WILLNEED)
+- its palette is generated into the palette store, if not stored yet and
+  the color backend renders aside; otherwise only its content hash is
+  computed, which a set needs to look the palette up
+- its carousel thumbnail is generated if missing and decoded into the
+  texture cache
+
+Candidates come from the usage log's transitions (what was set after the
+current wallpaper before) plus the wallpaper shown in the carousel and
+its neighbours.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, Sequence, TYPE_CHECKING
+
+from .usage import UsageLog
+
+if TYPE_CHECKING:
+    from .plugins.colors import CachedColorGenerator
+
+# Wallpapers warmed per idle period
+PREWARM_COUNT = 3
+# Quiet time after navigating before warming starts (milliseconds)
+IDLE_DELAY_MS = 400
+# Score of the wallpaper shown in the carousel; a prediction from the
+# transitions scores its probability (0-1), a neighbour at distance d
+# scores NEIGHBOUR_WEIGHT / (d + 1)
+NEIGHBOUR_WEIGHT = 0.5
+
+
+def _call_directly(func: Callable, *args) -> None:
+    func(*args)
+
+
+def _lower_thread_priority() -> None:
+    """Run the calling thread, and processes it spawns, at idle CPU priority"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+def predict(
+    usage: UsageLog,
+    current: Optional[Path],
+    nearby: Sequence[Path],
+    count: int = PREWARM_COUNT,
+) -> list[Path]:
+    """Most likely next wallpapers, best first.
+
+    nearby is the wallpaper shown in the carousel followed by its
+    neighbours, nearest first, alternating sides.
+    """
+    scores: dict[Path, float] = {}
+    if current is not None:
+        following = usage.following(current)
+        total = sum(following.values())
+        for path, times in following.items():
+            scores[path] = times / total
+    for i, path in enumerate(nearby):
+        distance = (i + 1) // 2
+        scores[path] = scores.get(path, 0.0) + NEIGHBOUR_WEIGHT / (distance + 1)
+    scores.pop(current, None)
+    return sorted(scores, key=scores.get, reverse=True)[:count]
+
+
+def readahead(path: Path) -> int:
+    """Ask the kernel to read path into the page cache, returning its size"""
+    if not hasattr(os, "posix_fadvise"):
+        return 0
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+    return size
+
+
+class Prewarmer:
+    """Warms predicted wallpapers on a background thread and counts how
+    often the wallpaper set next was one of them.
+
+    A newer schedule() supersedes the candidates of an older one not
+    warmed yet. Callbacks (the texture warm-up) are passed through
+    ``dispatch`` so a GUI can marshal them onto its main loop.
+    """
+
+    def __init__(
+        self,
+        usage: UsageLog,
+        generator: Optional["CachedColorGenerator"] = None,
+        warm_texture: Optional[Callable[[Path], None]] = None,
+        dispatch: Callable = _call_directly,
+        count: int = PREWARM_COUNT,
+    ):
+        self.usage = usage
+        self.generator = generator
+        self.warm_texture = warm_texture
+        self.dispatch = dispatch
+        self.count = count
+        self._lock = threading.Lock()
+        self._generation = 0
+        # Below the interactive set pipeline, which may run the same backend
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prewarm",
+                                            initializer=_lower_thread_priority)
+        # Warmed wallpapers not set yet, with the seconds of palette work done ahead
+        self._warmed: dict[Path, float] = {}
+
+        self.warmed = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+        self.readahead_bytes = 0
+
+    def schedule(self, current: Optional[Path], nearby: Sequence[Path]) -> None:
+        """Warm the likely next wallpapers (see predict) in the background"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._executor.submit(self._run, generation, current, list(nearby))
+
+    def _is_superseded(self, generation: int) -> bool:
+        with self._lock:
+            return generation != self._generation
+
+    def _run(self, generation: int, current: Optional[Path], nearby: list[Path]) -> None:
+        if self._is_superseded(generation):
+            return
+        for path in predict(self.usage, current, nearby, self.count):
+            if self._is_superseded(generation):
+                return
+            with self._lock:
+                if path in self._warmed:
+                    continue
+            try:
+                self._warm(path)
+            except OSError as e:
+                print(f"Error pre-warming {path}: {e}")
+
+    def _warm(self, path: Path) -> None:
+        size = readahead(path)
+        seconds = 0.0
+        if self.generator is not None and not self.generator.renders_aside:
+            # Generating would mean running the backend in place; only
+            # memoize the content hash a set looks the palette up by
+            self.generator.key(path)
+        elif self.generator is not None:
+            # Includes hashing the file for the palette key, also paid by a
+            # set; rendered aside, so nothing live changes until it is set
+            start = time.perf_counter()
+            if self.generator.precompute(path) == "generated":
+                # Only a palette not stored before saves the set any work
+                seconds = time.perf_counter() - start
+        if self.warm_texture:
+            self.dispatch(self.warm_texture, path)
+        with self._lock:
+            self._warmed[path] = seconds
+            self.warmed += 1
+            self.readahead_bytes += size
+
+    def on_set(self, path: Path) -> None:
+        """Count a wallpaper being set as a hit if it was warmed"""
+        with self._lock:
+            seconds = self._warmed.pop(path, None)
+            if seconds is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.saved += seconds
+
+    def stats(self) -> dict:
+        """Prediction counters. saved_seconds is the palette generation
+        done ahead for wallpapers that were then set, not counting
+        palettes that were already stored; the readahead's share is not
+        measured."""
+        with self._lock:
+            sets = self.hits + self.misses
+            return {
+                "warmed": self.warmed,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / sets if sets else 0.0,
+                "saved_seconds": self.saved,
+                "readahead_bytes": self.readahead_bytes,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the warming thread without waiting for queued work"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,48 @@
+"""Resident mode client - talks to a running selector over D-Bus
+
+A resident selector is a Gtk.Application that stays alive with its
+window hidden. A second invocation only needs to ask it to toggle the
+window, which is done here with a plain D-Bus call so that the client
+never loads GTK.
+"""
+
+from gi.repository import Gio, GLib
+
+APPLICATION_ID = "com.github.wallpaper-selector"
+# Timeout for calls to the resident instance (milliseconds)
+CALL_TIMEOUT = 1000
+
+
+def _object_path(application_id: str) -> str:
+    """Object path GApplication exports itself on, derived from its ID"""
+    return "/" + application_id.replace(".", "/").replace("-", "_")
+
+
+def _call(method: str, parameters: GLib.Variant) -> bool:
+    """Call an org.freedesktop.Application method on the resident instance"""
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        bus.call_sync(
+            APPLICATION_ID,
+            _object_path(APPLICATION_ID),
+            "org.freedesktop.Application",
+            method,
+            parameters,
+            None,
+            Gio.DBusCallFlags.NO_AUTO_START,
+            CALL_TIMEOUT,
+            None,
+        )
+        return True
+    except GLib.Error:
+        return False
+
+
+def activate_remote() -> bool:
+    """Toggle the resident instance's window. Returns False if none is running."""
+    return _call("Activate", GLib.Variant("(a{sv})", ({},)))
+
+
+def quit_remote() -> bool:
+    """Ask the resident instance to exit. Returns False if none is running."""
+    return _call("ActivateAction", GLib.Variant("(sava{sv})", ("quit", [], {})))
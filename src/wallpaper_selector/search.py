@@ -0,0 +1,104 @@
+"""Search index - filter-as-you-type matching on wallpaper paths
+
+Each wallpaper is keyed by its lowercased path relative to the
+collection root it lives in, so folder names match as well as file
+names. A query is split into terms that must all occur in the key.
+
+Keys are precomputed when wallpapers are added, so a fresh query is a
+single substring pass over a flat list. Typing further only narrows the
+previous result, so each keystroke after the first checks just the
+remaining candidates; deleting characters returns to an earlier result.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+
+def _narrows(terms: list[str], previous: list[str]) -> bool:
+    """Check if every match of terms also matched previous"""
+    return all(any(old in term for term in terms) for old in previous)
+
+
+class SearchIndex:
+    """Searchable keys of a wallpaper collection, kept up to date with
+    add() and remove()"""
+
+    def __init__(self, roots: list[Path]):
+        self.terms: list[str] = []
+        self._prefixes = [str(root).rstrip("/") + "/" for root in roots]
+        # Parallel lists indexed by id; removed wallpapers leave an empty
+        # key behind (matching no term) until the next compaction
+        self._paths: list[Path] = []
+        self._keys: list[str] = []
+        self._ids: dict[Path, int] = {}
+        # (terms, matching ids) of the queries typed so far, each
+        # narrowing the last
+        self._history: list[tuple[list[str], list[int]]] = []
+
+    def key(self, path: Path) -> str:
+        """Lowercase path relative to its root (just the name outside the roots)"""
+        text = str(path)
+        for prefix in self._prefixes:
+            if text.startswith(prefix):
+                return text[len(prefix):].lower()
+        return path.name.lower()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, path: Path) -> None:
+        key = self.key(path)
+        index = self._ids.get(path)
+        if index is None:
+            self._ids[path] = len(self._paths)
+            self._paths.append(path)
+            self._keys.append(key)
+        else:
+            self._keys[index] = key
+        self._history.clear()
+
+    def remove(self, path: Path) -> None:
+        index = self._ids.pop(path, None)
+        if index is None:
+            return
+        self._keys[index] = ""
+        self._history.clear()
+        if len(self._paths) > 2 * len(self._ids) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._paths = list(self._ids)
+        self._keys = [self._keys[self._ids[path]] for path in self._paths]
+        self._ids = {path: index for index, path in enumerate(self._paths)}
+
+    def matches(self, path: Path) -> bool:
+        """Check if path matches the active query"""
+        index = self._ids.get(path)
+        key = self._keys[index] if index is not None else self.key(path)
+        return all(term in key for term in self.terms)
+
+    def search(self, query: str) -> Optional[set[Path]]:
+        """Make query the active one and return its matches (None = no query)"""
+        terms = query.lower().split()
+        self.terms = terms
+        if not terms:
+            self._history.clear()
+            return None
+
+        while self._history and not _narrows(terms, self._history[-1][0]):
+            self._history.pop()
+        if self._history and self._history[-1][0] == terms:
+            found = self._history[-1][1]
+        else:
+            keys = self._keys
+            if self._history:
+                candidates = self._history[-1][1]
+            else:
+                candidates = range(len(keys))
+            # One comprehension per term, most selective (longest) first
+            for term in sorted(terms, key=len, reverse=True):
+                candidates = [i for i in candidates if term in keys[i]]
+            found = candidates
+            self._history.append((terms, found))
+        paths = self._paths
+        return {paths[i] for i in found}
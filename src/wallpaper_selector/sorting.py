@@ -0,0 +1,54 @@
+"""Wallpaper sort orders"""
+
+import re
+from pathlib import Path
+from typing import Optional
+
+# Sort order names in the order the GUI cycles through them, with labels
+SORT_ORDERS = {
+    "newest": "Newest first",
+    "name": "Name",
+    "size": "File size",
+    "resolution": "Resolution",
+    "most-used": "Most used",
+    "recent": "Recently used",
+}
+DEFAULT_SORT = "newest"
+# Orders that change when a wallpaper is set
+USAGE_ORDERS = frozenset({"most-used", "recent"})
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(name: str) -> tuple:
+    """Case-insensitive key ordering "img2" before "img10".
+
+    Text and numbers alternate, so every position compares like types.
+    """
+    parts = _DIGITS.split(name.lower())
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts))
+
+
+def sort_key(
+    order: str,
+    path: Path,
+    size: int,
+    mtime_ns: int,
+    dimensions: Optional[tuple[int, int]] = None,
+    count: int = 0,
+    last_used: int = 0,
+) -> tuple:
+    """Position of a wallpaper under order; ties fall back to newest first"""
+    newest = (-mtime_ns, path.name)
+    if order == "name":
+        return (natural_key(path.name), *newest)
+    if order == "size":
+        return (-size, *newest)
+    if order == "resolution":
+        pixels = dimensions[0] * dimensions[1] if dimensions else 0
+        return (-pixels, *newest)
+    if order == "most-used":
+        return (-count, -last_used, *newest)
+    if order == "recent":
+        return (-last_used, *newest)
+    return newest
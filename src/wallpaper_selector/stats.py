@@ -0,0 +1,41 @@
+"""Runtime statistics - counters saved at exit for `wallpaper-selector stats`"""
+
+import json
+
+from .cache import CACHE_DIR
+
+STATS_FILE = CACHE_DIR / "stats.json"
+
+
+def load_stats() -> dict:
+    """Load statistics from the last session"""
+    try:
+        with open(STATS_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_stats(sections: dict[str, dict]) -> None:
+    """Merge sections into the stats file"""
+    stats = load_stats()
+    stats.update(sections)
+    STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(STATS_FILE, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+def main() -> int:
+    """Print statistics from the last session"""
+    stats = load_stats()
+    if not stats:
+        print("No statistics recorded yet")
+        return 1
+
+    for section, values in stats.items():
+        print(f"{section}:")
+        for key, value in values.items():
+            if isinstance(value, float):
+                value = f"{value:.3f}"
+            print(f"  {key}: {value}")
+    return 0
@@ -64,21 +64,29 @@ window {{
     color: {on_surface_variant};
 }}
 
-flowbox {{
+gridview {{
     background-color: transparent;
 }}
 
-flowboxchild {{
+gridview > child {{
     background-color: transparent;
     outline: none;
     padding: 4px;
 }}
 
-flowboxchild:focus {{
+gridview > child:focus,
+gridview > child:selected {{
+    background-color: transparent;
     outline: none;
 }}
 
-flowboxchild:focus .thumbnail {{
+gridview > child:selected .thumbnail {{
+    outline: 2px solid {primary};
+    outline-offset: 2px;
+    border-radius: 8px;
+}}
+
+.thumbnail {{
     outline: 2px solid {primary};
     outline-offset: 2px;
     border-radius: 8px;
@@ -130,6 +138,19 @@ flowboxchild:focus .thumbnail {{
     color: {on_surface_variant};
 }}
 
+.filter-label {{
+    font-size: 12px;
+    font-weight: 600;
+    color: {primary};
+}}
+
+.search-entry {{
+    background-color: {surface_variant};
+    color: {on_surface};
+    border-radius: 8px;
+    padding: 4px 8px;
+}}
+
 /* Navigation icons */
 .nav-icon {{
     font-size: 24px;
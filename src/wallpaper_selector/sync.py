@@ -4,14 +4,25 @@ from typing import TYPE_CHECKING
 
 from .cache import get_cached_wallpaper
 from .config import load_config
-from .plugins.colors import get_backend as get_color_backend
+from .plugins.colors import CachedColorGenerator, get_backend as get_color_backend
 
 if TYPE_CHECKING:
+    from .palettes import PaletteStore
     from .plugins.colors import ColorGenerator
 
 
-def sync_colors(wallpaper_path: str, color_generator: "ColorGenerator", verbose: bool = False) -> bool:
-    """Sync wallpaper to color generator"""
+def sync_colors(
+    wallpaper_path: str,
+    color_generator: "ColorGenerator",
+    verbose: bool = False,
+    palette_store: "PaletteStore | None" = None,
+) -> bool:
+    """Sync wallpaper to color generator.
+
+    A palette stored for the wallpaper is installed if its content hash is
+    already known; otherwise the backend generates in place, as without a
+    store. Boot never hashes a wallpaper or renders into scratch.
+    """
     try:
         # Check if colors are already cached for this wallpaper
         if color_generator.is_cached(wallpaper_path):
@@ -23,6 +34,11 @@ def sync_colors(wallpaper_path: str, color_generator: "ColorGenerator", verbose:
 
         # Update session file first so it initializes with correct wallpaper
         color_generator.update_session(wallpaper_path)
+        if palette_store is not None and CachedColorGenerator(
+                color_generator, palette_store).install_stored(wallpaper_path):
+            if verbose:
+                print("sync: Installed stored palette")
+            return True
         # Generate colors
         color_generator.generate(wallpaper_path)
         return True
@@ -59,6 +75,7 @@ def main(verbose: bool = False) -> int:
         config_dir=config.colors.backend.config_dir,
         shell_dir=config.colors.backend.shell_dir,
         session_file=config.colors.backend.session_file,
+        render_aside=config.colors.backend.render_aside,
     )
 
     if not color_generator:
@@ -69,7 +86,13 @@ def main(verbose: bool = False) -> int:
     if verbose:
         print(f"sync: Syncing to {config.colors.backend.name}")
 
-    if sync_colors(wallpaper, color_generator, verbose=verbose):
+    palette_store = None
+    if config.colors.palette_cache_mb > 0:
+        # Imported here, so loading the sync command stays cheap
+        from .palettes import get_palette_store
+        palette_store = get_palette_store(config)
+
+    if sync_colors(wallpaper, color_generator, verbose=verbose, palette_store=palette_store):
         if verbose:
             print("sync: Complete")
         return 0
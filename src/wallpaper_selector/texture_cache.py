@@ -0,0 +1,172 @@
+"""Texture cache - decoded thumbnail textures shared by all views"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from gi.repository import Gdk, Gio, GLib
+
+from .thumbnail_cache import get_thumbnail
+
+# Threads decoding (and if needed generating) thumbnails for async loads
+LOADER_THREADS = 2
+
+
+class TextureCache:
+    """LRU cache of Gdk.Texture objects keyed by (path, tier).
+
+    Textures are charged at 4 bytes per pixel against a byte budget;
+    the least recently used ones are evicted once it is exceeded.
+    Showing an image again costs neither disk I/O nor a PNG decode.
+
+    ``load_async`` decodes misses on loader threads and delivers the
+    texture on the main loop, so callers never block on disk or decode.
+    All other methods must be called from the main loop.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._textures: OrderedDict[tuple[str, str], Gdk.Texture] = OrderedDict()
+        self._bytes = 0
+        self._executor = ThreadPoolExecutor(max_workers=LOADER_THREADS, thread_name_prefix="texture")
+        # Callbacks waiting on an in-flight load, keyed like _textures
+        self._loading: dict[tuple[str, str], list[tuple[Callable | None, Gio.Cancellable | None]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.cancelled = 0
+
+    @staticmethod
+    def _cost(texture: Gdk.Texture) -> int:
+        return texture.get_width() * texture.get_height() * 4
+
+    def lookup(self, path: Path, tier: str, count: bool = True) -> Gdk.Texture | None:
+        """Get the texture for path at tier only if it is already in memory.
+
+        Every cache access goes through here, so it counts hits and misses;
+        peeks for a stand-in while the wanted tier loads pass count=False
+        so they do not skew the hit rate.
+        """
+        key = (str(path), tier)
+        texture = self._textures.get(key)
+        if texture is None:
+            if count:
+                self.misses += 1
+            return None
+        self._textures.move_to_end(key)
+        if count:
+            self.hits += 1
+        return texture
+
+    def get(self, path: Path, tier: str) -> Gdk.Texture | None:
+        """Get the texture for path at tier, loading its thumbnail on a miss"""
+        texture = self.lookup(path, tier)
+        if texture is not None:
+            return texture
+
+        texture = _load_texture(path, tier)
+        if texture is not None:
+            self.put(path, tier, texture)
+        return texture
+
+    def load_async(
+        self,
+        path: Path,
+        tier: str,
+        callback: Callable[[Gdk.Texture | None], None] | None = None,
+        cancellable: Gio.Cancellable | None = None,
+    ) -> None:
+        """Load the texture for path at tier without blocking.
+
+        The callback runs on the main loop: immediately on a hit, or once
+        the loader thread is done. If cancellable is cancelled first, the
+        load is skipped (when not yet started) and the callback is not
+        called. Without a callback this is a prefetch.
+        """
+        texture = self.lookup(path, tier)
+        if texture is not None:
+            if callback:
+                callback(texture)
+            return
+
+        key = (str(path), tier)
+        waiters = self._loading.get(key)
+        if waiters is not None:
+            # Already in flight: just wait for the same result
+            waiters.append((callback, cancellable))
+            return
+
+        self._loading[key] = [(callback, cancellable)]
+        self._executor.submit(self._load_worker, path, tier)
+
+    def _load_worker(self, path: Path, tier: str) -> None:
+        """Decode on a loader thread, then hand the result to the main loop"""
+        key = (str(path), tier)
+        waiters = self._loading.get(key, [])
+        # Nobody wants this any more (e.g. the user navigated past it)
+        if waiters and all(c is not None and c.is_cancelled() for _, c in waiters):
+            GLib.idle_add(self._finish_load, path, tier, None)
+            return
+        GLib.idle_add(self._finish_load, path, tier, _load_texture(path, tier))
+
+    def _finish_load(self, path: Path, tier: str, texture: Gdk.Texture | None) -> bool:
+        """Store a loaded texture and notify waiters (main loop)"""
+        if texture is not None:
+            self.put(path, tier, texture)
+        for callback, cancellable in self._loading.pop((str(path), tier), []):
+            if cancellable is not None and cancellable.is_cancelled():
+                self.cancelled += 1
+                continue
+            if callback:
+                callback(texture)
+        return GLib.SOURCE_REMOVE
+
+    def put(self, path: Path, tier: str, texture: Gdk.Texture) -> None:
+        """Insert a texture, evicting least recently used ones over budget"""
+        key = (str(path), tier)
+        old = self._textures.pop(key, None)
+        if old is not None:
+            self._bytes -= self._cost(old)
+        self._textures[key] = texture
+        self._bytes += self._cost(texture)
+
+        while self._bytes > self.max_bytes and len(self._textures) > 1:
+            _, evicted = self._textures.popitem(last=False)
+            self._bytes -= self._cost(evicted)
+            self.evictions += 1
+
+    def invalidate(self, path: Path) -> None:
+        """Drop every tier of path, e.g. after the file changed on disk"""
+        for key in [key for key in self._textures if key[0] == str(path)]:
+            self._bytes -= self._cost(self._textures.pop(key))
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current memory use"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "cancelled": self.cancelled,
+            "entries": len(self._textures),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def shutdown(self) -> None:
+        """Stop loader threads without waiting for queued loads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _load_texture(path: Path, tier: str) -> Gdk.Texture | None:
+    """Decode the thumbnail of path at tier, generating it if needed"""
+    thumbnail = get_thumbnail(path, tier)
+    if thumbnail is None:
+        return None
+    try:
+        return Gdk.Texture.new_from_filename(str(thumbnail))
+    except GLib.Error as e:
+        print(f"Error loading thumbnail {thumbnail}: {e}")
+        return None
@@ -0,0 +1,284 @@
+"""Thumbnail cache - tiered thumbnails generated off the main loop"""
+
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from gi.repository import GdkPixbuf, GLib
+
+from .cache import CACHE_DIR
+from .library import thumbnail_key
+from .manifest import ThumbnailManifest
+
+THUMBNAIL_DIR = CACHE_DIR / "thumbnails"
+THUMBNAIL_MANIFEST = CACHE_DIR / "thumbnails.db"
+
+# Named thumbnail widths in pixels. Views ask for the smallest tier that
+# covers their widget at the display scale factor (see tier_for_size).
+THUMBNAIL_TIERS = {
+    "small": 200,
+    "medium": 320,
+    "large": 640,
+    "xlarge": 1280,
+}
+DEFAULT_TIER = "small"
+
+_manifest = ThumbnailManifest(THUMBNAIL_MANIFEST, THUMBNAIL_DIR)
+
+
+def tier_for_size(width: int, scale_factor: int = 1) -> str:
+    """Pick the smallest thumbnail tier covering width logical pixels"""
+    needed = width * scale_factor
+    for tier, tier_width in sorted(THUMBNAIL_TIERS.items(), key=lambda t: t[1]):
+        if tier_width >= needed:
+            return tier
+    return max(THUMBNAIL_TIERS, key=THUMBNAIL_TIERS.get)
+
+
+def _get_thumbnail_path(image_path: Path, tier: str) -> Path:
+    """Get the cached thumbnail path for an image at a given tier"""
+    return THUMBNAIL_DIR / f"{thumbnail_key(image_path)}-{tier}.png"
+
+
+def stat_images(image_paths: list[Path]) -> dict[Path, os.stat_result]:
+    """Stat many images with a single scandir pass per parent directory"""
+    names_by_dir: dict[Path, set[str]] = defaultdict(set)
+    for path in image_paths:
+        names_by_dir[path.parent].add(path.name)
+
+    stats = {}
+    for directory, names in names_by_dir.items():
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name in names:
+                        stats[directory / entry.name] = entry.stat()
+        except OSError:
+            continue
+    return stats
+
+
+def _save_png(pixbuf: GdkPixbuf.Pixbuf, thumbnail_path: Path) -> None:
+    """Save as PNG, then rename so readers never see a partial file"""
+    tmp_path = thumbnail_path.with_name(f".{thumbnail_path.name}.{threading.get_ident()}.tmp")
+    pixbuf.savev(str(tmp_path), "png", [], [])
+    os.replace(tmp_path, thumbnail_path)
+
+
+def _generate_thumbnails(image_path: Path, tiers: list[str]) -> dict[str, Path]:
+    """Generate thumbnails of an image at several tiers from a single decode.
+
+    Returns the thumbnails that were written, keyed by tier.
+    """
+    generated = {}
+    try:
+        # Read dimensions from the header only, no pixel decode
+        info = GdkPixbuf.Pixbuf.get_file_info(str(image_path))
+        if info is None or info[0] is None:
+            raise ValueError("unrecognized image format")
+        _, orig_width, orig_height = info
+
+        # Largest tier first: it is decoded from the original, the
+        # smaller ones are downscaled from that already small pixbuf
+        tiers = sorted(tiers, key=lambda t: THUMBNAIL_TIERS[t], reverse=True)
+        source = None
+        for tier in tiers:
+            # Calculate new dimensions maintaining aspect ratio
+            scale = THUMBNAIL_TIERS[tier] / orig_width
+            new_width = THUMBNAIL_TIERS[tier]
+            new_height = max(1, int(orig_height * scale))
+
+            if source is None:
+                # Decode straight at the target size. The loader's
+                # size-prepared hook lets the JPEG decoder use DCT
+                # downscaling, so the full resolution image is never
+                # materialized in memory.
+                scaled = GdkPixbuf.Pixbuf.new_from_file_at_scale(
+                    str(image_path), new_width, new_height, False
+                )
+                source = scaled
+            else:
+                scaled = source.scale_simple(new_width, new_height, GdkPixbuf.InterpType.BILINEAR)
+
+            thumbnail_path = _get_thumbnail_path(image_path, tier)
+            _save_png(scaled, thumbnail_path)
+            generated[tier] = thumbnail_path
+    except Exception as e:
+        print(f"Error generating thumbnail for {image_path}: {e}")
+    return generated
+
+
+def _build_thumbnails(image_path: Path, st: os.stat_result, tiers: list[str]) -> dict[str, Path]:
+    """Generate thumbnails and record them in the manifest"""
+    generated = _generate_thumbnails(image_path, tiers)
+    for tier, thumbnail_path in generated.items():
+        _manifest.record(image_path, tier, st, thumbnail_path)
+    return generated
+
+
+def get_thumbnail(image_path: Path, tier: str = DEFAULT_TIER) -> Path | None:
+    """Get thumbnail path at tier, generating if needed. Returns None on failure."""
+    try:
+        st = image_path.stat()
+    except OSError:
+        return None
+
+    # Return cached thumbnail if valid
+    thumbnail_path = _manifest.lookup(image_path, tier, st)
+    if thumbnail_path:
+        return thumbnail_path
+
+    # Generate new thumbnail
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    generated = _build_thumbnails(image_path, st, [tier])
+    _manifest.flush()
+    return generated.get(tier)
+
+
+def _stale_thumbnails(
+    image_paths: list[Path], tiers: list[str]
+) -> list[tuple[Path, os.stat_result, list[str]]]:
+    """Find images with missing or outdated thumbnails, and which tiers need work"""
+    stats = stat_images(image_paths)
+    stale = []
+    for path in image_paths:
+        st = stats.get(path)
+        if st is None:
+            continue
+        missing = [tier for tier in tiers if _manifest.lookup(path, tier, st) is None]
+        if missing:
+            stale.append((path, st, missing))
+    return stale
+
+
+def ensure_thumbnails(image_paths: list[Path], tiers: list[str] | None = None) -> None:
+    """Pre-generate thumbnails for all images (no-op if already cached)"""
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+
+    for image_path, st, missing in _stale_thumbnails(image_paths, tiers or [DEFAULT_TIER]):
+        _build_thumbnails(image_path, st, missing)
+    _manifest.flush()
+
+
+class ThumbnailPool:
+    """Generates thumbnails on worker threads, reporting back through GLib.
+
+    Decoding happens off the GTK main loop; progress and completion
+    callbacks are always invoked on the main loop via ``GLib.idle_add``.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = resolve_workers(workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="thumbnail",
+        )
+        self._futures: list[Future] = []
+
+    def generate(
+        self,
+        jobs: list[tuple[Path, os.stat_result, list[str]]],
+        callback: Callable[[], None] | None = None,
+        progress_callback: Callable[[Path, int, int], None] | None = None,
+    ) -> None:
+        """Queue (image_path, stat_result, tiers) jobs for generation.
+
+        Args:
+            jobs: Source image, its current stat result and the tiers to make
+            callback: Optional callback when all jobs are done
+            progress_callback: Optional callback(image_path, done, total)
+                after each finished job
+        """
+        total = len(jobs)
+        done = 0
+
+        def on_generated(image_path: Path) -> bool:
+            nonlocal done
+            done += 1
+            if progress_callback:
+                progress_callback(image_path, done, total)
+            if done == total:
+                _manifest.flush()
+                if callback:
+                    callback()
+            return GLib.SOURCE_REMOVE
+
+        def work(image_path: Path, st: os.stat_result, tiers: list[str]) -> None:
+            _build_thumbnails(image_path, st, tiers)
+            GLib.idle_add(on_generated, image_path)
+
+        self._futures = [f for f in self._futures if not f.done()]
+        for image_path, st, tiers in jobs:
+            self._futures.append(self._executor.submit(work, image_path, st, tiers))
+
+    def ensure(
+        self,
+        image_paths: list[Path],
+        tiers: list[str],
+        progress_callback: Callable[[Path, int, int], None] | None = None,
+    ) -> None:
+        """Queue generation for whichever of image_paths have stale thumbnails"""
+        jobs = _stale_thumbnails(image_paths, tiers)
+        if jobs:
+            self.generate(jobs, progress_callback=progress_callback)
+
+    def busy(self) -> bool:
+        """Check if any queued job is still waiting or running"""
+        return any(not future.done() for future in self._futures)
+
+    def shutdown(self) -> None:
+        """Cancel pending jobs and stop the workers without blocking"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        _manifest.flush()
+
+
+def evict_thumbnails(image_path: Path) -> None:
+    """Delete every cached thumbnail tier of image_path"""
+    for thumbnail_path in _manifest.forget(image_path):
+        thumbnail_path.unlink(missing_ok=True)
+    _manifest.flush()
+
+
+def resolve_workers(workers: int) -> int:
+    """Clamp a configured worker count to the number of CPU cores (0 = all)"""
+    cores = os.cpu_count() or 1
+    if workers <= 0:
+        return cores
+    return min(workers, cores)
+
+
+def ensure_thumbnails_async(
+    image_paths: list[Path],
+    callback: Callable[[], None] | None = None,
+    progress_callback: Callable[[Path, int, int], None] | None = None,
+    workers: int = 0,
+    tiers: list[str] | None = None,
+) -> ThumbnailPool | None:
+    """Pre-generate thumbnails in background on a worker pool.
+
+    Args:
+        image_paths: List of image paths to generate thumbnails for
+        callback: Optional callback when all thumbnails are done
+        progress_callback: Optional callback(image_path, done, total)
+        workers: Number of worker threads (0 = one per CPU core)
+        tiers: Thumbnail tiers to generate (defaults to DEFAULT_TIER)
+
+    Returns:
+        The pool doing the work (so the caller can shut it down), or None
+        if every thumbnail was already cached.
+    """
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+
+    paths_to_generate = _stale_thumbnails(image_paths, tiers or [DEFAULT_TIER])
+
+    if not paths_to_generate:
+        if callback:
+            callback()
+        return None
+
+    pool = ThumbnailPool(workers)
+    pool.generate(paths_to_generate, callback, progress_callback)
+    return pool
@@ -0,0 +1,141 @@
+"""Usage history - how often, when and after which other wallpaper each
+wallpaper was set
+
+Selections are appended to ``USAGE_LOG`` as one short line each, so
+recording one costs a single write. Consecutive selections give the
+transition counts ("after A, B was set n times") used to predict the
+next wallpaper. When the log is read and has grown well past one line
+per wallpaper, it is compacted: rewritten with the totals per wallpaper
+and per transition.
+
+Line formats (tab-separated):
+
+- ``<count> <time_ns> <path>``: appended selection (count 1)
+- ``C <count> <time_ns> <path>``: compacted total for a wallpaper
+- ``T <count> <from> <to>``: compacted transition count
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .cache import CACHE_DIR
+
+USAGE_LOG = CACHE_DIR / "usage.log"
+# Compact when the log has more lines than this many per wallpaper and transition...
+COMPACT_RATIO = 2
+# ...and at least this many lines in total
+COMPACT_MIN_LINES = 256
+
+
+class UsageLog:
+    """Append-only selection log with in-memory totals, read on first use"""
+
+    def __init__(self, path: Path = USAGE_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+        self._counts: dict[Path, int] | None = None
+        self._last_used: dict[Path, int] = {}
+        self._transitions: dict[Path, dict[Path, int]] = {}
+        self._previous: Optional[Path] = None
+
+    def _load(self) -> None:
+        counts: dict[Path, int] = {}
+        last_used: dict[Path, int] = {}
+        transitions: dict[Path, dict[Path, int]] = {}
+        previous = None
+        lines = 0
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    fields = line.split("\t", 3)
+                    try:
+                        if fields[0] == "T":
+                            _, count, source, target = fields
+                            following = transitions.setdefault(Path(source), {})
+                            following[Path(target)] = following.get(Path(target), 0) + int(count)
+                        elif fields[0] == "C":
+                            _, count, time_ns, path = fields
+                            path = Path(path)
+                            counts[path] = counts.get(path, 0) + int(count)
+                            last_used[path] = max(last_used.get(path, 0), int(time_ns))
+                        else:
+                            count, time_ns, path = line.split("\t", 2)
+                            path = Path(path)
+                            if previous is None and last_used:
+                                # First selection after a compaction
+                                previous = max(last_used, key=last_used.get)
+                            if previous is not None:
+                                following = transitions.setdefault(previous, {})
+                                following[path] = following.get(path, 0) + 1
+                            counts[path] = counts.get(path, 0) + int(count)
+                            last_used[path] = max(last_used.get(path, 0), int(time_ns))
+                            previous = path
+                    except ValueError:
+                        # Torn write at the end of the log
+                        continue
+                    lines += 1
+        except FileNotFoundError:
+            pass
+        if previous is None and last_used:
+            previous = max(last_used, key=last_used.get)
+        self._counts, self._last_used = counts, last_used
+        self._transitions, self._previous = transitions, previous
+        pairs = sum(len(following) for following in transitions.values())
+        if lines > max(COMPACT_MIN_LINES, COMPACT_RATIO * (len(counts) + pairs)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log with one line per wallpaper and transition.
+
+        A selection appended by another process while this runs is lost,
+        which only costs one count.
+        """
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            for path, count in self._counts.items():
+                f.write(f"C\t{count}\t{self._last_used[path]}\t{path}\n")
+            for source, following in self._transitions.items():
+                for target, count in following.items():
+                    f.write(f"T\t{count}\t{source}\t{target}\n")
+        os.replace(tmp_path, self.path)
+
+    def _ensure_loaded(self) -> None:
+        if self._counts is None:
+            self._load()
+
+    def record(self, path: Path) -> None:
+        """Log one selection of path"""
+        time_ns = time.time_ns()
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(f"1\t{time_ns}\t{path}\n")
+            if self._counts is not None:
+                self._counts[path] = self._counts.get(path, 0) + 1
+                self._last_used[path] = time_ns
+                if self._previous is not None:
+                    following = self._transitions.setdefault(self._previous, {})
+                    following[path] = following.get(path, 0) + 1
+                self._previous = path
+
+    def count(self, path: Path) -> int:
+        """How often path was set"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._counts.get(path, 0)
+
+    def last_used(self, path: Path) -> int:
+        """When path was last set (time_ns, 0 = never)"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._last_used.get(path, 0)
+
+    def following(self, path: Path) -> dict[Path, int]:
+        """How often each wallpaper was set right after path"""
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self._transitions.get(path, {}))
@@ -1,19 +1,29 @@
 """Base View - common functionality for all views"""
 
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
+from typing import Callable, Optional, TYPE_CHECKING
 from gi.repository import Gtk, Gio
 
+from wallpaper_selector.thumbnail_cache import tier_for_size
+
 if TYPE_CHECKING:
     from wallpaper_selector.models.wallpaper_manager import WallpaperManager
+    from wallpaper_selector.texture_cache import TextureCache
 
 
 class BaseView:
     """Base class for all views with common functionality"""
 
-    def __init__(self, wallpaper_manager: 'WallpaperManager'):
+    # Logical widths of the images this view displays
+    thumbnail_widths: tuple[int, ...] = ()
+
+    def __init__(self, wallpaper_manager: 'WallpaperManager', texture_cache: 'TextureCache'):
         self.wallpaper_manager = wallpaper_manager
+        self.texture_cache = texture_cache
         self.widget: Optional[Gtk.Widget] = None
+        self.search_entry: Optional[Gtk.SearchEntry] = None
+        # Called with the query whenever the search text changes
+        self.on_search: Optional[Callable[[str], None]] = None
 
     def build(self) -> Gtk.Widget:
         """Build and return the main widget for this view"""
@@ -23,10 +33,64 @@ class BaseView:
         """Update view content/refresh data"""
         raise NotImplementedError
 
+    def thumbnail_tiers(self, scale_factor: int) -> set[str]:
+        """Thumbnail tiers this view needs at the given display scale"""
+        return {tier_for_size(width, scale_factor) for width in self.thumbnail_widths}
+
+    def tier_for(self, widget: Gtk.Widget, width: int) -> str:
+        """Smallest thumbnail tier covering width logical pixels of widget"""
+        return tier_for_size(width, widget.get_scale_factor())
+
+    def _build_search_entry(self) -> Gtk.SearchEntry:
+        """Search field narrowing the wallpapers as the user types"""
+        entry = Gtk.SearchEntry()
+        entry.set_placeholder_text("Search wallpapers")
+        entry.add_css_class("search-entry")
+        # Results are cheap to refine; skip the default typing delay
+        entry.set_search_delay(0)
+        entry.connect("search-changed", self._on_search_changed)
+        entry.connect("activate", lambda entry: self.focus_results())
+        self.search_entry = entry
+        return entry
+
+    def _on_search_changed(self, entry: Gtk.SearchEntry):
+        if self.on_search:
+            self.on_search(entry.get_text())
+
+    def set_search_text(self, text: str):
+        """Show text in the search field without searching again"""
+        if self.search_entry and self.search_entry.get_text() != text:
+            self.search_entry.set_text(text)
+
+    def focus_search(self):
+        """Move keyboard focus into the search field"""
+        if self.search_entry:
+            self.search_entry.grab_focus()
+
+    def focus_results(self):
+        """Move keyboard focus from the search field back to the wallpapers"""
+        # Navigation keys are handled window-wide, so no widget needs focus
+        if self.widget and self.widget.get_root():
+            self.widget.get_root().set_focus(None)
+
+    def is_searching(self) -> bool:
+        """Check if the search field has keyboard focus"""
+        return bool(self.search_entry and self.search_entry.get_focus_child())
+
     def set_current_wallpaper_indicator(self, path: Path, is_current: bool):
         """Update visual indicator for current wallpaper"""
         pass
 
+    def on_wallpapers_changed(self, kind: str, index: Optional[int], path: Optional[Path]):
+        """Called when a wallpaper was "added" at or "removed" from index,
+        or after a batch of them was "merged" in. A removed wallpaper that
+        was not listed has index None."""
+        pass
+
+    def on_thumbnail_ready(self, path: Path):
+        """Called on the main loop when a thumbnail has been generated"""
+        pass
+
     def cleanup(self):
         """Clean up resources when view is destroyed"""
         pass
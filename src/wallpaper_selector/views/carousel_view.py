@@ -1,22 +1,35 @@
 """Carousel View - 3D carousel with preview thumbnails"""
 
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
+from typing import Callable, Optional, TYPE_CHECKING
 from gi.repository import Gtk, Gdk, Gio
 
 if TYPE_CHECKING:
     from wallpaper_selector.models.wallpaper_manager import WallpaperManager
+    from wallpaper_selector.texture_cache import TextureCache
 
 from wallpaper_selector.views.base_view import BaseView
-from wallpaper_selector.cache import get_thumbnail
+from wallpaper_selector.views.navigation import NavigationScheduler
+
+# Logical sizes of the main image and the side previews
+MAIN_IMAGE_SIZE = (600, 375)
+PREVIEW_SIZE = (200, 125)
 
 
 class CarouselView(BaseView):
     """3D carousel view with left/right preview thumbnails"""
 
-    def __init__(self, wallpaper_manager: 'WallpaperManager'):
-        super().__init__(wallpaper_manager)
+    thumbnail_widths = (MAIN_IMAGE_SIZE[0], PREVIEW_SIZE[0])
+
+    def __init__(self, wallpaper_manager: 'WallpaperManager', texture_cache: 'TextureCache'):
+        super().__init__(wallpaper_manager, texture_cache)
         self.carousel_index = self._find_current_wallpaper_index()
+        # Wallpaper on screen, to stay on it when a batch reorders the list
+        self._shown: Optional[Path] = None
+        # Called with the shown wallpaper to list the ones similar to it
+        self.on_show_similar: Optional[Callable[[Path], None]] = None
+        # Called with the shown wallpaper after each full update
+        self.on_settled: Optional[Callable[[Path], None]] = None
 
         # Carousel widgets
         self.preview_left: Optional[Gtk.Picture] = None
@@ -30,6 +43,13 @@ class CarouselView(BaseView):
         self.left_side_box: Optional[Gtk.Box] = None
         self.right_side_box: Optional[Gtk.Box] = None
 
+        # Cancelled whenever the carousel moves, dropping loads for the
+        # index the user has already left
+        self._cancellable = Gio.Cancellable()
+
+        # Key auto-repeat only draws light frames until the user settles
+        self.navigation = NavigationScheduler(on_frame=self._update_light, on_settle=self.update)
+
     def _find_current_wallpaper_index(self) -> int:
         """Find the index of the current wallpaper in the wallpapers list"""
         current = self.wallpaper_manager.get_current_wallpaper()
@@ -50,6 +70,12 @@ class CarouselView(BaseView):
         container.set_valign(Gtk.Align.CENTER)
         container.set_halign(Gtk.Align.CENTER)
 
+        search_entry = self._build_search_entry()
+        search_entry.set_size_request(320, -1)
+        search_entry.set_halign(Gtk.Align.CENTER)
+        search_entry.set_margin_bottom(8)
+        container.append(search_entry)
+
         # Image row (left preview, main image, right preview)
         # Use CenterBox so the main image is always centered
         image_row = Gtk.CenterBox()
@@ -65,7 +91,7 @@ class CarouselView(BaseView):
 
         self.preview_left = Gtk.Picture()
         self.preview_left.set_content_fit(Gtk.ContentFit.COVER)
-        self.preview_left.set_size_request(200, 125)
+        self.preview_left.set_size_request(*PREVIEW_SIZE)
         self.preview_left.set_valign(Gtk.Align.CENTER)
         self.preview_left.add_css_class("preview-thumbnail")
         self.preview_left_box.append(self.preview_left)
@@ -96,7 +122,7 @@ class CarouselView(BaseView):
 
         self.carousel_image = Gtk.Picture()
         self.carousel_image.set_content_fit(Gtk.ContentFit.COVER)
-        self.carousel_image.set_size_request(600, 375)
+        self.carousel_image.set_size_request(*MAIN_IMAGE_SIZE)
         self.carousel_image.set_valign(Gtk.Align.CENTER)
         self.carousel_image.set_halign(Gtk.Align.CENTER)
         self.carousel_image.set_hexpand(False)
@@ -122,7 +148,7 @@ class CarouselView(BaseView):
 
         self.preview_right = Gtk.Picture()
         self.preview_right.set_content_fit(Gtk.ContentFit.COVER)
-        self.preview_right.set_size_request(200, 125)
+        self.preview_right.set_size_request(*PREVIEW_SIZE)
         self.preview_right.set_valign(Gtk.Align.CENTER)
         self.preview_right.add_css_class("preview-thumbnail")
         self.preview_right_box.append(self.preview_right)
@@ -147,7 +173,7 @@ class CarouselView(BaseView):
 
         # Hints
         hints = Gtk.Label()
-        hints.set_text("← → Navigate | Enter Set | Tab Grid | Esc Close")
+        hints.set_text("← → Navigate | Enter Set | / Search | S Similar | F Filter | O Sort | Tab Grid | Esc Close")
         hints.add_css_class("carousel-hints")
         hints.set_margin_top(4)
         hints.set_size_request(500, -1)
@@ -164,17 +190,95 @@ class CarouselView(BaseView):
             return
 
         path = wallpapers[self.carousel_index]
+        self._shown = path
+
+        self._cancellable.cancel()
+        self._cancellable = Gio.Cancellable()
 
-        # Load main image synchronously for in-sync updates
-        self.carousel_image.set_file(Gio.File.new_for_path(str(path)))
+        # Load main image asynchronously from the smallest tier that covers
+        # it; the original is only read when the wallpaper is actually set
+        main_tier = self.tier_for(self.carousel_image, MAIN_IMAGE_SIZE[0])
+        preview_tier = self.tier_for(self.preview_left, PREVIEW_SIZE[0])
+        self._show_async(self.carousel_image, path, main_tier, placeholder_tier=preview_tier)
 
+        self._update_label(path)
+
+        # Update preview thumbnails, then warm up the neighbours
+        self._update_preview_thumbnails()
+        self._prefetch_neighbors(wallpapers, main_tier, preview_tier)
+        if self.on_settled:
+            self.on_settled(path)
+
+    def _update_light(self):
+        """Cheap frame during rapid navigation: label plus in-memory textures only"""
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        if not wallpapers or not self.carousel_image:
+            return
+
+        # Loads for indices being skipped over are no longer wanted
+        self._cancellable.cancel()
+        self._cancellable = Gio.Cancellable()
+
+        path = wallpapers[self.carousel_index]
+        self._shown = path
+        self._update_label(path)
+
+        main_tier = self.tier_for(self.carousel_image, MAIN_IMAGE_SIZE[0])
+        preview_tier = self.tier_for(self.preview_left, PREVIEW_SIZE[0])
+        # Only peeks: the full update loads what is missing and counts it
+        lookup = self.texture_cache.lookup
+        self.carousel_image.set_paintable(
+            lookup(path, main_tier, count=False) or lookup(path, preview_tier, count=False)
+        )
+        if len(wallpapers) > 1:
+            prev_path = wallpapers[(self.carousel_index - 1) % len(wallpapers)]
+            next_path = wallpapers[(self.carousel_index + 1) % len(wallpapers)]
+            self.preview_left.set_paintable(lookup(prev_path, preview_tier, count=False))
+            self.preview_right.set_paintable(lookup(next_path, preview_tier, count=False))
+
+    def _update_label(self, path: Path):
+        """Show the filename, marking the current wallpaper"""
         if self.carousel_label:
             name = path.name
             current_marker = " (current)" if str(path) == self.wallpaper_manager.get_current_wallpaper() else ""
             self.carousel_label.set_text(f"{name}{current_marker}")
 
-        # Update preview thumbnails synchronously using cached thumbnails
-        self._update_preview_thumbnails()
+    def _show_async(self, picture: Gtk.Picture, path: Path, tier: str, placeholder_tier: Optional[str] = None):
+        """Show path in picture without blocking the main loop.
+
+        Until the texture arrives, a cached lower tier (if any) stands in.
+        """
+        delivered = False
+
+        def on_loaded(texture):
+            nonlocal delivered
+            delivered = True
+            picture.set_paintable(texture)
+
+        self.texture_cache.load_async(path, tier, on_loaded, self._cancellable)
+        if not delivered:
+            placeholder = (self.texture_cache.lookup(path, placeholder_tier, count=False)
+                           if placeholder_tier else None)
+            picture.set_paintable(placeholder)
+
+    def _prefetch_neighbors(self, wallpapers: list, main_tier: str, preview_tier: str):
+        """Load textures for the wallpapers within prefetch_radius of the index"""
+        radius = self.wallpaper_manager.config.ui.prefetch_radius
+        count = len(wallpapers)
+        seen = {self.carousel_index}
+        # One step further for previews: they are the neighbours' side images
+        for offset in range(1, radius + 2):
+            for index in ((self.carousel_index + offset) % count,
+                          (self.carousel_index - offset) % count):
+                if offset <= radius and index not in seen:
+                    self.texture_cache.load_async(wallpapers[index], main_tier, None, self._cancellable)
+                seen.add(index)
+                self.texture_cache.load_async(wallpapers[index], preview_tier, None, self._cancellable)
+
+    def prefetch(self, path: Path):
+        """Load the main image texture of path ahead of navigating to it"""
+        if self.carousel_image:
+            self.texture_cache.load_async(path, self.tier_for(self.carousel_image, MAIN_IMAGE_SIZE[0]))
 
     def _update_preview_thumbnails(self):
         """Update preview thumbnails with prev/next wallpapers"""
@@ -197,14 +301,70 @@ class CarouselView(BaseView):
         prev_index = (self.carousel_index - 1) % len(wallpapers)
         next_index = (self.carousel_index + 1) % len(wallpapers)
 
-        # Load preview images synchronously using cached thumbnails (instant from cache)
-        prev_thumb = get_thumbnail(wallpapers[prev_index])
-        next_thumb = get_thumbnail(wallpapers[next_index])
+        # Load preview images from the shared texture cache (instant on revisit)
+        tier = self.tier_for(self.preview_left, PREVIEW_SIZE[0])
+        self._show_async(self.preview_left, wallpapers[prev_index], tier)
+        self._show_async(self.preview_right, wallpapers[next_index], tier)
 
-        if prev_thumb:
-            self.preview_left.set_file(Gio.File.new_for_path(str(prev_thumb)))
-        if next_thumb:
-            self.preview_right.set_file(Gio.File.new_for_path(str(next_thumb)))
+    def set_current_wallpaper_indicator(self, path: Path, is_current: bool):
+        """Refresh the "(current)" marker if path is on screen"""
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        if wallpapers and wallpapers[self.carousel_index] == path:
+            self._update_label(path)
+
+    def on_current_wallpaper_known(self, path: Path):
+        """Start at the current wallpaper if it became known after the
+        carousel was shown, unless the user has already moved"""
+        if self.navigation.steps == 0:
+            self.carousel_index = self._find_current_wallpaper_index()
+            if self.carousel_image:
+                self.update()
+                return
+        self.set_current_wallpaper_indicator(path, True)
+
+    def on_wallpapers_changed(self, kind: str, index: Optional[int], path: Optional[Path]):
+        """Keep showing the same wallpaper as others come and go"""
+        if index is None:
+            # Removed while hidden by the filter: the list is unchanged
+            return
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        n_wallpapers = len(wallpapers)
+        if kind == "merged":
+            if self.navigation.steps == 0:
+                # Not moved yet: the current wallpaper may just have arrived
+                self.carousel_index = self._find_current_wallpaper_index()
+            elif self._shown in wallpapers:
+                self.carousel_index = wallpapers.index(self._shown)
+        elif kind == "added" and index <= self.carousel_index and n_wallpapers > 1:
+            self.carousel_index += 1
+        elif kind == "removed" and index < self.carousel_index:
+            self.carousel_index -= 1
+        # Removing the shown wallpaper shows the one that took its place
+        self.carousel_index = min(self.carousel_index, max(n_wallpapers - 1, 0))
+
+        # Unchanged images come straight from the texture cache
+        self.update()
+
+    def on_filter_changed(self, previous: Optional[Path]):
+        """Stay on the previously shown wallpaper if it is still listed"""
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        self.carousel_index = wallpapers.index(previous) if previous in wallpapers else 0
+        if not wallpapers and self.carousel_image:
+            for picture in (self.carousel_image, self.preview_left, self.preview_right):
+                picture.set_paintable(None)
+            self.carousel_label.set_text("")
+            return
+        self.update()
+
+    def on_thumbnail_ready(self, path: Path):
+        """Reload side previews if one of them just got its thumbnail"""
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+        if len(wallpapers) <= 1 or not self.preview_left:
+            return
+        prev_path = wallpapers[(self.carousel_index - 1) % len(wallpapers)]
+        next_path = wallpapers[(self.carousel_index + 1) % len(wallpapers)]
+        if path in (prev_path, next_path):
+            self._update_preview_thumbnails()
 
     def navigate_prev(self):
         """Go to previous wallpaper in carousel"""
@@ -212,7 +372,7 @@ class CarouselView(BaseView):
         if not wallpapers:
             return
         self.carousel_index = (self.carousel_index - 1) % len(wallpapers)
-        self.update()
+        self.navigation.step()
 
     def navigate_next(self):
         """Go to next wallpaper in carousel"""
@@ -220,7 +380,7 @@ class CarouselView(BaseView):
         if not wallpapers:
             return
         self.carousel_index = (self.carousel_index + 1) % len(wallpapers)
-        self.update()
+        self.navigation.step()
 
     def _on_preview_left_clicked(self, gesture, n_press, x, y):
         """Handle left preview thumbnail click"""
@@ -246,7 +406,10 @@ class CarouselView(BaseView):
             return True
         elif keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
             if wallpapers:
-                self.wallpaper_manager.set_wallpaper(wallpapers[self.carousel_index])
+                self.wallpaper_manager.set_wallpaper_async(wallpapers[self.carousel_index])
+            return True
+        elif keyval in (Gdk.KEY_s, Gdk.KEY_S) and self.on_show_similar:
+            self.on_show_similar(wallpapers[self.carousel_index])
             return True
         return False
 
@@ -254,4 +417,4 @@ class CarouselView(BaseView):
         """Activate/set the current wallpaper"""
         wallpapers = self.wallpaper_manager.get_wallpapers()
         if wallpapers:
-            return self.wallpaper_manager.set_wallpaper(wallpapers[self.carousel_index])
+            self.wallpaper_manager.set_wallpaper_async(wallpapers[self.carousel_index])
@@ -1,54 +1,81 @@
-"""Grid View - flowbox grid layout for wallpaper selection"""
+"""Grid View - virtualized grid layout for wallpaper selection"""
 
 from pathlib import Path
 from typing import Optional, TYPE_CHECKING
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk, Gdk, Gio, GObject
 
 if TYPE_CHECKING:
     from wallpaper_selector.models.wallpaper_manager import WallpaperManager
-    from wallpaper_selector.thumbnail import WallpaperThumbnail
+    from wallpaper_selector.texture_cache import TextureCache
 
+from wallpaper_selector.thumbnail import WallpaperThumbnail
 from wallpaper_selector.views.base_view import BaseView
 
+# Logical size of one grid cell preview
+CELL_SIZE = (300, 180)
+
+
+class WallpaperItem(GObject.Object):
+    """List model item wrapping a wallpaper path"""
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = path
+
 
 class GridView(BaseView):
-    """FlowBox-based grid view for wallpaper selection"""
+    """Gtk.GridView-based grid view for wallpaper selection.
 
-    def __init__(self, wallpaper_manager: 'WallpaperManager'):
-        super().__init__(wallpaper_manager)
-        self.flow_box: Optional[Gtk.FlowBox] = None
+    Only cells in (or near) the viewport exist as widgets; the list item
+    factory rebinds them as the user scrolls, loading textures lazily.
+    """
+
+    thumbnail_widths = (CELL_SIZE[0],)
+
+    def __init__(self, wallpaper_manager: 'WallpaperManager', texture_cache: 'TextureCache'):
+        super().__init__(wallpaper_manager, texture_cache)
+        self.store = Gio.ListStore(item_type=WallpaperItem)
+        self.selection = Gtk.SingleSelection(model=self.store)
+        self.grid: Optional[Gtk.GridView] = None
+        self._paths: list[Path] = []
+        # List items are reused when searches and filters reshuffle the store
+        self._items: dict[Path, WallpaperItem] = {}
 
     def build(self) -> Gtk.Widget:
         """Build the grid view"""
         container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
 
+        search_entry = self._build_search_entry()
+        search_entry.set_margin_start(12)
+        search_entry.set_margin_end(12)
+        search_entry.set_margin_top(12)
+        container.append(search_entry)
+
         scroll = Gtk.ScrolledWindow()
-        scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scroll.set_vexpand(True)
 
-        self.flow_box = Gtk.FlowBox()
-        self.flow_box.set_selection_mode(Gtk.SelectionMode.BROWSE)
-        self.flow_box.set_homogeneous(True)
-        self.flow_box.set_min_children_per_line(3)
-        self.flow_box.set_max_children_per_line(6)
-        self.flow_box.set_row_spacing(8)
-        self.flow_box.set_column_spacing(8)
-        self.flow_box.set_margin_start(12)
-        self.flow_box.set_margin_end(12)
-        self.flow_box.set_margin_top(12)
-        self.flow_box.set_margin_bottom(12)
-
-        # Handle Enter key on flowbox to activate selected item
-        flowbox_key_ctrl = Gtk.EventControllerKey()
-        flowbox_key_ctrl.connect("key-pressed", self._on_flowbox_key_pressed)
-        self.flow_box.add_controller(flowbox_key_ctrl)
-
-        scroll.set_child(self.flow_box)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_setup)
+        factory.connect("bind", self._on_bind)
+        factory.connect("unbind", self._on_unbind)
+
+        self.grid = Gtk.GridView(model=self.selection, factory=factory)
+        self.grid.set_min_columns(3)
+        self.grid.set_max_columns(6)
+        self.grid.set_single_click_activate(True)
+        self.grid.set_margin_start(12)
+        self.grid.set_margin_end(12)
+        self.grid.set_margin_top(12)
+        self.grid.set_margin_bottom(12)
+        self.grid.connect("activate", self._on_activate)
+
+        scroll.set_child(self.grid)
         container.append(scroll)
 
         # Grid hints at bottom
         grid_hints = Gtk.Label()
-        grid_hints.set_text("Tab Carousel | Enter Set | Esc Close")
+        grid_hints.set_text("Tab Carousel | Enter Set | / Search | F Filter | O Sort | Esc Close")
         grid_hints.add_css_class("carousel-hints")
         grid_hints.set_margin_top(8)
         grid_hints.set_margin_bottom(8)
@@ -58,51 +85,140 @@ class GridView(BaseView):
         self.widget = container
         return container
 
+    def _item(self, path: Path) -> WallpaperItem:
+        item = self._items.get(path)
+        if item is None:
+            item = self._items[path] = WallpaperItem(path)
+        return item
+
+    def focus_results(self):
+        """Return keyboard focus to the selected cell"""
+        if self.grid:
+            self.grid.grab_focus()
+
+    def _on_setup(self, factory, list_item):
+        """Create a recyclable cell widget"""
+        list_item.set_child(WallpaperThumbnail(size=CELL_SIZE))
+
+    def _on_bind(self, factory, list_item):
+        """Show the item's wallpaper in a cell that scrolled into view"""
+        cell = list_item.get_child()
+        path = list_item.get_item().path
+        is_current = str(path) == self.wallpaper_manager.get_current_wallpaper()
+        cell.bind(path, is_current, None)
+
+        # Load the texture without blocking scrolling; cancelled if the
+        # cell is recycled before it arrives
+        cell.cancellable = Gio.Cancellable()
+        self.texture_cache.load_async(
+            path, self.tier_for(cell, CELL_SIZE[0]), cell.set_texture, cell.cancellable
+        )
+
+    def _on_unbind(self, factory, list_item):
+        """Release a cell that scrolled out of view"""
+        cell = list_item.get_child()
+        if cell.cancellable:
+            cell.cancellable.cancel()
+            cell.cancellable = None
+        cell.unbind()
+
+    def _on_activate(self, grid, position):
+        """Set the wallpaper at position (click or Enter)"""
+        item = self.store.get_item(position)
+        if item:
+            self.wallpaper_manager.set_wallpaper_async(item.path)
+
     def update(self):
         """Refresh grid content"""
-        # Clear existing children
-        for child in self.flow_box.get_children():
-            self.flow_box.remove(child)
-
-        # Rebuild wallpaper thumbnails
-        current_wallpaper_index = 0
+        wallpapers = self.wallpaper_manager.get_wallpapers()
+
+        if wallpapers != self._paths:
+            # Items are cheap; cell widgets are only built for visible rows
+            self._paths = list(wallpapers)
+            self.store.splice(0, self.store.get_n_items(), [self._item(p) for p in wallpapers])
+        else:
+            # Same wallpapers: rebind visible cells to refresh current badges
+            n_items = self.store.get_n_items()
+            self.store.items_changed(0, n_items, n_items)
+
+        # Select and scroll to current wallpaper item, or first if not found
         current_wallpaper = self.wallpaper_manager.get_current_wallpaper()
-
-        for i, wallpaper in enumerate(self.wallpaper_manager.get_wallpapers()):
-            child = Gtk.FlowBoxChild()
-            from wallpaper_selector.thumbnail import WallpaperThumbnail
-            current = (str(wallpaper) == current_wallpaper)
-            if current:
+        current_wallpaper_index = 0
+        for i, wallpaper in enumerate(wallpapers):
+            if str(wallpaper) == current_wallpaper:
                 current_wallpaper_index = i
-            child.set_child(WallpaperThumbnail(wallpaper, current, self.wallpaper_manager.set_wallpaper))
-            self.flow_box.append(child)
-
-        # Focus current wallpaper item, or first if not found
-        if self.flow_box.get_children():
-            focus_child = self.flow_box.get_child_at_index(current_wallpaper_index)
-            if focus_child:
-                focus_child.grab_focus()
+                break
+
+        if wallpapers:
+            self.grid.scroll_to(
+                current_wallpaper_index,
+                Gtk.ListScrollFlags.FOCUS | Gtk.ListScrollFlags.SELECT,
+                None,
+            )
+
+    def set_current_wallpaper_indicator(self, path: Path, is_current: bool):
+        """Rebind the cell showing path so its current badge updates"""
+        try:
+            position = self._paths.index(path)
+        except ValueError:
+            return
+        self.store.items_changed(position, 1, 1)
+
+    def _merge_store(self, wallpapers: list[Path]) -> None:
+        """Splice in the wallpapers missing from the store, keeping
+        existing items (and the scroll position) in place"""
+        positions = []
+        i = 0
+        for position, path in enumerate(wallpapers):
+            if i < len(self._paths) and self._paths[i] == path:
+                i += 1
+            else:
+                positions.append(position)
+        if i < len(self._paths):
+            # Items also moved (modified files): rebuild
+            self._paths = list(wallpapers)
+            self.store.splice(0, self.store.get_n_items(), [self._item(p) for p in wallpapers])
+            return
+
+        # Everything before a new position is already in the store, so
+        # runs of new items can be inserted front to back
+        start = 0
+        while start < len(positions):
+            end = start + 1
+            while end < len(positions) and positions[end] == positions[end - 1] + 1:
+                end += 1
+            run = wallpapers[positions[start]:positions[end - 1] + 1]
+            self.store.splice(positions[start], 0, [self._item(p) for p in run])
+            start = end
+        self._paths = list(wallpapers)
+
+    def on_wallpapers_changed(self, kind: str, index: Optional[int], path: Optional[Path]):
+        """Insert or remove the affected items"""
+        if index is None:
+            # Removed while hidden by the filter: the list is unchanged
+            return
+        if kind == "merged":
+            if self._paths:
+                self._merge_store(self.wallpaper_manager.get_wallpapers())
+            return
+        # Only a store mirroring the previous list can be patched; one
+        # that was never filled is synced by the next update()
+        delta = 1 if kind == "added" else -1
+        if len(self._paths) + delta != len(self.wallpaper_manager.get_wallpapers()):
+            return
+        if kind == "added":
+            self._paths.insert(index, path)
+            self.store.insert(index, self._item(path))
+        else:
+            del self._paths[index]
+            self.store.remove(index)
+            self._items.pop(path, None)
 
     def handle_key_press(self, keyval: int) -> bool:
         """Handle grid-specific key presses"""
         if keyval == Gdk.KEY_Return or keyval == Gdk.KEY_KP_Enter:
-            selected = self.flow_box.get_selected_children()
-            if selected:
-                child = selected[0]
-                widget = child.get_child()
-                if hasattr(widget, 'wallpaper_path'):
-                    self.wallpaper_manager.set_wallpaper(widget.wallpaper_path)
+            item = self.selection.get_selected_item()
+            if item:
+                self.wallpaper_manager.set_wallpaper_async(item.path)
                 return True
         return False
-
-    def _on_flowbox_key_pressed(self, controller, keyval, keycode, state):
-        """Handle Enter key on flowbox to activate selected wallpaper"""
-        if keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
-            selected = self.flow_box.get_selected_children()
-            if selected:
-                child = selected[0]
-                widget = child.get_child()
-                if hasattr(widget, 'wallpaper_path'):
-                    self.wallpaper_manager.set_wallpaper(widget.wallpaper_path)
-                    return True
-        return False
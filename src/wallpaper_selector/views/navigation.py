@@ -0,0 +1,94 @@
+"""Navigation scheduler - coalesces rapid carousel steps"""
+
+from typing import Callable
+
+from gi.repository import GLib
+
+# At most one lightweight frame per this many milliseconds during a burst
+FRAME_BUDGET_MS = 16
+# Steps closer together than this count as one burst (key auto-repeat)
+SETTLE_DELAY_MS = 120
+
+
+class NavigationScheduler:
+    """Coalesces rapid index changes (e.g. a held arrow key) to a frame budget.
+
+    An isolated step runs the full update right away. Steps that follow
+    within SETTLE_DELAY_MS form a burst: they only draw lightweight frames
+    (label and already-cached textures), at most one per FRAME_BUDGET_MS,
+    and the full update runs once for the index the user settles on.
+    """
+
+    def __init__(
+        self,
+        on_frame: Callable[[], None],
+        on_settle: Callable[[], None],
+        frame_ms: int = FRAME_BUDGET_MS,
+        settle_ms: int = SETTLE_DELAY_MS,
+    ):
+        self.on_frame = on_frame
+        self.on_settle = on_settle
+        self.frame_ms = frame_ms
+        self.settle_ms = settle_ms
+        self._frame_source = 0
+        self._settle_source = 0
+        self._frame_dirty = False
+        self._settle_pending = False
+
+        self.steps = 0
+        self.frames = 0
+        self.coalesced = 0
+        self.full_loads = 0
+
+    def step(self):
+        """Record that the index changed"""
+        self.steps += 1
+
+        if not self._settle_source:
+            # Not in a burst: full update immediately
+            self._settle()
+        else:
+            self._settle_pending = True
+            GLib.source_remove(self._settle_source)
+            if self._frame_source:
+                # A frame was drawn within the budget; fold this step into the next
+                self._frame_dirty = True
+                self.coalesced += 1
+            else:
+                self._draw_frame()
+
+        self._settle_source = GLib.timeout_add(self.settle_ms, self._on_settle_timeout)
+
+    def _draw_frame(self):
+        self.frames += 1
+        self.on_frame()
+        self._frame_source = GLib.timeout_add(self.frame_ms, self._on_frame_timeout)
+
+    def _settle(self):
+        self.full_loads += 1
+        self.on_settle()
+
+    def _on_frame_timeout(self) -> bool:
+        self._frame_source = 0
+        if self._frame_dirty:
+            self._frame_dirty = False
+            self._draw_frame()
+        return GLib.SOURCE_REMOVE
+
+    def _on_settle_timeout(self) -> bool:
+        self._settle_source = 0
+        if self._settle_pending:
+            self._settle_pending = False
+            self._settle()
+        return GLib.SOURCE_REMOVE
+
+    def stats(self) -> dict:
+        """Navigation counters"""
+        return {
+            "steps": self.steps,
+            "frames": self.frames,
+            "coalesced": self.coalesced,
+            "full_loads": self.full_loads,
+            # Indices passed over without ever decoding the full preview
+            "dropped": self.steps - self.full_loads,
+        }
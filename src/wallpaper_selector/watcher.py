@@ -0,0 +1,55 @@
+"""Wallpaper directory watcher - applies file changes to the wallpaper list"""
+
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from gi.repository import Gio
+
+if TYPE_CHECKING:
+    from .models.wallpaper_manager import WallpaperManager
+
+
+class WallpaperWatcher:
+    """Feeds Gio.FileMonitor events for the collection roots into a
+    WallpaperManager as incremental adds and removes.
+
+    New files are picked up once they are fully written (the
+    changes-done hint), so half-copied images are never shown. Events
+    arrive on the main loop. Only the roots themselves are watched;
+    changes in subdirectories of a recursive collection are picked up
+    by the library scan on the next start.
+    """
+
+    def __init__(self, wallpaper_manager: "WallpaperManager"):
+        self.wallpaper_manager = wallpaper_manager
+        self._monitors: list[Gio.FileMonitor] = []
+
+    def start(self) -> None:
+        """Start watching every collection root"""
+        for root in self.wallpaper_manager.wallpaper_roots:
+            directory = Gio.File.new_for_path(str(root))
+            try:
+                monitor = directory.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            except Exception as e:
+                print(f"Cannot watch {root}: {e}")
+                continue
+            monitor.connect("changed", self._on_changed)
+            self._monitors.append(monitor)
+
+    def stop(self) -> None:
+        """Stop watching"""
+        for monitor in self._monitors:
+            monitor.cancel()
+        self._monitors = []
+
+    def _on_changed(self, monitor, file: Gio.File, other_file: Optional[Gio.File], event):
+        manager = self.wallpaper_manager
+        path = Path(file.get_path())
+        if event in (Gio.FileMonitorEvent.CHANGES_DONE_HINT, Gio.FileMonitorEvent.MOVED_IN):
+            manager.add_wallpaper(path)
+        elif event in (Gio.FileMonitorEvent.DELETED, Gio.FileMonitorEvent.MOVED_OUT):
+            manager.remove_wallpaper(path)
+        elif event == Gio.FileMonitorEvent.RENAMED:
+            manager.remove_wallpaper(path)
+            if other_file:
+                manager.add_wallpaper(Path(other_file.get_path()))
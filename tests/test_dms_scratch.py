@@ -0,0 +1,85 @@
+"""Rendering colors aside must not touch any live DMS or application file"""
+
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+
+from wallpaper_selector.plugins.colors import DmsColorGenerator
+
+# Stand-in for `dms matugen queue`: writes the colors file to the state
+# dir, a theme file to the config dir and templates below $HOME and
+# $XDG_CONFIG_HOME, the way matugen's template step does
+FAKE_DMS = f"""#!{sys.executable}
+import os, sys
+from pathlib import Path
+args = dict(zip(sys.argv[3::2], sys.argv[4::2]))
+name = Path(args["--value"]).name
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+write(Path(args["--state-dir"]) / "dms-colors.json", name)
+write(Path(args["--config-dir"]) / "theme.json", name)
+write(Path(os.environ["XDG_CONFIG_HOME"]) / "gtk-4.0" / "dank-colors.css", name)
+write(Path(os.environ["HOME"]) / ".dank-theme", name)
+"""
+
+
+def _tree(root: Path) -> dict[str, bytes]:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def _install_dms(tmp_path: Path, monkeypatch, script: str) -> DmsColorGenerator:
+    """Put script on PATH as dms, with HOME in tmp_path; returns a generator"""
+    home = tmp_path / "home"
+    config_dir = home / ".config" / "DankMaterialShell"
+    config_dir.mkdir(parents=True)
+    (config_dir / "settings.json").write_text('{"matugenScheme": "scheme-tonal-spot"}')
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    dms = bin_dir / "dms"
+    dms.write_text(script)
+    dms.chmod(dms.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    state_dir = home / ".cache" / "DankMaterialShell"
+    return DmsColorGenerator(state_dir, config_dir, tmp_path / "shell", state_dir / "session.json")
+
+
+def test_generate_outputs_writes_only_scratch(tmp_path, monkeypatch):
+    generator = _install_dms(tmp_path, monkeypatch, FAKE_DMS)
+    home, state_dir, config_dir = tmp_path / "home", generator.state_dir, generator.config_dir
+    before = _tree(home)
+    outputs = generator.generate_outputs(tmp_path / "forest.png")
+
+    assert _tree(home) == before
+    assert outputs == {
+        state_dir / "dms-colors.json": b"forest.png",
+        config_dir / "theme.json": b"forest.png",
+        home / ".config" / "gtk-4.0" / "dank-colors.css": b"forest.png",
+        home / ".dank-theme": b"forest.png",
+    }
+
+
+def test_failed_run_returns_at_once(tmp_path, monkeypatch):
+    generator = _install_dms(tmp_path, monkeypatch, f"#!{sys.executable}\nimport sys\nsys.exit('no image')\n")
+    start = time.monotonic()
+    assert generator.generate_outputs(tmp_path / "forest.png") is None
+    assert time.monotonic() - start < 5
+
+
+def test_matugen_config_is_copied_not_collected(tmp_path, monkeypatch):
+    script = FAKE_DMS + (
+        'config = Path(os.environ["XDG_CONFIG_HOME"]) / "matugen" / "config.toml"\n'
+        'sys.exit(0 if config.read_text() == "[config]" else "matugen config missing")\n'
+    )
+    generator = _install_dms(tmp_path, monkeypatch, script)
+    matugen = tmp_path / "home" / ".config" / "matugen"
+    matugen.mkdir()
+    (matugen / "config.toml").write_text("[config]")
+
+    outputs = generator.generate_outputs(tmp_path / "forest.png")
+    assert outputs is not None
+    assert matugen / "config.toml" not in outputs
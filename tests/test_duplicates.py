@@ -0,0 +1,81 @@
+"""Near-duplicate grouping on perceptual hashes"""
+
+import random
+from pathlib import Path
+
+from wallpaper_selector.duplicates import (
+    DISTANCE, HashIndex, dhash_pixels, find_groups, hamming, redundant)
+from wallpaper_selector.library import ImageRecord
+
+
+def flip(value: int, *bits: int) -> int:
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_dhash_pixels_compares_right_neighbours():
+    # Brightness falling to the right sets every bit, rising clears them
+    assert dhash_pixels([9 - x for _ in range(8) for x in range(9)]) == (1 << 64) - 1
+    assert dhash_pixels([x for _ in range(8) for x in range(9)]) == 0
+
+
+def test_hash_index_matches_brute_force():
+    rng = random.Random(7)
+    base = [rng.getrandbits(64) for _ in range(50)]
+    # Variants spread across the chunks, some in range and some just out
+    values = base + [flip(v, *rng.sample(range(64), rng.randint(1, 6))) for v in base]
+    index = HashIndex()
+    for value in values:
+        index.add(value)
+    for value in values:
+        expected = {i for i, other in enumerate(values) if hamming(value, other) <= DISTANCE}
+        assert index.near(value) == expected
+
+
+def test_groups_at_the_distance_threshold():
+    base = 0x0123456789ABCDEF
+    hashes = {
+        Path("a.png"): base,
+        # Exactly DISTANCE bits away, one bit in each of four chunks
+        Path("b.png"): flip(base, 0, 20, 40, 60),
+        # One bit further from a, and far from b
+        Path("c.png"): flip(base, 1, 21, 41, 61, 11),
+    }
+    assert hamming(hashes[Path("a.png")], hashes[Path("b.png")]) == DISTANCE
+    assert hamming(hashes[Path("a.png")], hashes[Path("c.png")]) > DISTANCE
+    assert hamming(hashes[Path("b.png")], hashes[Path("c.png")]) > DISTANCE
+    assert find_groups(hashes) == [[Path("a.png"), Path("b.png")]]
+    assert find_groups(hashes, distance=DISTANCE - 1) == []
+
+
+def test_groups_join_transitively():
+    a = 0
+    b = flip(a, 0, 1, 2, 3)
+    c = flip(b, 10, 11, 12, 13)  # 8 bits from a, 4 from b
+    d = flip(0, 32, 33, 34, 35, 36, 37, 38, 39)
+    hashes = {Path("a"): a, Path("b"): b, Path("c"): c, Path("d"): d}
+    assert find_groups(hashes) == [[Path("a"), Path("b"), Path("c")]]
+
+
+def record(name: str, width: int, height: int, size: int, mtime_ns: int = 0) -> ImageRecord:
+    return ImageRecord(Path(name), size, mtime_ns, width, height)
+
+
+def test_redundant_keeps_one_file_per_group():
+    records = {r.path: r for r in (
+        record("small.png", 1280, 720, 900_000),
+        record("large.png", 3840, 2160, 400_000),
+        record("copy.jpg", 1920, 1080, 500_000, mtime_ns=1),
+        record("newer.jpg", 1920, 1080, 500_000, mtime_ns=2),
+        record("unknown.webp", None, None, 10_000_000),
+    )}
+    groups = [
+        [Path("small.png"), Path("large.png")],
+        [Path("copy.jpg"), Path("newer.jpg"), Path("unknown.webp")],
+    ]
+    hidden = redundant(groups, records)
+    assert hidden == {Path("small.png"), Path("copy.jpg"), Path("unknown.webp")}
+    for group in groups:
+        assert len([path for path in group if path not in hidden]) == 1
+    assert redundant([], records) == set()
@@ -0,0 +1,37 @@
+"""Dimension filters and the --aspect argument"""
+
+import pytest
+
+from wallpaper_selector import config
+from wallpaper_selector.filters import make_filter, parse_aspect
+from wallpaper_selector.listing import main as list_main
+
+
+@pytest.mark.parametrize("text, size", [("16:9", (16, 9)), ("21x9", (21, 9)), ("2560x1080", (2560, 1080))])
+def test_parse_aspect(text, size):
+    assert parse_aspect(text) == size
+
+
+@pytest.mark.parametrize("text", ["foo", "16:x", ":9", "16:0", "0x9", "-16:9", ""])
+def test_parse_aspect_rejects(text):
+    with pytest.raises(ValueError, match="Invalid aspect ratio"):
+        parse_aspect(text)
+
+
+def test_aspect_filter_skips_zero_height():
+    matches = make_filter("aspect", (1920, 1080))
+    assert matches(3840, 2160)
+    assert not matches(1080, 1920)
+    assert not matches(1920, 0)
+
+
+def test_aspect_filter_needs_a_monitor_size():
+    with pytest.raises(ValueError):
+        make_filter("aspect", (1920, 0))
+
+
+def test_list_rejects_bad_aspect(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(config, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(config, "CONFIG_FILE", tmp_path / "config.toml")
+    assert list_main(filter_name="aspect", aspect="16:x") == 1
+    assert "Invalid aspect ratio: 16:x" in capsys.readouterr().out
@@ -0,0 +1,128 @@
+"""Image header probing from fixture bytes"""
+
+import struct
+import zlib
+
+import pytest
+
+from wallpaper_selector.imageinfo import ImageInfo, probe
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def png(width: int, height: int, animated: bool = False) -> bytes:
+    ihdr = _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    # Large metadata before the image data is skipped, not read
+    text = _png_chunk(b"tEXt", b"Comment\0" + b"x" * 5000)
+    actl = _png_chunk(b"acTL", struct.pack(">II", 2, 0)) if animated else b""
+    return b"\x89PNG\r\n\x1a\n" + ihdr + text + actl + _png_chunk(b"IDAT", b"") + _png_chunk(b"IEND", b"")
+
+
+def _jpeg_segment(code: int, data: bytes) -> bytes:
+    return bytes([0xFF, code]) + struct.pack(">H", len(data) + 2) + data
+
+
+def _exif(orientation: int, order: str = "<") -> bytes:
+    mark = b"II" if order == "<" else b"MM"
+    entry = struct.pack(order + "HHIH2x", 0x0112, 3, 1, orientation)
+    tiff = mark + struct.pack(order + "HI", 42, 8) + struct.pack(order + "H", 1) + entry + b"\0" * 4
+    return b"Exif\0\0" + tiff
+
+
+def jpeg(width: int, height: int, orientation: int | None = None, order: str = "<") -> bytes:
+    segments = _jpeg_segment(0xE0, b"JFIF\0\1\1\0\0\1\0\1\0\0")
+    if orientation is not None:
+        segments += _jpeg_segment(0xE1, _exif(orientation, order))
+    sof = _jpeg_segment(0xC0, struct.pack(">BHHB", 8, height, width, 3) + b"\1\x22\0" * 3)
+    return b"\xff\xd8" + segments + b"\xff\xff" + sof + _jpeg_segment(0xDA, b"\0" * 10)
+
+
+def gif(width: int, height: int, animated: bool = False) -> bytes:
+    data = b"GIF89a" + struct.pack("<HHBBB", width, height, 0x80, 0, 0) + b"\0" * 6
+    if animated:
+        data += b"\x21\xff\x0bNETSCAPE2.0\x03\x01\0\0\0"
+    return data + b"\x2c" + b"\0" * 9 + b"\x3b"
+
+
+def bmp(width: int, height: int, core: bool = False) -> bytes:
+    if core:
+        info = struct.pack("<IHHHH", 12, width, height, 1, 24)
+    else:
+        info = struct.pack("<IiiHH", 40, width, height, 1, 24) + b"\0" * 24
+    return b"BM" + struct.pack("<IHHI", 14 + len(info), 0, 0, 14 + len(info)) + info
+
+
+def _riff(kind: bytes, payload: bytes) -> bytes:
+    chunk = kind + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", 4 + len(chunk)) + b"WEBP" + chunk
+
+
+def webp_lossy(width: int, height: int) -> bytes:
+    return _riff(b"VP8 ", b"\0\0\0\x9d\x01\x2a" + struct.pack("<HH", width, height) + b"\0" * 10)
+
+
+def webp_lossless(width: int, height: int) -> bytes:
+    bits = (width - 1) | ((height - 1) << 14)
+    return _riff(b"VP8L", b"\x2f" + struct.pack("<I", bits) + b"\0" * 10)
+
+
+def webp_extended(width: int, height: int, animated: bool = False) -> bytes:
+    flags = 0x02 if animated else 0
+    payload = bytes([flags, 0, 0, 0]) + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")
+    return _riff(b"VP8X", payload)
+
+
+CASES = [
+    (png(1920, 1080), ImageInfo(1920, 1080, "png")),
+    (png(640, 480, animated=True), ImageInfo(640, 480, "png", True)),
+    (jpeg(3840, 2160), ImageInfo(3840, 2160, "jpeg")),
+    (jpeg(3840, 2160, orientation=1), ImageInfo(3840, 2160, "jpeg")),
+    (jpeg(4032, 3024, orientation=6), ImageInfo(3024, 4032, "jpeg")),
+    (jpeg(4032, 3024, orientation=8, order=">"), ImageInfo(3024, 4032, "jpeg")),
+    (jpeg(4032, 3024, orientation=3), ImageInfo(4032, 3024, "jpeg")),
+    (gif(320, 200), ImageInfo(320, 200, "gif")),
+    (gif(320, 200, animated=True), ImageInfo(320, 200, "gif", True)),
+    (bmp(800, -600), ImageInfo(800, 600, "bmp")),
+    (bmp(64, 32, core=True), ImageInfo(64, 32, "bmp")),
+    (webp_lossy(2560, 1440), ImageInfo(2560, 1440, "webp")),
+    (webp_lossless(1000, 16383), ImageInfo(1000, 16383, "webp")),
+    (webp_extended(5120, 2880, animated=True), ImageInfo(5120, 2880, "webp", True)),
+]
+
+
+@pytest.mark.parametrize("data, info", CASES)
+def test_probe(tmp_path, data, info):
+    path = tmp_path / "image"
+    path.write_bytes(data)
+    assert probe(path) == info
+
+
+@pytest.mark.parametrize("data", [
+    png(1920, 1080)[:20],
+    jpeg(1920, 1080)[:28],
+    b"\xff\xd8" + _jpeg_segment(0xDA, b"\0" * 4),
+    webp_lossy(100, 100)[:24],
+    b"GIF89a\x01",
+    b"BM" + b"\0" * 14,
+    b"not an image at all",
+    b"",
+])
+def test_truncated_or_unknown_is_none(tmp_path, data):
+    path = tmp_path / "image"
+    path.write_bytes(data)
+    assert probe(path) is None
+
+
+def test_malformed_exif_keeps_the_size(tmp_path):
+    data = jpeg(4032, 3024, orientation=6)
+    # Point the first IFD past the end of the segment
+    data = data.replace(b"II*\0\x08\0\0\0", b"II*\0\xff\xff\0\0")
+    path = tmp_path / "image.jpg"
+    path.write_bytes(data)
+    assert probe(path) == ImageInfo(4032, 3024, "jpeg")
+
+
+def test_missing_file_is_none(tmp_path):
+    assert probe(tmp_path / "missing.png") is None
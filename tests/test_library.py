@@ -0,0 +1,116 @@
+"""Library index reconciling with the wallpaper directories"""
+
+import os
+import struct
+from pathlib import Path
+
+from wallpaper_selector.library import LibraryIndex
+from wallpaper_selector.palettes import ContentHasher
+
+EXTENSIONS = {".png", ".jpg"}
+
+
+def png(width: int, height: int) -> bytes:
+    # Header and IHDR are all the prober reads; the CRC is not checked
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + b"\0" * 4
+
+
+def write(path: Path, data: bytes, mtime_ns: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def make_index(tmp_path: Path) -> LibraryIndex:
+    cache = tmp_path / "cache"
+    return LibraryIndex(cache / "library.db", ContentHasher(cache / "hashes.db"))
+
+
+def paths(records) -> set[Path]:
+    return {record.path for record in records}
+
+
+def test_reconcile_detects_added_modified_and_removed(tmp_path):
+    walls = tmp_path / "walls"
+    a = write(walls / "a.png", png(1920, 1080), 1_000)
+    b = write(walls / "b.png", png(800, 600), 1_000)
+    write(walls / "notes.txt", b"not a wallpaper", 1_000)
+    index = make_index(tmp_path)
+
+    first = index.reconcile([walls], EXTENSIONS)
+    assert paths(first.upserted) == {a, b}
+    assert first.removed == []
+    assert {(r.path, r.width, r.height, r.format) for r in first.upserted} == {
+        (a, 1920, 1080, "png"), (b, 800, 600, "png")}
+
+    # Nothing changed: nothing to report
+    again = index.reconcile([walls], EXTENSIONS)
+    assert again.upserted == [] and again.removed == []
+
+    write(walls / "a.png", png(3840, 2160), 2_000)
+    c = write(walls / "c.png", png(640, 480), 1_000)
+    b.unlink()
+    changed = index.reconcile([walls], EXTENSIONS)
+    assert paths(changed.upserted) == {a, c}
+    assert changed.removed == [b]
+    records = {record.path: record for record in index.load([walls])}
+    assert set(records) == {a, c}
+    assert (records[a].width, records[a].height, records[a].mtime_ns) == (3840, 2160, 2_000)
+
+    # A fresh index over the same database sees the same state
+    reopened = make_index(tmp_path)
+    assert paths(reopened.load([walls])) == {a, c}
+    assert reopened.reconcile([walls], EXTENSIONS).upserted == []
+
+
+def test_reconcile_batches_recursion_and_roots(tmp_path):
+    walls, other = tmp_path / "walls", tmp_path / "other"
+    top = write(walls / "top.png", png(10, 10), 1_000)
+    nested = write(walls / "nature" / "deep.jpg", b"\xff\xd8", 1_000)
+    write(walls / ".hidden" / "skip.png", png(10, 10), 1_000)
+    elsewhere = write(other / "x.png", png(10, 10), 1_000)
+    index = make_index(tmp_path)
+
+    flat = index.reconcile([walls], EXTENSIONS)
+    assert paths(flat.upserted) == {top}
+
+    batches = []
+    deep = index.reconcile([walls, other], EXTENSIONS, recursive=True, on_batch=batches.append)
+    assert paths(deep.upserted) == {nested, elsewhere}
+    assert paths(record for batch in batches for record in batch) == {nested, elsewhere}
+    # Unreadable headers are still indexed, without dimensions
+    assert next(r for r in deep.upserted if r.path == nested).width is None
+
+    # Only the requested roots are loaded or pruned
+    assert paths(index.load([other])) == {elsewhere}
+    assert index.reconcile([other], EXTENSIONS).removed == []
+    assert paths(index.load([walls])) == {top, nested}
+
+
+def test_forget_refresh_and_dhashes(tmp_path):
+    walls = tmp_path / "walls"
+    a = write(walls / "a.png", png(100, 50), 1_000)
+    b = write(walls / "b.png", png(100, 50), 1_000)
+    index = make_index(tmp_path)
+    index.reconcile([walls], EXTENSIONS)
+
+    # Values above 2**63 survive SQLite's signed integers
+    index.set_dhashes({a: (1 << 64) - 3, b: 5})
+    records = {record.path: record for record in index.load([walls])}
+    assert records[a].dhash == (1 << 64) - 3
+    assert records[b].dhash == 5
+
+    index.forget(a)
+    assert paths(index.load([walls])) == {b}
+    # The file is still there, so the next reconcile adds it back
+    assert paths(index.reconcile([walls], EXTENSIONS).upserted) == {a}
+
+    b.unlink()
+    assert index.refresh(b) is None
+    assert paths(index.load([walls])) == {a}
+    write(walls / "a.png", png(200, 100), 3_000)
+    refreshed = index.refresh(a)
+    assert (refreshed.width, refreshed.mtime_ns) == (200, 3_000)
+    assert index.reconcile([walls], EXTENSIONS).upserted == []
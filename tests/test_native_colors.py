@@ -0,0 +1,16 @@
+"""Native palette extraction"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from wallpaper_selector.plugins.colors.native import kmeans
+
+
+def test_kmeans_counts_match_returned_centers():
+    pixels = np.random.default_rng(1).random((2048, 3))
+    # Too few iterations to converge: counts must still describe the final centers
+    centers, counts = kmeans(pixels, iterations=2)
+    distances = ((pixels[:, None, :] - centers[None]) ** 2).sum(2)
+    assert (np.bincount(distances.argmin(1), minlength=len(centers)) == counts).all()
+    assert counts.sum() == len(pixels)
@@ -0,0 +1,206 @@
+"""Cached color generation must write the same files as uncached"""
+
+import os
+from pathlib import Path
+
+from wallpaper_selector.palettes import ContentHasher, PaletteStore
+from wallpaper_selector.plugins.colors import CachedColorGenerator
+
+
+class TemplateGenerator:
+    """Stand-in backend writing a colors file and two rendered templates"""
+
+    renders_aside = True
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.renders = 0
+        self.generated_in_place = 0
+
+    def outputs(self, wallpaper_path: Path) -> dict[Path, bytes]:
+        name = wallpaper_path.name.encode()
+        return {
+            self.root / "state" / "dms-colors.json": b'{"colors": "%s"}' % name,
+            self.root / "home" / ".config" / "gtk-4.0" / "dank-colors.css": b"/* %s */" % name,
+            self.root / "home" / ".config" / "kitty" / "dank-theme.conf": b"# %s" % name,
+        }
+
+    def generate_outputs(self, wallpaper_path: Path) -> dict[Path, bytes]:
+        self.renders += 1
+        return self.outputs(wallpaper_path)
+
+    def generate(self, wallpaper_path: Path) -> bool:
+        self.generated_in_place += 1
+        return True
+
+    def is_cached(self, wallpaper_path: Path) -> bool:
+        return False
+
+    def update_session(self, wallpaper_path: Path) -> bool:
+        return True
+
+    def get_colors_path(self) -> Path:
+        return self.root / "state" / "dms-colors.json"
+
+    def settings_fingerprint(self) -> str:
+        return "test"
+
+
+def _tree(root: Path) -> dict[str, bytes]:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def _generator(tmp_path: Path, live: Path) -> CachedColorGenerator:
+    store = PaletteStore(1 << 20, tmp_path / "palettes", ContentHasher(tmp_path / "hashes.db"))
+    return CachedColorGenerator(TemplateGenerator(live), store)
+
+
+def test_hit_writes_the_same_files_as_a_miss(tmp_path):
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    live = tmp_path / "live"
+
+    generator = _generator(tmp_path, live)
+    assert generator.generate(wallpaper)
+    after_miss = _tree(live)
+    assert len(after_miss) == 3
+
+    # Another wallpaper's outputs in between, then a hit restores everything
+    other = tmp_path / "sea.png"
+    other.write_bytes(b"other pixels")
+    assert generator.generate(other)
+    assert _tree(live) != after_miss
+    assert generator.generate(wallpaper)
+    assert _tree(live) == after_miss
+    assert generator.inner.renders == 2
+    assert generator.inner.generated_in_place == 0
+
+
+def test_precomputed_entry_installs_templates(tmp_path):
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    live = tmp_path / "live"
+
+    generator = _generator(tmp_path, live)
+    assert generator.precompute(wallpaper) == "generated"
+    assert not live.exists()
+    assert generator.precompute(wallpaper) == "cached"
+    assert generator.generate(wallpaper)
+    assert _tree(live) == {str(p.relative_to(live)): data
+                           for p, data in generator.inner.outputs(wallpaper).items()}
+    assert generator.inner.renders == 1
+
+
+def test_precomputed_entries_survive_eviction(tmp_path):
+    live = tmp_path / "live"
+    generator = _generator(tmp_path, live)
+    generator.store.max_bytes = 1
+    pinned = []
+    for i in range(3):
+        wallpaper = tmp_path / f"pinned-{i}.png"
+        wallpaper.write_bytes(b"pinned %d" % i)
+        assert generator.precompute(wallpaper, pin=True) == "generated"
+        pinned.append(wallpaper)
+    for i in range(3):
+        wallpaper = tmp_path / f"set-{i}.png"
+        wallpaper.write_bytes(b"set %d" % i)
+        assert generator.generate(wallpaper)
+
+    assert all(generator.store.is_pinned(generator.key(path)) for path in pinned)
+    # Only the newest on-demand entry fits the budget
+    assert len(list((tmp_path / "palettes").glob("*.json"))) == 1
+
+    assert generator.store.prune_pinned({generator.key(pinned[0])}) == 2
+    assert generator.store.contains(generator.key(pinned[0]))
+    assert not generator.store.contains(generator.key(pinned[1]))
+
+
+def test_pinning_moves_an_entry_out_of_the_budget(tmp_path):
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    generator = _generator(tmp_path, tmp_path / "live")
+    assert generator.generate(wallpaper)
+    assert not generator.store.is_pinned(generator.key(wallpaper))
+
+    assert generator.precompute(wallpaper, pin=True) == "cached"
+    assert generator.store.is_pinned(generator.key(wallpaper))
+    assert not list((tmp_path / "palettes").glob("*.json"))
+    assert generator.inner.renders == 1
+
+
+def test_put_scans_the_store_once(tmp_path, monkeypatch):
+    store = PaletteStore(1 << 20, tmp_path / "palettes", ContentHasher(tmp_path / "hashes.db"))
+    store.put("seed", b"x")
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+    for i in range(50):
+        store.put(f"key-{i}", b"x" * 100)
+    assert scans == []
+
+
+def test_backend_not_rendering_aside_generates_in_place(tmp_path):
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    generator = _generator(tmp_path, tmp_path / "live")
+    generator.inner.renders_aside = False
+
+    assert generator.generate(wallpaper)
+    assert generator.generate(wallpaper)
+    assert generator.inner.generated_in_place == 2
+    assert generator.inner.renders == 0
+    assert not generator.store.contains(generator.key(wallpaper))
+
+
+def test_sync_installs_a_hit_and_generates_a_miss_in_place(tmp_path):
+    from wallpaper_selector.sync import sync_colors
+
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    live = tmp_path / "live"
+    generator = _generator(tmp_path, live)
+    backend, store = generator.inner, generator.store
+
+    # Content hash not memoized yet: generated in place, the file is not read
+    assert sync_colors(str(wallpaper), backend, palette_store=store)
+    assert backend.generated_in_place == 1
+    assert store.hasher.known(wallpaper, wallpaper.stat()) is None
+
+    assert generator.precompute(wallpaper) == "generated"
+    assert sync_colors(str(wallpaper), backend, palette_store=store)
+    assert backend.generated_in_place == 1
+    assert _tree(live) == {str(p.relative_to(live)): data
+                           for p, data in backend.outputs(wallpaper).items()}
+
+
+def test_precompute_collects_keys_for_pruning(tmp_path):
+    from wallpaper_selector.precompute import precompute_palettes
+
+    generator = _generator(tmp_path, tmp_path / "live")
+    wallpapers = []
+    for i in range(3):
+        wallpaper = tmp_path / f"wall-{i}.png"
+        wallpaper.write_bytes(b"pixels %d" % i)
+        wallpapers.append(wallpaper)
+    generator.precompute(wallpapers[0], pin=True)
+    gone = tmp_path / "gone.png"
+    gone.write_bytes(b"gone")
+    generator.precompute(gone, pin=True)
+
+    keys: set[str] = set()
+    counts = precompute_palettes(wallpapers, generator, keys=keys)
+    assert counts == {"cached": 1, "generated": 2, "failed": 0}
+    assert keys == {generator.key(path) for path in wallpapers}
+    assert generator.store.prune_pinned(keys) == 1
+    assert not generator.store.contains(generator.key(gone))
+
+
+def test_precompute_skips_backends_generating_in_place(monkeypatch, capsys):
+    from wallpaper_selector import precompute
+    from wallpaper_selector.config import Config
+
+    config = Config()
+    config.colors.backend.name = "dms"
+    monkeypatch.setattr(precompute, "load_config", lambda: config)
+    assert precompute.main() == 0
+    assert "skipping" in capsys.readouterr().out
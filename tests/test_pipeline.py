@@ -0,0 +1,82 @@
+"""Latest-wins supersede logic of the set-wallpaper pipeline"""
+
+import threading
+from pathlib import Path
+
+from wallpaper_selector.models.pipeline import SetWallpaperPipeline
+
+A, B, C = Path("/walls/a.png"), Path("/walls/b.png"), Path("/walls/c.png")
+STAGES = ("backend", "cache", "colors")
+
+
+class StubManager:
+    """Stands in for WallpaperManager.set_stages, logging each stage run.
+
+    The first stage of gate_path blocks until release is set, so other
+    wallpapers can be submitted while it is in flight.
+    """
+
+    def __init__(self, gate_path: Path | None = None, failing: tuple[Path, str] | None = None):
+        self.gate_path = gate_path
+        self.failing = failing
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.ran: list[tuple[Path, str]] = []
+
+    def set_stages(self, path: Path):
+        def stage(name: str):
+            def run() -> bool:
+                self.ran.append((path, name))
+                if path == self.gate_path and name == STAGES[0]:
+                    self.entered.set()
+                    assert self.release.wait(5)
+                return (path, name) != self.failing
+            return run
+        return [(name, stage(name)) for name in STAGES]
+
+
+def test_single_submit_runs_every_stage():
+    manager = StubManager()
+    seen = []
+    pipeline = SetWallpaperPipeline(manager, on_stage=lambda *args: seen.append(args))
+    pipeline.submit(A)
+    pipeline.wait()
+    assert manager.ran == [(A, name) for name in STAGES]
+    assert seen == [(A, name, True) for name in STAGES]
+    assert pipeline.stats() == {"submitted": 1, "completed": 1, "superseded": 0}
+
+
+def test_newer_selection_supersedes_the_running_one():
+    manager = StubManager(gate_path=A)
+    pipeline = SetWallpaperPipeline(manager)
+    pipeline.submit(A)
+    assert manager.entered.wait(5)
+    # Both arrive while a is in its first stage; b never starts
+    pipeline.submit(B)
+    pipeline.submit(C)
+    manager.release.set()
+    pipeline.wait()
+
+    assert manager.ran == [(A, STAGES[0])] + [(C, name) for name in STAGES]
+    assert pipeline.stats() == {"submitted": 3, "completed": 1, "superseded": 2}
+
+
+def test_failed_stage_skips_the_rest():
+    manager = StubManager(failing=(A, "cache"))
+    seen = []
+    pipeline = SetWallpaperPipeline(manager, on_stage=lambda *args: seen.append(args))
+    pipeline.submit(A)
+    pipeline.wait()
+    assert manager.ran == [(A, "backend"), (A, "cache")]
+    assert seen == [(A, "backend", True), (A, "cache", False)]
+    assert pipeline.stats() == {"submitted": 1, "completed": 0, "superseded": 0}
+
+
+def test_callbacks_go_through_dispatch():
+    dispatched = []
+    pipeline = SetWallpaperPipeline(
+        StubManager(), on_stage=lambda *args: None,
+        dispatch=lambda func, *args: dispatched.append(args))
+    pipeline.submit(B)
+    pipeline.wait()
+    assert dispatched == [(B, name, True) for name in STAGES]
@@ -0,0 +1,61 @@
+"""Pre-warming predicted wallpapers"""
+
+import time
+
+from wallpaper_selector.prewarm import Prewarmer
+from wallpaper_selector.usage import UsageLog
+
+
+class StubGenerator:
+    """Precompute stand-in taking a fixed time and returning a fixed result"""
+
+    def __init__(self, result: str, renders_aside: bool = True):
+        self.result = result
+        self.renders_aside = renders_aside
+        self.keyed = []
+
+    def key(self, wallpaper_path):
+        self.keyed.append(wallpaper_path)
+        return "key"
+
+    def precompute(self, wallpaper_path):
+        assert self.renders_aside, "would run the backend in place"
+        time.sleep(0.01)
+        return self.result
+
+
+def _saved(tmp_path, result: str) -> float:
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    prewarmer = Prewarmer(UsageLog(tmp_path / "usage.log"), StubGenerator(result))
+    try:
+        prewarmer._warm(wallpaper)
+        prewarmer.on_set(wallpaper)
+        stats = prewarmer.stats()
+    finally:
+        prewarmer.shutdown()
+    assert stats["hits"] == 1
+    return stats["saved_seconds"]
+
+
+def test_generated_palette_counts_as_saved(tmp_path):
+    assert _saved(tmp_path, "generated") >= 0.01
+
+
+def test_stored_palette_saves_nothing(tmp_path):
+    assert _saved(tmp_path, "cached") == 0.0
+    assert _saved(tmp_path, "failed") == 0.0
+
+
+def test_backend_generating_in_place_is_only_hashed(tmp_path):
+    wallpaper = tmp_path / "forest.png"
+    wallpaper.write_bytes(b"pixels")
+    generator = StubGenerator("generated", renders_aside=False)
+    prewarmer = Prewarmer(UsageLog(tmp_path / "usage.log"), generator)
+    try:
+        prewarmer._warm(wallpaper)
+        prewarmer.on_set(wallpaper)
+        assert prewarmer.stats()["saved_seconds"] == 0.0
+    finally:
+        prewarmer.shutdown()
+    assert generator.keyed == [wallpaper]
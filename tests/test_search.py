@@ -0,0 +1,78 @@
+"""Filter-as-you-type search index"""
+
+from pathlib import Path
+
+from wallpaper_selector.search import SearchIndex
+
+ROOT = Path("/walls")
+EXTRA = Path("/art")
+
+
+def _index(*paths: str) -> SearchIndex:
+    index = SearchIndex([ROOT, EXTRA])
+    for path in paths:
+        index.add(Path(path))
+    return index
+
+
+def test_keys_are_relative_to_their_root():
+    index = _index()
+    assert index.key(Path("/walls/Nature/Forest.PNG")) == "nature/forest.png"
+    assert index.key(Path("/art/Sea.jpg")) == "sea.jpg"
+    # A sibling directory sharing the root's prefix is not inside it
+    assert index.key(Path("/walls-old/Nature/lake.png")) == "lake.png"
+
+
+def test_every_term_must_match_folder_or_name():
+    index = _index("/walls/nature/forest-dark.png", "/walls/nature/lake.png", "/art/forest.jpg")
+    assert index.search("") is None
+    assert index.search("FOREST") == {Path("/walls/nature/forest-dark.png"), Path("/art/forest.jpg")}
+    assert index.search("nature forest") == {Path("/walls/nature/forest-dark.png")}
+    assert index.matches(Path("/walls/nature/forest-dark.png"))
+    assert not index.matches(Path("/walls/nature/lake.png"))
+    # The root itself is not part of the key
+    assert index.search("walls") == set()
+
+
+def test_typing_narrows_and_deleting_returns():
+    index = _index("/walls/forest.png", "/walls/fog.png", "/walls/sea.png")
+    assert index.search("f") == {Path("/walls/forest.png"), Path("/walls/fog.png")}
+    assert index.search("fo") == {Path("/walls/forest.png"), Path("/walls/fog.png")}
+    assert index.search("for") == {Path("/walls/forest.png")}
+    assert len(index._history) == 3
+    # Deleting a character goes back to the earlier result without a new pass
+    assert index.search("fo") == {Path("/walls/forest.png"), Path("/walls/fog.png")}
+    assert len(index._history) == 2
+    # A query not narrowing the last one starts over
+    assert index.search("sea") == {Path("/walls/sea.png")}
+    assert [terms for terms, _ in index._history] == [["sea"]]
+
+
+def test_narrowing_only_checks_previous_candidates():
+    index = _index("/walls/forest.png", "/walls/sea.png")
+    index.search("fo")
+    # Not among the candidates of "fo": narrowing must not bring it back
+    index._keys[index._ids[Path("/walls/sea.png")]] = "forest-sea.png"
+    assert index.search("for") == {Path("/walls/forest.png")}
+
+
+def test_add_and_remove_reset_the_history():
+    index = _index("/walls/forest.png")
+    assert index.search("for") == {Path("/walls/forest.png")}
+    index.add(Path("/walls/forest-2.png"))
+    assert index.search("fore") == {Path("/walls/forest.png"), Path("/walls/forest-2.png")}
+    index.remove(Path("/walls/forest.png"))
+    assert index.search("fore") == {Path("/walls/forest-2.png")}
+    assert len(index) == 1
+    index.remove(Path("/walls/missing.png"))
+    assert len(index) == 1
+
+
+def test_removals_compact_the_lists():
+    index = _index(*(f"/walls/img{i}.png" for i in range(200)))
+    for i in range(150):
+        index.remove(Path(f"/walls/img{i}.png"))
+    assert len(index) == 50
+    assert len(index._paths) < 200
+    assert index.search("img1") == {Path(f"/walls/img{i}.png") for i in range(150, 200) if "img1" in f"img{i}"}
+    assert index.search("img199") == {Path("/walls/img199.png")}
@@ -0,0 +1,72 @@
+"""Merging library scan batches into the sorted wallpaper lists"""
+
+import random
+from functools import total_ordering
+from pathlib import Path
+
+from wallpaper_selector.library import LibraryChanges, LibraryScan
+from wallpaper_selector.models.wallpaper_manager import INSORT_MAX, SortedWallpapers
+
+
+@total_ordering
+class CountingKey:
+    """Sort key counting the comparisons made on it"""
+
+    comparisons = 0
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        CountingKey.comparisons += 1
+        return self.value < other.value
+
+
+def _entries(values) -> list:
+    return sorted((CountingKey(v), Path(f"/walls/{v}.png")) for v in values)
+
+
+def _check(wallpapers: SortedWallpapers, values) -> None:
+    assert [key.value for key in wallpapers.keys] == sorted(values)
+    assert [path.name for path in wallpapers.paths] == [f"{v}.png" for v in sorted(values)]
+    assert all(wallpapers.key_of(path) is key for key, path in wallpapers.entries())
+
+
+def test_small_batch_merge_does_not_walk_the_list():
+    values = random.Random(1).sample(range(10 ** 6), 50_000)
+    existing, batch = values[:49_900], values[49_900:]
+    wallpapers = SortedWallpapers(_entries(existing))
+
+    entries = _entries(batch)
+    CountingKey.comparisons = 0
+    wallpapers.merge(entries)
+    # Bisection only: about log2(50 000) comparisons per entry, not one per wallpaper
+    assert CountingKey.comparisons <= len(batch) * 20
+    _check(wallpapers, values)
+
+
+def test_large_batch_merge_is_linear():
+    values = random.Random(2).sample(range(10 ** 6), 20_000)
+    existing, batch = values[:10_000], values[10_000:]
+    assert len(batch) > INSORT_MAX
+    wallpapers = SortedWallpapers(_entries(existing))
+
+    entries = _entries(batch)
+    CountingKey.comparisons = 0
+    wallpapers.merge(entries)
+    # Two sorted runs: Timsort merges them in about one comparison per entry
+    assert CountingKey.comparisons <= 2 * len(values)
+    _check(wallpapers, values)
+
+
+def test_drain_returns_at_most_limit_batches():
+    scan = LibraryScan(None, [], set())
+    for _ in range(5):
+        scan.changes.put(LibraryChanges())
+    assert len(scan.drain(2)) == 2
+    assert scan.pending()
+    assert len(scan.drain()) == 3
+    assert not scan.pending()
@@ -0,0 +1,87 @@
+"""swww-ipc daemon checks against a stand-in daemon socket"""
+
+import socket
+import threading
+from pathlib import Path
+
+from wallpaper_selector.plugins.wallpaper.swww_ipc import (
+    SwwwIpcBackend, parse_query, probe_socket, socket_paths,
+)
+
+
+def _listen(path: Path) -> socket.socket:
+    """Unix socket accepting and closing connections, like an idle daemon"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    sock.listen(8)
+
+    def serve() -> None:
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return sock
+
+
+def _runtime_dir(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setenv("WAYLAND_DISPLAY", "wayland-1")
+    return tmp_path
+
+
+def test_socket_paths_prefer_the_display_socket(tmp_path, monkeypatch):
+    runtime_dir = _runtime_dir(tmp_path, monkeypatch)
+    assert socket_paths() == [runtime_dir / "swww-wayland-1.socket", runtime_dir / "swww.socket"]
+
+
+def test_probe_socket(tmp_path):
+    path = tmp_path / "daemon.socket"
+    assert not probe_socket(path)
+    sock = _listen(path)
+    try:
+        assert probe_socket(path)
+    finally:
+        sock.close()
+
+
+def test_daemon_running_on_either_socket(tmp_path, monkeypatch):
+    runtime_dir = _runtime_dir(tmp_path, monkeypatch)
+    backend = SwwwIpcBackend()
+    assert not backend.is_daemon_running()
+    sock = _listen(runtime_dir / "swww.socket")
+    try:
+        assert backend.is_daemon_running()
+    finally:
+        sock.close()
+
+
+def test_wait_until_ready_returns_once_the_socket_listens(tmp_path, monkeypatch):
+    runtime_dir = _runtime_dir(tmp_path, monkeypatch)
+    backend = SwwwIpcBackend()
+    assert not backend.wait_until_ready(timeout=0.05)
+
+    started = []
+    timer = threading.Timer(0.1, lambda: started.append(_listen(runtime_dir / "swww-wayland-1.socket")))
+    timer.start()
+    try:
+        assert backend.wait_until_ready(timeout=5.0)
+    finally:
+        timer.join()
+        for sock in started:
+            sock.close()
+
+
+def test_parse_query():
+    outputs = parse_query(
+        "eDP-1: 2560x1600, scale: 1.5, currently displaying: image: /walls/a b.png\n"
+        "swww-daemon is starting\n"
+        ": HDMI-A-1: 3840x2160, scale: 1, currently displaying: color: 000000\n"
+    )
+    assert [(o.name, o.width, o.height, o.scale, o.image, o.color) for o in outputs] == [
+        ("eDP-1", 2560, 1600, 1.5, "/walls/a b.png", None),
+        ("HDMI-A-1", 3840, 2160, 1.0, None, "000000"),
+    ]
@@ -0,0 +1,67 @@
+"""The boot-time sync command must start without GObject introspection
+
+``wallpaper-selector sync`` runs from a systemd unit on every login, so
+its import cost is a startup budget. Each check runs in a fresh
+interpreter: sys.modules of the test process already holds whatever
+other tests imported.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Import cost of wallpaper_selector's own modules on top of the standard
+# library modules the sync path always needed (milliseconds). Those
+# (argparse, dataclasses, tomllib, subprocess, ...) take 50-70 ms on
+# their own on a slow single-core machine and are loaded first. Anything
+# else the package pulls in, such as sqlite3 or hashlib for the palette
+# store, counts against the budget, against hundreds of milliseconds for
+# gi and GTK.
+IMPORT_BUDGET_MS = 30
+# Best of this many runs, so one slow scheduler slice does not fail the test
+RUNS = 3
+
+# Stdlib modules the sync path imports anyway
+BASELINE = "argparse, dataclasses, json, pathlib, subprocess, tomllib, typing"
+
+PROBE = f"""
+import json, sys, time
+import {BASELINE}
+start = time.perf_counter()
+import wallpaper_selector.__main__
+from wallpaper_selector.sync import main as sync_main
+elapsed = (time.perf_counter() - start) * 1000
+sync_main()
+print(json.dumps({{"elapsed_ms": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _probe(tmp_path: Path) -> dict:
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=str(SRC))
+    result = subprocess.run([sys.executable, "-c", PROBE], env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_sync_loads_no_gi(tmp_path):
+    modules = _probe(tmp_path)["modules"]
+    assert not [m for m in modules if m == "gi" or m.startswith("gi.")]
+
+
+def test_sync_imports_no_palette_store(tmp_path):
+    modules = _probe(tmp_path)["modules"]
+    assert not {"sqlite3", "hashlib", "tempfile", "shutil"} & set(modules)
+
+
+def test_sync_loads_no_numpy(tmp_path):
+    modules = _probe(tmp_path)["modules"]
+    assert not [m for m in modules if m == "numpy" or m.startswith("numpy.")]
+
+
+def test_sync_import_budget(tmp_path):
+    elapsed = min(_probe(tmp_path)["elapsed_ms"] for _ in range(RUNS))
+    assert elapsed < IMPORT_BUDGET_MS, f"imports took {elapsed:.1f} ms"
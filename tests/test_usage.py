@@ -0,0 +1,80 @@
+"""Usage log and the sort keys built on it"""
+
+from pathlib import Path
+
+from wallpaper_selector import usage
+from wallpaper_selector.sorting import natural_key, sort_key
+from wallpaper_selector.usage import UsageLog
+
+A, B, C = Path("/walls/a.png"), Path("/walls/b.png"), Path("/walls/c.png")
+
+
+def test_counts_last_used_and_transitions(tmp_path):
+    log = UsageLog(tmp_path / "usage.log")
+    for path in (A, B, A, C, A, B):
+        log.record(path)
+
+    reread = UsageLog(tmp_path / "usage.log")
+    for current in (log, reread):
+        assert current.count(A) == 3
+        assert current.count(B) == 2
+        assert current.count(Path("/walls/never.png")) == 0
+        assert current.last_used(B) > current.last_used(A) > current.last_used(C) > 0
+        assert current.following(A) == {B: 2, C: 1}
+        assert current.following(C) == {A: 1}
+        assert current.following(B) == {A: 1}
+
+
+def test_records_after_loading_update_the_totals(tmp_path):
+    log = UsageLog(tmp_path / "usage.log")
+    log.record(A)
+    assert log.count(A) == 1
+    log.record(B)
+    assert log.count(B) == 1
+    assert log.following(A) == {B: 1}
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / "usage.log"
+    path.write_text(f"1\t100\t{A}\n1\t200\t{B}\n1\t30")
+    log = UsageLog(path)
+    assert log.count(A) == 1 and log.count(B) == 1
+    assert log.following(A) == {B: 1}
+
+
+def test_compaction_keeps_totals_and_transitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(usage, "COMPACT_MIN_LINES", 4)
+    path = tmp_path / "usage.log"
+    log = UsageLog(path)
+    for _ in range(5):
+        log.record(A)
+        log.record(B)
+    assert len(path.read_text().splitlines()) == 10
+
+    compacted = UsageLog(path)
+    assert compacted.count(A) == 5
+    lines = path.read_text().splitlines()
+    assert sorted(line.split("\t")[0] for line in lines) == ["C", "C", "T", "T"]
+
+    # Counts survive the rewrite, and the next selection follows the last one (B)
+    compacted.record(C)
+    again = UsageLog(path)
+    assert again.count(A) == 5 and again.count(B) == 5 and again.count(C) == 1
+    assert again.following(A) == {B: 5}
+    assert again.following(B) == {A: 4, C: 1}
+    assert again.last_used(C) > again.last_used(B)
+
+
+def test_natural_key_orders_numbers_by_value():
+    names = ["img10.png", "IMG2.png", "img1.png", "a.png", "img2b.png"]
+    assert sorted(names, key=natural_key) == ["a.png", "img1.png", "IMG2.png", "img2b.png", "img10.png"]
+    # Text and numbers alternate, so mixed names still compare
+    assert natural_key("2024") < natural_key("abc")
+
+
+def test_usage_orders_break_ties_newest_first():
+    older = sort_key("most-used", A, 0, 100, count=3, last_used=5)
+    newer = sort_key("most-used", B, 0, 200, count=3, last_used=5)
+    more = sort_key("most-used", C, 0, 50, count=4)
+    assert sorted([older, newer, more]) == [more, newer, older]
+    assert sort_key("recent", A, 0, 0, last_used=9) < sort_key("recent", B, 0, 0, last_used=1)
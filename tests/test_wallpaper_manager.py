@@ -0,0 +1,37 @@
+"""Change events of the wallpaper list"""
+
+from pathlib import Path
+
+from wallpaper_selector.config import Config
+from wallpaper_selector.library import ImageRecord
+from wallpaper_selector.models.wallpaper_manager import WallpaperManager
+
+ROOT = Path("/walls")
+A, B, C = ROOT / "a.png", ROOT / "b.png", ROOT / "c.png"
+
+
+def _manager(*paths: Path) -> tuple[WallpaperManager, list]:
+    config = Config()
+    config.wallpaper.directory = ROOT
+    config.wallpaper.sort = "name"
+    records = [ImageRecord(path, 1, 1, 1920, 1080) for path in paths]
+    manager = WallpaperManager(config, None, records=records, load_current=False)
+    events = []
+    manager.add_change_listener(lambda *event: events.append(event))
+    return manager, events
+
+
+def test_removing_a_hidden_wallpaper_still_notifies():
+    manager, events = _manager(A, B, C)
+    manager.set_duplicates({A})
+    manager.set_search("c")
+    assert manager.wallpapers == [C]
+
+    assert manager.remove_wallpaper(A) is None
+    assert manager.remove_wallpaper(B) is None
+    assert manager.remove_wallpaper(C) == 0
+    assert events == [("removed", None, A), ("removed", None, B), ("removed", 0, C)]
+
+    # Paths that were never listed send nothing
+    assert manager.remove_wallpaper(A) is None
+    assert len(events) == 3